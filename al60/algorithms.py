@@ -2,11 +2,22 @@
 Various algorithm implementations.
 """
 
-from typing import List, Set, Callable
+import heapq
+import itertools
+import math
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from typing import List, Set, Dict, Callable, Iterable, Tuple, Optional,\
+    NamedTuple
 from .data.types import Node
 
-from al60.data.graphs import Graph, Undirected
-from al60.data.iterators import DepthFirstIterator, DijkstraIterator
+from al60.data.graphs import Graph, Undirected, FrozenGraph
+from al60.data.iterators import DepthFirstIterator
+from al60.data.disjoint_sets import DisjointSets
+from al60.data.paths import ShortestPathTree
 
 
 def post_order(graph: Graph, v: Node) -> List[Node]:
@@ -19,7 +30,7 @@ def post_order(graph: Graph, v: Node) -> List[Node]:
     :return: a list of nodes in the order they were done being processed
     :raises ValueError: if v is not a defined node in graph
     """
-    if v not in graph.nodes():
+    if not graph.has_node(v):
         raise ValueError(f'node {v} is not defined')
 
     order = [node for node in DepthFirstIterator(graph, v)]
@@ -33,8 +44,11 @@ def topological_sort(graph: Graph, key: Callable[[Node], int] = None)\
     """
     Topologically sort this graph by repeatedly removing a node with no
     incoming edges and all of its outgoing edges and adding it to the order.
-    Total runtime: O(|E|) + O(|V|) + O(|V|) = O(|V| + |E|).
-    TODO: Check total runtime
+    When several nodes have no incoming edges, the smallest one is removed
+    first, so the ready nodes are kept in a binary heap.
+    Total runtime: O(|V| + |E|) to count incoming edges, plus
+    O(|V| log |V|) for the heap operations and O(|E|) to remove edges, which
+    is O((|V| + |E|) log |V|).
 
     https://courses.cs.washington.edu/courses/cse326/03wi/lectures/RaoLect20.pdf
 
@@ -42,104 +56,953 @@ def topological_sort(graph: Graph, key: Callable[[Node], int] = None)\
     :param key: a function of one argument used to extract a comparison key
         to determine which node to visit first (the "smallest" element)
     :return: a topological ordering of the given graph
+    :raises ValueError: if the graph contains a cycle
     """
-    # TODO: Raise exception if not DAG
     # TODO: Implement using DFS
-    # TODO: Implement using priority queue
 
+    def entry(v):
+        # order breaks ties between equal keys in the order nodes became
+        # ready, and keeps nodes themselves from being compared
+        return (v if key is None else key(v)), next(order), v
+
+    order = itertools.count()
     # the number of incoming edges for each node: O(|E|)
-    in_degrees = {v: len(graph.parents(v)) for v in graph.nodes()}
+    in_degrees = {v: len(graph.parents_view(v)) for v in graph.nodes()}
     # the nodes ready to be removed: O(|V|)
-    ready = [v for v in graph.nodes() if in_degrees[v] == 0]
+    ready = [entry(v) for v in in_degrees if in_degrees[v] == 0]
+    heapq.heapify(ready)
     # the topological ordering
-    order = []
+    topological = []
 
-    def pop_min(l):
-        if key:
-            _, idx = min([(ready[i], i) for i in range(len(ready))],
-                         key=key)
-            return l.pop(idx)
-        else:
-            _, idx = min((ready[i], i) for i in range(len(ready)))
-            return l.pop(idx)
-
-    # dequeue and output: O(|V|)?
+    # dequeue and output: O(|V| log |V|) + O(|E|)
     while ready:
-        u = pop_min(ready)
-        order.append(u)
+        (_, _, u) = heapq.heappop(ready)
+        topological.append(u)
 
-        for v in graph.neighbors(u):
+        for v in graph.iter_neighbors(u):
             in_degrees[v] -= 1
             if in_degrees[v] == 0:
-                ready.append(v)
+                heapq.heappush(ready, entry(v))
 
-    return order
+    # every node of a cycle keeps at least one incoming edge
+    if len(topological) < len(in_degrees):
+        raise ValueError('graph contains a cycle')
+
+    return topological
 
 
 def components(graph: Undirected) -> List[Set[Node]]:
     """
-    Compute a tuple of sets of nodes that make up connected components in the
+    Compute a list of sets of nodes that make up connected components in the
     given graph. Implemented as follows:
 
-    1. Create a set containing the nodes of the graph: O(|V|).
-    2. Create an empty list: O(1).
-    3. Perform a breadth-first search from any node in the set: O(|V| + |E|).
-    4. Remove the discovered nodes from the set and add them to the list as a
-       new set: O(|V|) + O(|V|).
-    5. Repeat until the set is empty: O(|V|).
-    6. Return the list
+    1. Create a DisjointSets with each node in a set of its own: O(|V|).
+    2. Merge the sets of the endpoints of every edge: O(|E| * a(|V|)), where a
+       is the inverse Ackermann function.
+    3. Return the remaining sets: O(|V| * a(|V|)).
 
-    TODO: Calculate total runtime (3. and 5. are not necessarily multiplied)
+    Total runtime: O((|V| + |E|) * a(|V|)), which is nearly O(|V| + |E|).
+
+    To keep the components of a growing graph without recomputing them, see
+    ConnectedComponents.
 
     :param graph: the undirected graph to operate on
-    :return: a tuple of connected components
+    :return: a list of connected components
+    """
+    sets = DisjointSets(graph.nodes())  # 1.
+
+    for u in graph.nodes():  # 2.
+        for v in graph.iter_neighbors(u):
+            sets.union(u, v)
+
+    return sets.sets()  # 3.
+
+
+class BreadthFirstLevels(NamedTuple):
+    """
+    The nodes reachable from a start node, grouped by their distance in
+    edges from it.
+
+    order: the reachable nodes, level by level, starting with the start node
+    levels: the number of edges on a shortest path from the start node to
+        each reachable node
+    """
+    order: List[Node]
+    levels: Dict[Node, int]
+
+
+def level_bfs(g: Graph, s: Node, alpha: float = 14, beta: float = 24)\
+        -> BreadthFirstLevels:
+    """
+    Run a breadth-first search from s one level at a time, switching
+    direction as the levels grow and shrink (Beamer, Asanovic and Patterson).
+
+    A top-down step finds the next level by taking the union of the
+    neighbors of the current one and removing the visited nodes. When the
+    current level has many outgoing edges compared to the unvisited nodes, a
+    bottom-up step instead checks every unvisited node for a parent in the
+    current level, which stops at the first one found, so most edges into the
+    large middle levels of a low-diameter graph are never looked at. Both
+    steps work on whole levels with set operations over the rows of the
+    adjacency, by node id, instead of visiting one node at a time like
+    BreadthFirstIterator.
+
+    The levels are the same as those of BreadthFirstIterator, but the order
+    of the nodes within a level is unspecified.
+
+    :param g: the graph to operate on
+    :param s: the start node
+    :param alpha: switch to bottom-up steps when the outgoing edges of the
+        current level are more than 1 / alpha of the incoming edges of the
+        unvisited nodes
+    :param beta: switch back to top-down steps when the current level has
+        fewer than 1 / beta of the nodes
+    :return: the visit order and the level of every node reachable from s
+    :raises ValueError: if s is not a defined node in g
+    """
+    if not g.has_node(s):
+        raise ValueError(f'node {s} is not defined')
+
+    (ids, out_rows, in_rows, index, node) = _id_adjacency(g)
+    if isinstance(g, FrozenGraph):
+        unexplored = len(g._in_targets)
+    else:
+        unexplored = sum(map(len, filter(None, in_rows)))
+
+    n = len(ids)
+    start = index(s)
+    visited = {start}
+    frontier = {start}
+    levels = [[start]]
+    unexplored -= len(in_rows[start])
+    unvisited = None
+    top_down = True
+
+    while frontier:
+        if top_down:
+            scout = sum(len(out_rows[u]) for u in frontier)
+            top_down = scout * alpha <= unexplored
+        else:
+            top_down = len(frontier) * beta < n
+
+        if top_down:
+            frontier = set().union(*map(out_rows.__getitem__, frontier))
+            frontier -= visited
+        else:
+            unvisited = [v for v in (ids if unvisited is None else unvisited)
+                         if v not in visited]
+            frontier = {v for v in unvisited
+                        if not frontier.isdisjoint(in_rows[v])}
+
+        visited |= frontier
+        unexplored -= sum(len(in_rows[v]) for v in frontier)
+        if frontier:
+            levels.append(list(frontier))
+
+    order = list(map(node, itertools.chain.from_iterable(levels)))
+    depths = dict()
+    for (depth, level) in enumerate(levels):
+        depths.update(zip(map(node, level), itertools.repeat(depth)))
+    return BreadthFirstLevels(order, depths)
+
+
+class HopDistances(NamedTuple):
+    """
+    The number of edges on a shortest path from each of several source nodes
+    to every node of a graph.
+
+    sources: the source nodes, in the order of the rows
+    nodes: the nodes, in the order of the columns
+    hops: a row for each source, where hops[i][j] is the distance in edges
+        from sources[i] to nodes[j], math.inf if nodes[j] is not reachable
     """
-    nodes = graph.nodes()  # 1.
-    comps = []  # 2.
+    sources: List[Node]
+    nodes: List[Node]
+    hops: List[List[float]]
 
-    while nodes:  # 5.
-        # 3.
-        discovered: Set[Node] = set(
-            DepthFirstIterator(graph, next(iter(nodes))))
-        # 4.
-        nodes.difference_update(discovered)
-        comps.append(discovered)
 
-    return comps  # 6.
+def multi_source_bfs(g: Graph, sources: Iterable[Node]) -> HopDistances:
+    """
+    Run a breadth-first search from each of the given sources at once, with
+    one pass over the adjacency for all of them (Then et al.). Each node has
+    a bitset, kept in a Python int, of the sources that have reached it, and
+    each level maps the nodes reached by some source for the first time to
+    the bitset of those sources. Expanding a node then pushes all of its
+    sources to each neighbor with a single bitwise operation, so the sources
+    share the edge scans instead of each running a BreadthFirstIterator of
+    its own. Since Python ints have no fixed width, any number of sources is
+    searched in the same pass.
 
+    Edge weights are ignored, so for an Unweighted graph the hops are also
+    the shortest path distances.
 
-def shortest_path(g: Graph, s: Node, t: Node) -> List[Node]:
+    :param g: the graph to operate on
+    :param sources: the nodes to search from, where repeated nodes get a
+        single row
+    :return: the hop distance from each source to every node
+    :raises ValueError: if some source is not a defined node in g
     """
-    Compute the shortest path from s to t in the given graph.
+    sources = list(dict.fromkeys(sources))
+    for s in sources:
+        if not g.has_node(s):
+            raise ValueError(f'node {s} is not defined')
+
+    (ids, out_rows, _, index, node) = _id_adjacency(g)
+    capacity = max(ids, default=-1) + 1
+    column = [0] * capacity
+    for (j, i) in enumerate(ids):
+        column[i] = j
+    hops = [[math.inf] * len(ids) for _ in sources]
+
+    # the sources that have reached each node, and the nodes reached for the
+    # first time in the last level, with the sources that reached them
+    seen = [0] * capacity
+    frontier = dict()
+    for (b, s) in enumerate(sources):
+        i = index(s)
+        seen[i] |= 1 << b
+        frontier[i] = seen[i]
+        hops[b][column[i]] = 0
+
+    level = 0
+    while frontier:
+        level += 1
+        reached = dict()
+        for (u, mask) in frontier.items():
+            for v in out_rows[u]:
+                new = mask & ~seen[v]
+                if new:
+                    seen[v] |= new
+                    reached[v] = reached.get(v, 0) | new
+        frontier = reached
+
+        for (v, mask) in reached.items():
+            j = column[v]
+            while mask:
+                low = mask & -mask
+                hops[low.bit_length() - 1][j] = level
+                mask ^= low
+
+    return HopDistances(sources, list(map(node, ids)), hops)
+
+
+def shortest_path_tree(g: Graph, s: Node, targets: Iterable[Node] = None)\
+        -> ShortestPathTree:
+    """
+    Compute the shortest paths from s to every node reachable from s in the
+    given graph, or only until every node in targets has been settled. If
+    g has negative weights, the whole tree is computed with bellman_ford.
+
+    :param g: the graph to operate on
+    :param s: the start node
+    :param targets: the nodes to stop the search after settling
+    :return: the tree of shortest paths from s
+    :raises ValueError: if s is not a defined node in g, or if g has a
+        negative cycle reachable from s
+    """
+    return _search(g, s, targets)
+
+
+def shortest_path(g: Graph, s: Node, t: Node, bidirectional: bool = False,
+                  heuristic: Optional[Callable[[Node], float]] = None)\
+        -> List[Node]:
+    """
+    Compute the shortest path from s to t in the given graph. If g has
+    negative weights, the path is found with bellman_ford.
 
     :param g: the graph to operate on
     :param s: the start node
     :param t: the end node
+    :param bidirectional: whether to search from both s and t at once, which
+        usually settles fewer nodes for a single pair of nodes
+    :param heuristic: a consistent lower bound on the distance from a node
+        to t, used to run A* search instead of Dijkstra's algorithm, see
+        AStarIterator
     :return: a list of nodes making up the shortest path from s to t in g
-    :raises ValueError: if there is no path from s to t in g
+    :raises ValueError: if there is no path from s to t in g, if both
+        bidirectional and heuristic are given, or if g has negative weights
+        and either is given, or a negative cycle reachable from s
     """
-    # TODO: Fix shortest path with parent pointers
-    path = []
-    for (u, d_u) in DijkstraIterator(g, s):
-        path.append(u)
-        if u == t:
-            return path
+    if bidirectional:
+        _verify_no_heuristic(heuristic)
+        return _bidirectional_dijkstra(g, s, t)[1]
+
+    tree = _search(g, s, [t], heuristic)
+    if not tree.reached(t):
+        raise ValueError(f'node {t} is not reachable from {s}')
+    return tree.path_to(t)
+
+
+def distance(g: Graph, s: Node, t: Node, bidirectional: bool = False,
+             heuristic: Optional[Callable[[Node], float]] = None)\
+        -> float:
+    """
+    Compute the shortest path distance from s to t in the given graph. If g
+    has negative weights, the distance is found with bellman_ford.
+
+    If t is not reachable from s, a ValueError is raised; this function does
+    not return math.inf for it, see distances for a version which does.
+
+    :param g: the graph to operate on
+    :param s: the start node
+    :param t: the end node
+    :param bidirectional: whether to search from both s and t at once, which
+        usually settles fewer nodes for a single pair of nodes
+    :param heuristic: a consistent lower bound on the distance from a node
+        to t, used to run A* search instead of Dijkstra's algorithm, see
+        AStarIterator
+    :return: the distance of the shortest path from s to t in g
+    :raises ValueError: if there is no path from s to t in g, if both
+        bidirectional and heuristic are given, or if g has negative weights
+        and either is given, or a negative cycle reachable from s
+    """
+    if bidirectional:
+        _verify_no_heuristic(heuristic)
+        return _bidirectional_dijkstra(g, s, t)[0]
+
+    tree = _search(g, s, [t], heuristic)
+    if not tree.reached(t):
+        raise ValueError(f'node {t} is not reachable from {s}')
+    return tree.distance_to(t)
+
+
+def distances(g: Graph, s: Node, targets: Iterable[Node])\
+        -> Dict[Node, float]:
+    """
+    Compute the shortest path distances from s to each of the given targets
+    with a single run of Dijkstra's algorithm, which stops as soon as every
+    target has been settled. If g has negative weights, the distances are
+    found with bellman_ford.
+
+    :param g: the graph to operate on
+    :param s: the start node
+    :param targets: the end nodes
+    :return: a dict mapping each target to its distance from s, math.inf if
+        there is no path from s to the target
+    :raises ValueError: if s is not a defined node in g, or if g has a
+        negative cycle reachable from s
+    """
+    targets = list(targets)
+    tree = _search(g, s, targets)
+    return {t: tree.distance_to(t) if tree.reached(t) else math.inf
+            for t in targets}
+
+
+def shortest_paths(g: Graph, s: Node, targets: Iterable[Node])\
+        -> Dict[Node, Optional[List[Node]]]:
+    """
+    Compute the shortest paths from s to each of the given targets with a
+    single run of Dijkstra's algorithm, which stops as soon as every target
+    has been settled. If g has negative weights, the paths are found with
+    bellman_ford.
+
+    :param g: the graph to operate on
+    :param s: the start node
+    :param targets: the end nodes
+    :return: a dict mapping each target to the list of nodes making up the
+        shortest path from s to it, None if there is no path from s to the
+        target
+    :raises ValueError: if s is not a defined node in g, or if g has a
+        negative cycle reachable from s
+    """
+    targets = list(targets)
+    tree = _search(g, s, targets)
+    return {t: tree.path_to(t) if tree.reached(t) else None for t in targets}
+
+
+def bellman_ford(g: Graph, s: Node, vectorized: bool = False)\
+        -> ShortestPathTree:
+    """
+    Compute the shortest paths from s to every node reachable from s in a
+    graph which may have negative weights, where Dijkstra's algorithm does
+    not apply.
+
+    By default, this runs the queue-based variant of the Bellman-Ford
+    algorithm (SPFA), which only relaxes the edges of nodes whose distance
+    changed. With vectorized=True, the edges are instead put in NumPy arrays
+    once and every round relaxes all of them with a few array operations,
+    which is much faster on large graphs where most nodes change in most
+    rounds. If g is not a FrozenGraph, it is frozen first to get its edges
+    as arrays.
+
+    :param g: the graph to operate on
+    :param s: the start node
+    :param vectorized: whether to relax the edges with NumPy, which must be
+        installed, e.g. with pip install al60[numpy]
+    :return: the tree of shortest paths from s
+    :raises ValueError: if s is not a defined node in g, or if g has a
+        negative cycle reachable from s
+    """
+    if not g.has_node(s):
+        raise ValueError(f'node {s} is not defined')
+
+    if vectorized:
+        (distances, parents) = _bellman_ford_arrays(g, s)
+    else:
+        (distances, parents) = _bellman_ford_queue(g, s)
+    return ShortestPathTree._from_parents(s, distances, parents)
+
+
+def delta_stepping(g: Graph, s: Node, delta: float = None,
+                   workers: int = None) -> ShortestPathTree:
+    """
+    Compute the shortest paths from s to every node reachable from s with the
+    delta-stepping algorithm (Meyer and Sanders), which finds the same
+    distances as DijkstraIterator, but settles nodes in batches which can be
+    relaxed in parallel. Requires NumPy, e.g. with pip install al60[numpy].
+
+    Nodes are kept in buckets of width delta by tentative distance, and the
+    buckets are emptied in increasing order. Edges with a weight of at most
+    delta are light, and the others heavy. Emptying a bucket relaxes the
+    light edges of all of its nodes at once, repeatedly, since a light edge
+    can put a node back into the same bucket, and then the heavy edges of
+    every node that was in it, which only reach later buckets. Each batch is
+    relaxed with a few NumPy operations over the CSR arrays of a
+    FrozenGraph. Given workers, batches with many edges are split between a
+    pool of processes, which read the arrays from shared memory.
+
+    A small delta settles nodes almost one distance at a time, like
+    Dijkstra's algorithm, and a large one gives fewer and larger batches,
+    but relaxes more nodes more than once, like Bellman-Ford. By default,
+    delta is the largest weight divided by the average degree.
+
+    :param g: the graph to operate on, which is frozen first if it is not a
+        FrozenGraph
+    :param s: the start node
+    :param delta: the width of the buckets
+    :param workers: the number of processes to relax large batches with, None
+        to relax every batch in this process
+    :return: the tree of shortest paths from s
+    :raises ValueError: if s is not a defined node in g, if g has negative
+        weights, or if delta or workers is not positive
+    """
+    import numpy as np
+
+    if not g.has_node(s):
+        raise ValueError(f'node {s} is not defined')
+    if g.has_negative_weights():
+        raise ValueError('delta-stepping cannot be used with negative '
+                         'weights')
+    if delta is not None and delta <= 0:
+        raise ValueError(f'delta must be positive, got {delta}')
+    if workers is not None and workers <= 0:
+        raise ValueError(f'workers must be positive, got {workers}')
+
+    frozen = g if isinstance(g, FrozenGraph) else FrozenGraph(g)
+    nodes = frozen._nodes
+    n = len(nodes)
+    offsets = np.asarray(frozen._out_offsets, dtype=np.int64)
+    targets = np.asarray(frozen._out_targets, dtype=np.int64)
+    weights = np.asarray(frozen._out_weights, dtype=np.float64)
+    if delta is None:
+        heaviest = weights.max(initial=0)
+        delta = heaviest * n / len(weights) if heaviest > 0 else 1
+
+    # order the edges of each node light first, so that the light and the
+    # heavy edges of a node are each a contiguous range
+    rows = np.repeat(np.arange(n), np.diff(offsets))
+    heavy = weights > delta
+    order = np.argsort(rows * 2 + heavy, kind='stable')
+    light_ends = offsets[:-1] + np.bincount(rows[~heavy], minlength=n)
+    arrays = [offsets, light_ends, targets[order], weights[order],
+              np.full(n, np.inf)]
+    del rows, heavy, order
+
+    source = frozen._index[s]
+    if workers is None:
+        (distances, parents) = _delta_stepping_search(arrays, source, delta)
+    else:
+        (distances, parents) = _delta_stepping_shared(arrays, source, delta,
+                                                      workers)
+
+    reached = np.flatnonzero(parents >= 0).tolist()
+    return ShortestPathTree._from_parents(
+        s, {nodes[i]: d for (i, d)
+            in zip(reached, distances[reached].tolist())},
+        {nodes[i]: None if i == source else nodes[p] for (i, p)
+         in zip(reached, parents[reached].tolist())})
+
+
+def _search(g: Graph, s: Node, targets: Optional[Iterable[Node]],
+            heuristic: Optional[Callable[[Node], float]] = None)\
+        -> ShortestPathTree:
+    """
+    Compute the shortest paths from s with the search that suits g: Dijkstra's
+    algorithm or A* if the weights of g are non-negative, else Bellman-Ford.
 
-    raise ValueError(f'node {t} is not reachable from {s}')
+    :param g: the graph to operate on
+    :param s: the start node
+    :param targets: the nodes to stop a Dijkstra search after settling
+    :param heuristic: the heuristic for an A* search
+    :return: the tree of shortest paths from s
+    :raises ValueError: if s is not a defined node in g, if g has negative
+        weights and a heuristic is given, or if g has a negative cycle
+        reachable from s
+    """
+    if g.has_negative_weights():
+        if heuristic is not None:
+            raise ValueError('a heuristic cannot be used with negative '
+                             'weights')
+        return bellman_ford(g, s)
+    return ShortestPathTree(g, s, targets=targets, heuristic=heuristic)
+
+
+def _bellman_ford_queue(g: Graph, s: Node)\
+        -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]]]:
+    """
+    Run the queue-based Bellman-Ford algorithm from s. A node is queued when
+    its distance decreases, and the edges of a queued node are relaxed when
+    it is taken off the queue. Without a negative cycle, a shortest path has
+    fewer edges than there are nodes, so a node whose path reaches that many
+    edges must be on or behind a negative cycle.
+
+    :param g: the graph to operate on
+    :param s: the start node, which must be defined
+    :return: a tuple of the distance and the predecessor of every node
+        reachable from s
+    :raises ValueError: if g has a negative cycle reachable from s
+    """
+    n = len(g.nodes())
+    distances = {s: 0}
+    parents = {s: None}
+    lengths = {s: 0}
+    queue = deque([s])
+    queued = {s}
+
+    while queue:
+        u = queue.popleft()
+        queued.discard(u)
+        d_u = distances[u]
+
+        for v in g.iter_neighbors(u):
+            d_v = d_u + g.weight(u, v)
+            if d_v < distances.get(v, math.inf):
+                distances[v] = d_v
+                parents[v] = u
+                lengths[v] = lengths[u] + 1
+                if lengths[v] >= n:
+                    raise ValueError(f'graph has a negative cycle reachable '
+                                     f'from {s}')
+                if v not in queued:
+                    queued.add(v)
+                    queue.append(v)
 
+    return distances, parents
 
-def distance(g: Graph, s: Node, t: Node) -> float:
+
+def _bellman_ford_arrays(g: Graph, s: Node)\
+        -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]]]:
     """
-    Compute the shortest path distance from s to t in the given graph.
+    Run the Bellman-Ford algorithm from s with NumPy, over the CSR arrays of
+    a FrozenGraph. Each round computes the distance through every edge from
+    the distances of the previous round at once, and keeps the smallest
+    improvement of each node. After k rounds, every shortest path of at most
+    k edges is known, so if the n-th round still improves a distance, g has
+    a negative cycle reachable from s.
+
+    :param g: the graph to operate on
+    :param s: the start node, which must be defined
+    :return: a tuple of the distance and the predecessor of every node
+        reachable from s
+    :raises ValueError: if g has a negative cycle reachable from s
+    """
+    import numpy as np
+
+    frozen = g if isinstance(g, FrozenGraph) else FrozenGraph(g)
+    nodes = frozen._nodes
+    n = len(nodes)
+    offsets = np.asarray(frozen._out_offsets, dtype=np.int64)
+    targets = np.asarray(frozen._out_targets, dtype=np.int64)
+    weights = np.asarray(frozen._out_weights, dtype=np.float64)
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+
+    distances = np.full(n, np.inf)
+    distances[frozen._index[s]] = 0
+    parents = np.full(n, -1)
+
+    for _ in range(n):
+        through = distances[sources] + weights
+        better = np.flatnonzero(through < distances[targets])
+        if not better.size:
+            break
+
+        # sort the improving edges by target, then distance, and keep the
+        # first edge of each target
+        better = better[np.lexsort((through[better], targets[better]))]
+        first = np.ones(better.size, dtype=bool)
+        first[1:] = targets[better[1:]] != targets[better[:-1]]
+        best = better[first]
+        distances[targets[best]] = through[best]
+        parents[targets[best]] = sources[best]
+    else:
+        raise ValueError(f'graph has a negative cycle reachable from {s}')
+
+    reached = np.flatnonzero(distances < np.inf).tolist()
+    return ({nodes[i]: d for (i, d)
+             in zip(reached, distances[reached].tolist())},
+            {nodes[i]: None if p < 0 else nodes[p] for (i, p)
+             in zip(reached, parents[reached].tolist())})
+
+
+# the smallest number of edges that delta_stepping splits between its worker
+# processes, below which sending the batch costs more than relaxing it
+_PARALLEL_EDGES = 1 << 16
+
+# the arrays of a delta_stepping search and the shared memory backing them,
+# in a worker process
+_worker_arrays = None
+_worker_blocks = None
+
+
+def _delta_stepping_search(arrays: List, source: int, delta: float,
+                           pool: ProcessPoolExecutor = None,
+                           workers: int = 1) -> Tuple:
+    """
+    Run delta-stepping from a source index over prepared arrays, see
+    delta_stepping.
+
+    :param arrays: the offsets, light ends, targets and weights of every
+        node's edges, light edges first, and the tentative distance of every
+        node, which must all be infinite
+    :param source: the index of the start node
+    :param delta: the width of the buckets
+    :param pool: the processes to split batches with many edges between,
+        whose workers read the same arrays
+    :param workers: the number of processes in pool
+    :return: a tuple of the distance and the predecessor index of every node,
+        as arrays, where the predecessor of the source is itself and the
+        predecessor of an unreachable node is -1
+    """
+    import numpy as np
+
+    distances = arrays[4]
+    parents = np.full(len(distances), -1, dtype=np.int64)
+    distances[source] = 0
+    parents[source] = source
+
+    # the nodes put in each bucket, which are filtered when it is emptied
+    # since a node may have moved to an earlier bucket since
+    buckets = {0: [np.array([source])]}
+    heap = [0]
+
+    def relax(frontier, heavy):
+        (starts, ends) = _edge_ranges(arrays, frontier, heavy)
+        count = int((ends - starts).sum())
+        if pool is None or count < _PARALLEL_EDGES:
+            batch = _relax(arrays, frontier, starts, ends)
+        else:
+            # split the frontier into chunks of about as many edges each
+            bounds = np.searchsorted(np.cumsum(ends - starts),
+                                     np.arange(1, workers) * count // workers)
+            parts = pool.map(_relax_shared, np.split(frontier, bounds),
+                             itertools.repeat(heavy))
+            batch = [np.concatenate(part) for part in zip(*parts)]
+
+        improved = _improve(distances, parents, *batch)
+        keys = (distances[improved] // delta).astype(np.int64)
+        order = np.argsort(keys, kind='stable')
+        (keys, starts) = np.unique(keys[order], return_index=True)
+        for (key, part) in zip(keys.tolist(),
+                               np.split(improved[order], starts[1:])):
+            if key not in buckets:
+                buckets[key] = []
+                heapq.heappush(heap, key)
+            buckets[key].append(part)
+
+    while heap:
+        i = heapq.heappop(heap)
+        emptied = []
+        while i in buckets:
+            frontier = np.unique(np.concatenate(buckets.pop(i)))
+            frontier = frontier[distances[frontier] // delta == i]
+            if frontier.size:
+                emptied.append(frontier)
+                relax(frontier, False)
+        if emptied:
+            relax(np.unique(np.concatenate(emptied)), True)
+
+    return distances, parents
+
+
+def _delta_stepping_shared(arrays: List, source: int, delta: float,
+                           workers: int) -> Tuple:
+    """
+    Run delta-stepping with a pool of worker processes, after copying the
+    arrays into shared memory for the workers to read, see
+    _delta_stepping_search.
+
+    :param arrays: the arrays of the search
+    :param source: the index of the start node
+    :param delta: the width of the buckets
+    :param workers: the number of processes
+    :return: a tuple of the distance and the predecessor index of every node
+    """
+    import numpy as np
+
+    blocks = [SharedMemory(create=True, size=max(a.nbytes, 1))
+              for a in arrays]
+    try:
+        shared = [np.ndarray(a.shape, a.dtype, buffer=block.buf)
+                  for (a, block) in zip(arrays, blocks)]
+        for (view, a) in zip(shared, arrays):
+            view[...] = a
+        specs = [(block.name, a.dtype.str, a.shape)
+                 for (a, block) in zip(arrays, blocks)]
+
+        with ProcessPoolExecutor(workers, initializer=_attach_shared,
+                                 initargs=(specs,)) as pool:
+            (distances, parents) = _delta_stepping_search(
+                shared, source, delta, pool, workers)
+        # the views must be gone before the shared memory is closed
+        distances = distances.copy()
+        del shared
+    finally:
+        for block in blocks:
+            block.unlink()
+            try:
+                block.close()
+            except BufferError:
+                # a view is still held by the traceback of an exception, and
+                # the memory is unmapped once it is collected
+                pass
+
+    return distances, parents
+
+
+def _attach_shared(specs: List[Tuple]) -> None:
+    """
+    Map the shared arrays of a delta_stepping search into a worker process.
+
+    :param specs: the name, dtype and shape of each shared array
+    """
+    import numpy as np
+
+    global _worker_arrays, _worker_blocks
+    _worker_blocks = [SharedMemory(name=name) for (name, _, _) in specs]
+    _worker_arrays = [np.ndarray(shape, dtype, buffer=block.buf)
+                      for ((_, dtype, shape), block)
+                      in zip(specs, _worker_blocks)]
+
+
+def _relax_shared(frontier, heavy: bool) -> Tuple:
+    """
+    Relax the light or heavy edges of some nodes in a worker process, see
+    _relax.
+
+    :param frontier: the indices of the nodes
+    :param heavy: whether to relax the heavy edges rather than the light ones
+    :return: the improvements found
+    """
+    (starts, ends) = _edge_ranges(_worker_arrays, frontier, heavy)
+    return _relax(_worker_arrays, frontier, starts, ends)
+
+
+def _edge_ranges(arrays: List, frontier, heavy: bool) -> Tuple:
+    """
+    Get the ranges of the light or heavy edges of some nodes.
+
+    :param arrays: the arrays of a delta_stepping search
+    :param frontier: the indices of the nodes
+    :param heavy: whether to get the heavy edges rather than the light ones
+    :return: a tuple of the start and end positions of the edges of each node
+    """
+    (offsets, light_ends) = arrays[:2]
+    if heavy:
+        return light_ends[frontier], offsets[frontier + 1]
+    return offsets[frontier], light_ends[frontier]
+
+
+def _relax(arrays: List, frontier, starts, ends) -> Tuple:
+    """
+    Compute the distance through each edge in the given ranges, and keep the
+    ones shorter than the tentative distance of their target.
+
+    :param arrays: the arrays of a delta_stepping search
+    :param frontier: the indices of the nodes the edges start from
+    :param starts: the start position of the edges of each node
+    :param ends: the end position of the edges of each node
+    :return: a tuple of the target, distance and source of each improvement,
+        as arrays which may hold the same target more than once
+    """
+    import numpy as np
+
+    (targets, weights, distances) = arrays[2:]
+    counts = ends - starts
+    # the positions of all of the edges, which are consecutive within each
+    # range
+    shift = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    positions = np.arange(len(shift)) + shift
+    sources = np.repeat(frontier, counts)
+
+    v = targets[positions]
+    through = distances[sources] + weights[positions]
+    better = through < distances[v]
+    return v[better], through[better], sources[better]
+
+
+def _improve(distances, parents, v, through, sources):
+    """
+    Apply the smallest improvement of the tentative distance of each node.
+
+    :param distances: the tentative distance of every node
+    :param parents: the predecessor of every node
+    :param v: the target of each improvement
+    :param through: the distance of each improvement
+    :param sources: the source of each improvement
+    :return: the indices of the improved nodes
+    """
+    import numpy as np
+
+    order = np.lexsort((through, v))
+    v = v[order]
+    first = np.ones(len(v), dtype=bool)
+    first[1:] = v[1:] != v[:-1]
+    best = order[first]
+    v = v[first]
+    distances[v] = through[best]
+    parents[v] = sources[best]
+    return v
+
+
+def _id_adjacency(g: Graph) -> Tuple:
+    """
+    Get the adjacency of a Graph or FrozenGraph by node id, for algorithms
+    which work on ids rather than nodes. For a Graph, the rows are its own
+    adjacency dicts and sets; for a FrozenGraph, they are slices of its CSR
+    arrays.
+
+    :param g: the graph
+    :return: a tuple of the ids of the nodes, the rows of outgoing and of
+        incoming edges indexed by id, a function from a node to its id and a
+        function from an id to its node
+    """
+    if isinstance(g, FrozenGraph):
+        return (range(len(g._nodes)),
+                _CSRRows(g._out_offsets, g._out_targets),
+                _CSRRows(g._in_offsets, g._in_targets),
+                g._index.__getitem__, g._nodes.__getitem__)
+
+    return ([i for (i, row) in enumerate(g._a_out) if row is not None],
+            g._a_out, g._a_in, g._index.id, g._index.node)
+
+
+class _CSRRows:
+    """
+    The rows of a CSR adjacency as a sequence of slices of its targets array,
+    indexed by node index.
+    """
+
+    __slots__ = ('_offsets', '_targets')
+
+    def __init__(self, offsets, targets):
+        """
+        Initialize a new _CSRRows.
+
+        :param offsets: the CSR offsets array
+        :param targets: the CSR targets array
+        """
+        self._offsets = offsets
+        self._targets = targets
+
+    def __getitem__(self, i: int):
+        return self._targets[self._offsets[i]:self._offsets[i + 1]]
+
+
+def _verify_no_heuristic(heuristic: Optional[Callable[[Node], float]])\
+        -> None:
+    """
+    Ensure that no heuristic was given for a bidirectional search, which only
+    supports Dijkstra's algorithm.
+
+    :param heuristic: the heuristic to check
+    :raises ValueError: if heuristic is not None
+    """
+    if heuristic is not None:
+        raise ValueError('a heuristic cannot be used with a bidirectional '
+                         'search')
+
+
+def _bidirectional_dijkstra(g: Graph, s: Node, t: Node)\
+        -> Tuple[float, List[Node]]:
+    """
+    Compute the shortest path from s to t by running Dijkstra's algorithm
+    forward from s over outgoing edges and backward from t over incoming edges
+    at the same time, always expanding the side with the smaller worklist.
+
+    Whenever a node has a tentative distance from both sides, the path through
+    it is a candidate for the shortest path. The search stops once the sum of
+    the smallest tentative distances of the two worklists is at least the
+    length of the best candidate, since no path found afterwards can be
+    shorter.
 
     :param g: the graph to operate on
     :param s: the start node
     :param t: the end node
-    :return: the distance of the shortest path from s to  in g
-    :raises ValueError: if there is no path from s to t in g
+    :return: a tuple of the distance and the list of nodes making up the
+        shortest path from s to t in g
+    :raises ValueError: if there is no path from s to t in g, or if g has
+        negative weights
     """
-    for (u, d_u) in DijkstraIterator(g, s):
-        if u == t:
-            return d_u
+    if not g.has_node(s):
+        raise ValueError(f'node {s} is not defined')
+    if not g.has_node(t):
+        raise ValueError(f'node {t} is not reachable from {s}')
+    if g.has_negative_weights():
+        raise ValueError('a bidirectional search cannot be used with '
+                         'negative weights')
+
+    # index 0 holds the forward search from s, index 1 the backward one from t
+    distances = ({s: 0}, {t: 0})
+    parents = ({s: None}, {t: None})
+    visited = (set(), set())
+    worklists = ([(0, 0, s)], [(0, 0, t)])
+    expand = (g.iter_neighbors, g.iter_parents)
+    order = itertools.count(1)
+
+    best, meeting = (0, s) if s == t else (math.inf, None)
+
+    while worklists[0] and worklists[1]:
+        # discard entries of visited nodes so the bound below is tight
+        for side in (0, 1):
+            while worklists[side] and worklists[side][0][2] in visited[side]:
+                heapq.heappop(worklists[side])
+        if not worklists[0] or not worklists[1] or\
+                worklists[0][0][0] + worklists[1][0][0] >= best:
+            break
+
+        side = 0 if len(worklists[0]) <= len(worklists[1]) else 1
+        other = 1 - side
+        (d_u, _, u) = heapq.heappop(worklists[side])
+        visited[side].add(u)
+
+        for v in expand[side](u):
+            if v in visited[side]:
+                continue
+
+            l_uv = g.weight(u, v) if side == 0 else g.weight(v, u)
+            if d_u + l_uv < distances[side].get(v, math.inf):
+                distances[side][v] = d_u + l_uv
+                parents[side][v] = u
+                heapq.heappush(worklists[side],
+                               (d_u + l_uv, next(order), v))
+
+            if v in distances[other]:
+                through_v = distances[side][v] + distances[other][v]
+                if through_v < best:
+                    best, meeting = through_v, v
+
+    if meeting is None:
+        raise ValueError(f'node {t} is not reachable from {s}')
+
+    path = []
+    u = meeting
+    while u is not None:
+        path.append(u)
+        u = parents[0][u]
+    path.reverse()
+    u = parents[1][meeting]
+    while u is not None:
+        path.append(u)
+        u = parents[1][u]
 
-    raise ValueError(f'node {t} is not reachable from {s}')
+    return best, path
@@ -0,0 +1,25 @@
+"""
+Internal utilities shared by the modules which build graphs.
+"""
+
+import gc
+
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector. Building a large graph creates
+    millions of containers which never form reference cycles, and each
+    collection triggered along the way would traverse the whole graph built
+    so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
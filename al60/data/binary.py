@@ -0,0 +1,180 @@
+"""
+Module for storing graphs in a binary file format which can be memory-mapped.
+
+A file holds the CSR arrays of a FrozenGraph and a table of its nodes:
+
+    header      magic, version, flags, section offsets and lengths
+    out_offsets int64[n + 1]
+    out_targets int32[m] or int64[m]
+    out_weights float64[m]
+    in_offsets  int64[n + 1]              (directed graphs only)
+    in_targets  int32[m] or int64[m]      (directed graphs only)
+    nodes       pickled list of the nodes in index order
+
+Every array starts at a multiple of 8 bytes and is stored in the byte order
+of the machine that wrote it. Loading a file maps it into memory and wraps
+the arrays in memoryviews, so the adjacency is never copied or parsed, and
+processes loading the same file share its pages through the page cache. Only
+the node table is unpickled, so only load files from trusted sources.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+from typing import BinaryIO, Union
+
+from .graphs import Graph, FrozenGraph
+
+_MAGIC = b'AL60CSR\0'
+_VERSION = 1
+
+# flags
+_DIRECTED = 1
+_BIG_ENDIAN = 2
+# the node table is sorted, see FrozenGraph
+_NATURAL_ORDER = 4
+
+# magic, version, flags, node count, target item size, then (offset, length)
+# in bytes of each of the six sections
+_HEADER = struct.Struct('<8sIIQI4x' + 'QQ' * 6)
+
+_SECTIONS = ('out_offsets', 'out_targets', 'out_weights',
+             'in_offsets', 'in_targets', 'nodes')
+
+
+def save_binary(graph: Graph, path: Union[str, os.PathLike]) -> None:
+    """
+    Write a graph to a binary file which can be opened with load_binary. A
+    Graph is frozen first, see FrozenGraph.
+
+    :param graph: the graph to write
+    :param path: the path of the file to write
+    """
+    frozen = graph if isinstance(graph, FrozenGraph) else FrozenGraph(graph)
+    directed = frozen.is_directed()
+
+    data = [frozen._out_offsets, frozen._out_targets, frozen._out_weights]
+    if directed:
+        data += [frozen._in_offsets, frozen._in_targets]
+    else:
+        data += [b'', b'']
+    data.append(pickle.dumps(frozen._nodes, pickle.HIGHEST_PROTOCOL))
+    data = [memoryview(d).cast('B') for d in data]
+
+    flags = (_DIRECTED if directed else 0) |\
+        (_BIG_ENDIAN if sys.byteorder == 'big' else 0) |\
+        (_NATURAL_ORDER if frozen._natural_order else 0)
+    itemsize = memoryview(frozen._out_targets).itemsize
+
+    layout = []
+    position = _align(_HEADER.size)
+    for section in data:
+        layout += [position, len(section)]
+        position = _align(position + len(section))
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, flags,
+                                len(frozen._nodes), itemsize, *layout))
+        for (section, offset) in zip(data, layout[::2]):
+            _pad(file, offset)
+            file.write(section)
+
+
+def load_binary(path: Union[str, os.PathLike]) -> FrozenGraph:
+    """
+    Open a graph written by save_binary. The file is memory-mapped read-only,
+    and the returned FrozenGraph reads its adjacency directly from the mapped
+    pages, which are loaded lazily by the operating system. The mapping is
+    released by closing the graph, see FrozenGraph.close.
+
+    :param path: the path of the file to open
+    :return: a FrozenGraph backed by the file
+    :raises ValueError: if the file is not a graph file of a supported version,
+        or was written on a machine of a different byte order
+    """
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        return _map_graph(path, buffer)
+    except BaseException:
+        buffer.close()
+        raise
+
+
+def _map_graph(path: Union[str, os.PathLike], buffer: mmap.mmap)\
+        -> FrozenGraph:
+    """
+    Check the header of a mapped graph file, and wrap its arrays in a
+    FrozenGraph. If the file is invalid, no view of buffer is left behind,
+    so that the caller can close it.
+
+    :param path: the path of the file, for error messages
+    :param buffer: the mapped file
+    :return: a FrozenGraph backed by buffer
+    :raises ValueError: if the file is not a graph file of a supported version,
+        or was written on a machine of a different byte order
+    """
+    if len(buffer) < _HEADER.size:
+        raise ValueError(f'{path} is not a graph file')
+    (magic, version, flags, n, itemsize, *layout) =\
+        _HEADER.unpack_from(buffer)
+
+    if magic != _MAGIC:
+        raise ValueError(f'{path} is not a graph file')
+    if version != _VERSION:
+        raise ValueError(f'graph file version {version} is not supported')
+    if bool(flags & _BIG_ENDIAN) != (sys.byteorder == 'big'):
+        raise ValueError(f'{path} was written with a different byte order')
+
+    sections = {name: (offset, length) for (name, offset, length)
+                in zip(_SECTIONS, layout[::2], layout[1::2])}
+    targets = 'i' if itemsize == 4 else 'q'
+    formats = [('out_offsets', 'q'), ('out_targets', targets),
+               ('out_weights', 'd'), ('in_offsets', 'q'),
+               ('in_targets', targets)]
+
+    # the arrays keep the mapping exported once view itself is released
+    with memoryview(buffer) as view:
+        (offset, length) = sections['nodes']
+        with view[offset:offset + length] as table:
+            nodes = pickle.loads(table)
+        if len(nodes) != n:
+            raise ValueError(f'{path} has a corrupt node table')
+
+        arrays = []
+        try:
+            for (name, fmt) in formats:
+                (offset, length) = sections[name]
+                arrays.append(view[offset:offset + length].cast(fmt))
+        except BaseException:
+            for section in arrays:
+                section.release()
+            raise
+
+    return FrozenGraph._from_arrays(
+        nodes, bool(flags & _DIRECTED), *arrays, mapping=buffer,
+        natural_order=bool(flags & _NATURAL_ORDER))
+
+
+def _align(position: int) -> int:
+    """
+    Round position up to the next multiple of 8.
+
+    :param position: a position in a file
+    :return: the aligned position
+    """
+    return (position + 7) & ~7
+
+
+def _pad(file: BinaryIO, offset: int) -> None:
+    """
+    Write zero bytes to file until it reaches offset.
+
+    :param file: the file being written
+    :param offset: the position to pad to
+    """
+    file.write(b'\0' * (offset - file.tell()))
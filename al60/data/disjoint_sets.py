@@ -0,0 +1,221 @@
+"""
+Module for disjoint-set (union-find) structures.
+"""
+
+from typing import Dict, Iterable, List, Set
+
+from .types import Node
+from .graphs import Undirected
+
+
+class DisjointSets:
+    """
+    A collection of disjoint sets of hashable elements, supporting near
+    constant time merging of two sets and lookup of the set an element belongs
+    to. Each set is a tree of elements rooted at a representative element.
+    Trees are merged by rank, and paths are compressed on lookup, so any
+    sequence of m operations on n elements takes O(m * a(n)) time, where a is
+    the inverse Ackermann function.
+
+    INVARIANTS:
+    1. self._parent[x] == x <=> x is the representative of its set
+    2. self._rank[x] is an upper bound on the height of the tree rooted at x
+    """
+
+    def __init__(self, elements: Iterable[Node] = ()):
+        """
+        Initialize a new DisjointSets, with each given element in a set of its
+        own.
+
+        :param elements: the elements to add
+        :raises ValueError: if an element is given more than once
+        """
+        self._parent: Dict[Node, Node] = dict()
+        self._rank: Dict[Node, int] = dict()
+        self._count = 0
+
+        for x in elements:
+            self.add(x)
+
+    def add(self, x: Node) -> None:
+        """
+        Add x as a new set containing only x.
+
+        :param x: the element to add
+        :raises ValueError: if x is already an element
+        """
+        if x in self._parent:
+            raise ValueError(f'element {x} is already defined')
+
+        self._parent[x] = x
+        self._rank[x] = 0
+        self._count += 1
+
+    def find(self, x: Node) -> Node:
+        """
+        Find the representative of the set containing x. Every element on the
+        path from x to the representative is pointed directly at the
+        representative.
+
+        :param x: the element to look up
+        :return: the representative of the set containing x
+        :raises ValueError: if x is not an element
+        """
+        if x not in self._parent:
+            raise ValueError(f'element {x} is not defined')
+
+        root = x
+        while self._parent[root] != root:
+            root = self._parent[root]
+
+        while self._parent[x] != root:
+            self._parent[x], x = root, self._parent[x]
+
+        return root
+
+    def union(self, x: Node, y: Node) -> bool:
+        """
+        Merge the sets containing x and y. The root of lower rank is attached
+        to the root of higher rank.
+
+        :param x: an element of the first set
+        :param y: an element of the second set
+        :return: True if two sets were merged, False if x and y were already
+            in the same set
+        :raises ValueError: if x or y is not an element
+        """
+        x_root = self.find(x)
+        y_root = self.find(y)
+
+        if x_root == y_root:
+            return False
+
+        if self._rank[x_root] < self._rank[y_root]:
+            x_root, y_root = y_root, x_root
+        self._parent[y_root] = x_root
+        if self._rank[x_root] == self._rank[y_root]:
+            self._rank[x_root] += 1
+
+        self._count -= 1
+        return True
+
+    def connected(self, x: Node, y: Node) -> bool:
+        """
+        Check whether x and y are in the same set.
+
+        :param x: the first element
+        :param y: the second element
+        :return: True if x and y are in the same set, else False
+        :raises ValueError: if x or y is not an element
+        """
+        return self.find(x) == self.find(y)
+
+    def count(self) -> int:
+        """
+        Get the number of disjoint sets.
+
+        :return: the number of sets
+        """
+        return self._count
+
+    def sets(self) -> List[Set[Node]]:
+        """
+        Get the disjoint sets.
+
+        :return: a list of the sets of elements
+        """
+        groups: Dict[Node, Set[Node]] = dict()
+        for x in self._parent:
+            groups.setdefault(self.find(x), set()).add(x)
+        return list(groups.values())
+
+    def __contains__(self, x) -> bool:
+        return x in self._parent
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+
+class ConnectedComponents:
+    """
+    The connected components of an undirected graph, kept up to date as nodes
+    and edges are added. Nodes and edges must be added through this object
+    rather than the graph itself, so that each addition also updates the
+    underlying DisjointSets in near constant time, and connectivity queries
+    never need to search the graph.
+
+    Since a DisjointSets cannot split sets, removing nodes or edges is not
+    supported. After removing anything from the graph, create a new
+    ConnectedComponents.
+    """
+
+    def __init__(self, graph: Undirected):
+        """
+        Initialize a new ConnectedComponents for the current nodes and edges of
+        graph in O((|V| + |E|) * a(|V|)) time.
+
+        :param graph: the undirected graph to track
+        """
+        self._graph = graph
+        self._sets = DisjointSets(graph.nodes())
+
+        for u in graph.nodes():
+            for v in graph.iter_neighbors(u):
+                self._sets.union(u, v)
+
+    @property
+    def graph(self) -> Undirected:
+        """
+        The graph whose components are tracked.
+        """
+        return self._graph
+
+    def add_node(self, node: Node) -> None:
+        """
+        Add a node to the graph as a new component.
+
+        :param node: the value to reference this node by
+        :raises ValueError: if node is a previously defined node
+        """
+        self._graph.add_node(node)
+        self._sets.add(node)
+
+    def add_edge(self, u: Node, v: Node, weight: float = None) -> None:
+        """
+        Add an edge between u and v to the graph, merging their components.
+
+        :param u: the first node
+        :param v: the second node
+        :param weight: the weight of the edge
+        :raises ValueError: if u or v is not a defined node or (u, v)/(v, u) is
+            a previously defined edge
+        """
+        self._graph.add_edge(u, v, weight)
+        self._sets.union(u, v)
+
+    def connected(self, u: Node, v: Node) -> bool:
+        """
+        Check whether there is a path between u and v.
+
+        :param u: the first node
+        :param v: the second node
+        :return: True if u and v are in the same component, else False
+        :raises ValueError: if u or v is not a defined node
+        """
+        return self._sets.connected(u, v)
+
+    def count(self) -> int:
+        """
+        Get the number of connected components.
+
+        :return: the number of components
+        """
+        return self._sets.count()
+
+    def components(self) -> List[Set[Node]]:
+        """
+        Get the connected components.
+
+        :return: a list of sets of nodes making up the components
+        """
+        return self._sets.sets()
@@ -0,0 +1,269 @@
+"""
+Module for generating large synthetic graphs from seeded random models.
+
+Every generator takes a seed, and the same arguments and seed always produce
+the same graph. The edges of a graph are generated up front and added in one
+batch, skipping the per-edge checks of Graph.add_edge, since each model only
+produces valid and distinct edges.
+"""
+
+import math
+import random
+
+from itertools import repeat
+from typing import Iterator, List, Tuple
+
+from .types import Edge
+from .graphs import Graph, Undirected
+from ._util import gc_paused
+
+
+def erdos_renyi(n: int, p: float, seed: int = None, directed: bool = True,
+                weights: Tuple[float, float] = None) -> Graph:
+    """
+    Generate a G(n, p) random graph on the nodes 0..n-1, where each possible
+    edge is present independently with probability p. Self-loops are never
+    generated. The edges are sampled by skipping over the absent ones
+    (Batagelj and Brandes), so this takes time proportional to the number of
+    edges rather than n ** 2.
+
+    :param n: the number of nodes
+    :param p: the probability of each edge
+    :param seed: the random seed
+    :param directed: whether to generate a Graph rather than an Undirected
+    :param weights: the (low, high) range of uniformly random edge weights,
+        None to give every edge the default weight
+    :return: the generated graph
+    :raises ValueError: if p is not in [0, 1]
+    """
+    _verify_probability(p)
+    rand = random.Random(seed)
+
+    if directed:
+        # number the n * (n - 1) ordered pairs so that pair k is
+        # (k // (n - 1), k % (n - 1)), with v shifted past u to skip self-loops
+        pairs = []
+        for k in _skip_sample(n * (n - 1), p, rand):
+            (u, r) = divmod(k, n - 1)
+            pairs.append((u, r + (r >= u)))
+        return _build(Graph(), n, pairs, weights, rand)
+
+    return _build(Undirected(), n, list(_lower_pairs(n, p, rand)), weights,
+                  rand)
+
+
+def random_dag(n: int, p: float, seed: int = None,
+               weights: Tuple[float, float] = None) -> Graph:
+    """
+    Generate a random directed acyclic graph on the nodes 0..n-1, where each
+    edge (u, v) with u < v is present independently with probability p. The
+    nodes in increasing order are therefore a topological order of the graph.
+
+    :param n: the number of nodes
+    :param p: the probability of each edge
+    :param seed: the random seed
+    :param weights: the (low, high) range of uniformly random edge weights,
+        None to give every edge the default weight
+    :return: the generated graph
+    :raises ValueError: if p is not in [0, 1]
+    """
+    _verify_probability(p)
+    rand = random.Random(seed)
+    pairs = [(u, v) for (v, u) in _lower_pairs(n, p, rand)]
+    return _build(Graph(), n, pairs, weights, rand)
+
+
+def grid(rows: int, cols: int, directed: bool = False) -> Graph:
+    """
+    Generate a rows x cols grid graph. Each node is an (x, y) tuple with
+    0 <= x < cols and 0 <= y < rows, and is connected to the nodes above,
+    below, left and right of it. A directed grid has an edge in each
+    direction between neighboring nodes.
+
+    :param rows: the number of rows
+    :param cols: the number of columns
+    :param directed: whether to generate a Graph rather than an Undirected
+    :return: the generated graph
+    """
+    pairs = [((x, y), (x + 1, y))
+             for y in range(rows) for x in range(cols - 1)]
+    pairs += [((x, y), (x, y + 1))
+              for y in range(rows - 1) for x in range(cols)]
+    if directed:
+        pairs += [(v, u) for (u, v) in pairs]
+
+    g = Graph() if directed else Undirected()
+    with gc_paused():
+        g.add_nodes(*((x, y) for y in range(rows) for x in range(cols)))
+        g._insert_edges(pairs, repeat(g._default_weight))
+    return g
+
+
+def barabasi_albert(n: int, m: int, seed: int = None) -> Undirected:
+    """
+    Generate a Barabasi-Albert preferential attachment graph on the nodes
+    0..n-1. Starting from m isolated nodes, each new node is connected to m
+    distinct existing nodes, chosen with probability proportional to their
+    degree, which gives a power-law degree distribution.
+
+    :param n: the number of nodes
+    :param m: the number of edges added with each new node
+    :param seed: the random seed
+    :return: the generated graph
+    :raises ValueError: if m is not in [1, n)
+    """
+    if not 1 <= m < n:
+        raise ValueError(f'm must be at least 1 and less than n, got {m}')
+
+    rand = random.Random(seed)
+    pairs = []
+    # each node appears here once per incident edge, so a uniform choice is a
+    # choice proportional to degree
+    ends = []
+    targets = list(range(m))
+    for u in range(m, n):
+        pairs.extend(zip(repeat(u), targets))
+        ends.extend(targets)
+        ends.extend(repeat(u, m))
+
+        chosen = set()
+        while len(chosen) < m:
+            chosen.add(rand.choice(ends))
+        targets = list(chosen)
+
+    g = Undirected()
+    with gc_paused():
+        g.add_nodes(*range(n))
+        g._insert_edges(pairs, repeat(g._default_weight))
+    return g
+
+
+def road_network(rows: int, cols: int, seed: int = None,
+                 removal: float = 0.1, diagonals: float = 0.2) -> Undirected:
+    """
+    Generate a planar, road-like graph. Each node is an (x, y) point jittered
+    randomly inside its own unit cell of a rows x cols grid, and is connected
+    to its neighbors in the grid, except that a fraction of the grid edges is
+    removed and a single diagonal is added to a fraction of the cells. Each
+    edge is weighted by the Euclidean distance between its endpoints, so
+    math.dist(v, t) is a consistent heuristic for finding a path to t.
+
+    The graph is not guaranteed to be connected when removal is positive.
+
+    :param rows: the number of rows
+    :param cols: the number of columns
+    :param seed: the random seed
+    :param removal: the probability that each grid edge is removed
+    :param diagonals: the probability that each cell gets a diagonal edge
+    :return: the generated graph
+    :raises ValueError: if removal or diagonals is not in [0, 1]
+    """
+    _verify_probability(removal)
+    _verify_probability(diagonals)
+    rand = random.Random(seed)
+
+    # keeping each point in the middle of its cell keeps the points distinct
+    # and the diagonals of different cells from crossing
+    points = [[(x + rand.uniform(0.1, 0.9), y + rand.uniform(0.1, 0.9))
+               for x in range(cols)] for y in range(rows)]
+
+    pairs = []
+    for y in range(rows):
+        for x in range(cols):
+            if x + 1 < cols and rand.random() >= removal:
+                pairs.append((points[y][x], points[y][x + 1]))
+            if y + 1 < rows and rand.random() >= removal:
+                pairs.append((points[y][x], points[y + 1][x]))
+            if x + 1 < cols and y + 1 < rows and rand.random() < diagonals:
+                if rand.random() < 0.5:
+                    pairs.append((points[y][x], points[y + 1][x + 1]))
+                else:
+                    pairs.append((points[y][x + 1], points[y + 1][x]))
+
+    g = Undirected()
+    with gc_paused():
+        g.add_nodes(*(point for row in points for point in row))
+        g._insert_edges(pairs, [math.dist(u, v) for (u, v) in pairs])
+    return g
+
+
+def _build(g: Graph, n: int, pairs: List[Edge], weights: Tuple[float, float],
+           rand: random.Random) -> Graph:
+    """
+    Add the nodes 0..n-1 and the given edges to an empty graph.
+
+    :param g: the graph to add to
+    :param n: the number of nodes
+    :param pairs: the distinct (u, v) pairs to add as edges
+    :param weights: the (low, high) range of uniformly random edge weights,
+        None to give every edge the default weight
+    :param rand: the random number generator to draw weights from
+    :return: g
+    """
+    if weights is None:
+        edge_weights = repeat(g._default_weight)
+    else:
+        (low, high) = weights
+        edge_weights = [rand.uniform(low, high) for _ in pairs]
+
+    with gc_paused():
+        g.add_nodes(*range(n))
+        g._insert_edges(pairs, edge_weights)
+    return g
+
+
+def _lower_pairs(n: int, p: float, rand: random.Random) -> Iterator[Edge]:
+    """
+    Sample each pair (v, w) with 0 <= w < v < n independently with
+    probability p.
+
+    :param n: the number of nodes
+    :param p: the probability of each pair
+    :param rand: the random number generator
+    :return: an iterator over the sampled pairs, ordered by v and then w
+    """
+    v, w = 1, -1
+    for k in _skip_sample(n * (n - 1) // 2, p, rand):
+        # pair (v, w) is number v * (v - 1) // 2 + w, and the numbers only
+        # increase, so walk v forward until w fits in its row
+        w = k - v * (v - 1) // 2
+        while w >= v:
+            w -= v
+            v += 1
+        yield v, w
+
+
+def _skip_sample(total: int, p: float, rand: random.Random) -> Iterator[int]:
+    """
+    Sample each integer in [0, total) independently with probability p, by
+    drawing the geometrically distributed gaps between the sampled integers.
+
+    :param total: the number of integers to sample from
+    :param p: the probability of each integer
+    :param rand: the random number generator
+    :return: an iterator over the sampled integers in increasing order
+    """
+    if p <= 0:
+        return
+    if p >= 1:
+        yield from range(total)
+        return
+
+    log_q = math.log1p(-p)
+    k = -1
+    while True:
+        k += 1 + int(math.log1p(-rand.random()) / log_q)
+        if k >= total:
+            return
+        yield k
+
+
+def _verify_probability(p: float) -> None:
+    """
+    Ensure that p is a probability.
+
+    :param p: the value to check
+    :raises ValueError: if p is not in [0, 1]
+    """
+    if not 0 <= p <= 1:
+        raise ValueError(f'probability must be in [0, 1], got {p}')
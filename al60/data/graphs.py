@@ -2,8 +2,17 @@
 Module for graph representations.
 """
 
-from typing import Set, Dict, Any
+import copy
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Set as AbstractSet
+from itertools import chain, islice, repeat
+from typing import Set, Dict, List, Tuple, Iterable, Iterator, Callable,\
+    Optional, Any, Collection
+from weakref import WeakKeyDictionary
 from .types import Node, Edge
+from .node_index import NodeIndex
 
 
 class Graph:
@@ -17,8 +26,26 @@ class Graph:
     {1}.add(True) remains {1}. This means that if 1 is a defined node, a node
     True cannot be defined, and vice versa. The same goes for 0 and False.
 
+    Each node is interned as a dense integer id by a NodeIndex when it is
+    added. The adjacency is stored by id in lists indexed by id: _a_out[i]
+    maps the id of each node i has an edge to onto the weight of the edge,
+    and _a_in[j] is the set of ids of the nodes with an edge to j. Nodes are
+    only translated to and from ids at the boundary of the public methods, so
+    adjacency and weight lookups hash ints rather than node objects and never
+    build (u, v) tuples.
+
+    A graph and its snapshots share their index and rows until they are
+    mutated, see snapshot. Before mutating rows in place, a method must call
+    _writable with the ids of the rows it is about to mutate.
+
     INVARIANTS:
-    1. v in self._a_out[u] <=> u in self._a_in[v]
+    1. j in self._a_out[i] <=> i in self._a_in[j]
+    2. self._a_out[i] is None <=> self._a_in[i] is None <=> i is not the id
+       of a defined node
+    3. self._owned is None <=> no snapshot shares any structure with this
+       graph; otherwise the rows with ids in self._owned are only referenced
+       by this graph, and self._shared is True <=> the index and the lists of
+       rows may be referenced by a snapshot
     """
 
     def __init__(self, other: 'Graph' = None, default_weight: float = 1):
@@ -30,30 +57,119 @@ class Graph:
 
         :param other: a Graph to copy
         :param default_weight: the weight to give new edges if unspecified
+        :raises TypeError: if other is not a Graph, such as a FrozenGraph
         """
+        if other is not None:
+            self._verify_copyable(other)
         if other:
-            self._nodes: Set[Node] = set(other._nodes)
-            self._a_in: Dict[Node, Set[Node]] =\
-                {u: set(other._a_in[u]) for u in other._a_in}
-            self._a_out: Dict[Node, Set[Node]] =\
-                {u: set(other._a_out[u]) for u in other._a_out}
-            self._weights: Dict[Edge, float] =\
-                {key: default_weight for key in self.edges()}
+            self._index: NodeIndex = NodeIndex(other._index)
+            self._a_in: List[Optional[Set[int]]] =\
+                [None if row is None else set(row) for row in other._a_in]
+            self._a_out: List[Optional[Dict[int, float]]] =\
+                [None if row is None else dict.fromkeys(row, default_weight)
+                 for row in other._a_out]
         else:
-            self._nodes: Set[Node] = set()
-            self._a_in: Dict[Node, Set[Node]] = dict()
-            self._a_out: Dict[Node, Set[Node]] = dict()
-            self._weights: Dict[Edge, float] = dict()
+            self._index: NodeIndex = NodeIndex()
+            self._a_in: List[Optional[Set[int]]] = list()
+            self._a_out: List[Optional[Dict[int, float]]] = list()
         self._default_weight = default_weight
+        self._sorted = _SortedAdjacency()
+        self._owned: Optional[Set[int]] = None
+        self._shared = False
+        self._version = 0
+        # the version at which the weights were last checked, and the result
+        self._negative: Tuple[int, bool] = (-1, False)
+
+    @staticmethod
+    def _verify_copyable(other) -> None:
+        """
+        Ensure that other is a Graph, whose rows can be copied into a new
+        graph.
+
+        :param other: the object to check
+        :raises TypeError: if other is not a Graph
+        """
+        if not isinstance(other, Graph):
+            raise TypeError(f'can only copy a Graph, not a '
+                            f'{type(other).__name__}')
+
+    @property
+    def version(self) -> int:
+        """
+        The number of mutations made to this graph since it was created. It
+        increases with every change to its nodes or edges, so a result
+        computed from this graph is still valid as long as the version is
+        unchanged.
+
+        :return: the version of this graph
+        """
+        return self._version
 
-    def _verify_node_defined(self, u: Node) -> None:
+    def snapshot(self) -> 'Graph':
+        """
+        Take a copy-on-write snapshot of this graph in O(1) time. The snapshot
+        is a graph of the same class with the same nodes, edges and weights,
+        which shares its structure with this graph instead of copying it.
+        Either graph can then be mutated without affecting the other: the
+        adjacency row of each node is copied the first time a mutation
+        touches it, so the memory used by the rows only grows with the part
+        of the graph that changes.
+
+        The first mutation of either graph after a snapshot also copies the
+        node index and the two lists of rows, which hold a few references per
+        node. That mutation therefore takes O(|V|) time and memory, however
+        little it changes; only the edges are shared copy-on-write at a finer
+        grain.
+
+        :return: the snapshot
+        """
+        snap = copy.copy(self)
+        snap._sorted = _SortedAdjacency()
+        # rows this graph owned until now are shared with the snapshot
+        self._owned, snap._owned = set(), set()
+        self._shared = snap._shared = True
+        return snap
+
+    def _writable(self, *ids: int) -> None:
+        """
+        Prepare the rows of the given ids to be mutated in place, copying any
+        structure which is still shared with a snapshot, and count the
+        mutation in version. Must be called once before every mutation;
+        called with no ids, it only prepares the index and the lists of rows,
+        so that nodes can be added or removed.
+
+        :param ids: the ids of the rows about to be mutated
+        """
+        self._version += 1
+        if self._owned is None:
+            return
+
+        if self._shared:
+            self._index = NodeIndex(self._index)
+            a_out = list(self._a_out)
+            self._a_in = a_out if self._a_in is self._a_out else\
+                list(self._a_in)
+            self._a_out = a_out
+            self._shared = False
+
+        for i in ids:
+            if i not in self._owned:
+                self._a_out[i] = dict(self._a_out[i])
+                if self._a_in is not self._a_out:
+                    self._a_in[i] = set(self._a_in[i])
+                self._owned.add(i)
+
+    def _verify_node_defined(self, u: Node) -> int:
         """
         Ensure that u is a defined node in this Graph.
 
         :param u: the node to check
+        :return: the id of u
         :raises ValueError: if u is not a defined node
         """
-        if u not in self._nodes:
+        try:
+            return self._index.id(u)
+        except (KeyError, TypeError):
             raise ValueError(f'node {_quoted(u)} is not defined')
 
     def _verify_node_undefined(self, u: Node) -> None:
@@ -63,26 +179,28 @@ class Graph:
         :param u: the node to check
         :raises ValueError: if u is a defined node
         """
-        if u in self._nodes:
+        if u in self._index:
             raise ValueError(f'node {_quoted(u)} is already defined')
 
-    def _verify_edge_defined(self, u: Node, v: Node) -> None:
+    def _verify_edge_defined(self, u: Node, v: Node) -> Tuple[int, int]:
         """
         Ensure that (u, v) is a defined edge in this Graph. Implicitly verifies
         if u and v are defined nodes in this Graph.
 
         :param u: the 'from' node of the edge to check
         :param v: the 'to' node of the edge to check
+        :return: the ids of u and v
         :raises ValueError: if (u, v) is not a defined edge
         """
         # TODO: Create _verify_nodes_defined(u*)
-        self._verify_node_defined(u)
-        self._verify_node_defined(v)
+        i = self._verify_node_defined(u)
+        j = self._verify_node_defined(v)
 
-        # could also be u not in self._a_in[v] due to invariant 1
-        if v not in self._a_out[u]:
+        # could also be i not in self._a_in[j] due to invariant 1
+        if j not in self._a_out[i]:
             raise ValueError(f'edge ({_quoted(u)}, {_quoted(v)})'
                              f'is not defined')
+        return i, j
 
     def _verify_edge_undefined(self, u: Node, v: Node) -> None:
         """
@@ -92,14 +210,24 @@ class Graph:
         :param v: the 'to' node of the edge to check
         :raises ValueError: if (u, v) is a defined edge
         """
-        try:
-            # could also be u in self._a_in[v] due to invariant 1
-            if v in self._a_out[u]:
-                raise ValueError(f'edge ({_quoted(u)}, {_quoted(v)})'
-                                 f'is already defined')
-        except KeyError:
-            # u is not a defined node, edge does not exist
-            pass
+        i = self._index.get(u)
+        j = self._index.get(v)
+        # if u or v is not a defined node, the edge does not exist
+        # could also be i in self._a_in[j] due to invariant 1
+        if i is not None and j is not None and j in self._a_out[i]:
+            raise ValueError(f'edge ({_quoted(u)}, {_quoted(v)})'
+                             f'is already defined')
+
+    def _pair_ids(self, pairs: Iterable[Edge]) -> Iterator[Tuple[int, int]]:
+        """
+        Translate (u, v) pairs of defined nodes into pairs of ids, lazily.
+
+        :param pairs: the (u, v) pairs to translate
+        :return: an iterator over the (id of u, id of v) pairs, in order
+        """
+        ids = self._index.ids(chain.from_iterable(pairs))
+        # zip draws from the same iterator twice, pairing consecutive ids
+        return zip(ids, ids)
 
     def nodes(self) -> Set[Node]:
         """
@@ -107,7 +235,20 @@ class Graph:
 
         :return: the set of defined nodes
         """
-        return set(self._nodes)
+        return set(self._index)
+
+    def has_node(self, u: Node) -> bool:
+        """
+        Check whether u is a defined node in this graph without copying the
+        set of nodes.
+
+        :param u: the node to check
+        :return: True if u is a defined node, else False
+        """
+        try:
+            return u in self._index
+        except TypeError:
+            return False
 
     def edges(self) -> Set[Edge]:
         """
@@ -116,11 +257,10 @@ class Graph:
 
         :return: the set of defined edges
         """
-        e = set()
-        for u in self._nodes:
-            for v in self._a_out[u]:
-                e.add((u, v))
-        return e
+        # free ids have no node, but their rows are None and are skipped
+        nodes = list(self._index.nodes(range(len(self._a_out))))
+        return {(nodes[i], nodes[j])
+                for (i, row) in enumerate(self._a_out) if row for j in row}
 
     def weight(self, u: Node, v: Node) -> float:
         """
@@ -131,8 +271,24 @@ class Graph:
         :return: the weight of edge (u, v)
         :raises ValueError: if (u, v) is not an existing edge
         """
-        self._verify_edge_defined(u, v)
-        return self._weights[(u, v)]
+        (i, j) = self._verify_edge_defined(u, v)
+        return self._a_out[i][j]
+
+    def has_negative_weights(self) -> bool:
+        """
+        Check whether any edge of this graph has a negative weight, in which
+        case Dijkstra's algorithm does not find shortest paths. The answer is
+        kept until the graph is next mutated, so only the first call after a
+        mutation scans the edges.
+
+        :return: True if some edge has a negative weight, else False
+        """
+        (version, negative) = self._negative
+        if version != self._version:
+            negative = any(min(row.values()) < 0
+                           for row in self._a_out if row)
+            self._negative = (self._version, negative)
+        return negative
 
     def parents(self, v: Node) -> Set[Node]:
         """
@@ -142,8 +298,8 @@ class Graph:
         :return: the parents of v
         :raises ValueError: if v is not a defined node
         """
-        self._verify_node_defined(v)
-        return set(self._a_in[v])
+        j = self._verify_node_defined(v)
+        return set(self._index.nodes(self._a_in[j]))
 
     # TODO: Change to children?
     def neighbors(self, u: Node) -> Set[Node]:
@@ -154,8 +310,80 @@ class Graph:
         :return: the neighbors of u
         :raises ValueError: if u is not a defined node
         """
-        self._verify_node_defined(u)
-        return set(self._a_out[u])
+        i = self._verify_node_defined(u)
+        return set(self._index.nodes(self._a_out[i]))
+
+    def parents_view(self, v: Node) -> 'AdjacencyView':
+        """
+        Get a read-only view of the nodes which have outgoing edges to v. The
+        view is not a copy, so it reflects later changes made to this graph,
+        and it must not be iterated over while this graph is being mutated.
+
+        :param v: the node to get the parents of
+        :return: a view of the parents of v
+        :raises ValueError: if v is not a defined node
+        """
+        j = self._verify_node_defined(v)
+        return AdjacencyView(self._index, self._a_in[j])
+
+    def neighbors_view(self, u: Node) -> 'AdjacencyView':
+        """
+        Get a read-only view of the nodes which u has outgoing edges to. The
+        view is not a copy, so it reflects later changes made to this graph,
+        and it must not be iterated over while this graph is being mutated.
+
+        :param u: the node to get the neighbors of
+        :return: a view of the neighbors of u
+        :raises ValueError: if u is not a defined node
+        """
+        i = self._verify_node_defined(u)
+        return AdjacencyView(self._index, self._a_out[i])
+
+    def iter_parents(self, v: Node) -> Iterator[Node]:
+        """
+        Iterate over the nodes which have outgoing edges to v without copying
+        them.
+
+        :param v: the node to get the parents of
+        :return: an iterator over the parents of v
+        :raises ValueError: if v is not a defined node
+        """
+        j = self._verify_node_defined(v)
+        return self._index.nodes(self._a_in[j])
+
+    def iter_neighbors(self, u: Node) -> Iterator[Node]:
+        """
+        Iterate over the nodes which u has outgoing edges to without copying
+        them.
+
+        :param u: the node to get the neighbors of
+        :return: an iterator over the neighbors of u
+        :raises ValueError: if u is not a defined node
+        """
+        i = self._verify_node_defined(u)
+        return self._index.nodes(self._a_out[i])
+
+    def sorted_neighbors(self, u: Node, key: Callable[[Node], Any] = None)\
+            -> Tuple[Node, ...]:
+        """
+        Get the neighbors of u sorted by key. The result is cached per key
+        function until the neighbors of u change, so repeated traversals with
+        the same key function do not sort again. Key functions are held
+        weakly, so pass the same function object to benefit from the cache.
+
+        The cache is keyed by the identity of the key function, so the key
+        must be pure: if what it returns for a node changes, such as a
+        closure over a dict which is later mutated, the cached order is
+        silently stale. Pass a new function object whenever the keys change,
+        or use sorted(self.iter_neighbors(u), key=key) to bypass the cache.
+
+        :param u: the node to get the neighbors of
+        :param key: a function of one argument used to extract a comparison
+            key from each neighbor, None to compare the neighbors themselves
+        :return: a tuple of the neighbors of u in sorted order
+        :raises ValueError: if u is not a defined node
+        """
+        return self._sorted.get(self, u, key)
 
     def add_node(self, node: Node) -> None:
         """
@@ -165,10 +393,8 @@ class Graph:
         :raises ValueError: if name is a previously defined node
         """
         self._verify_node_undefined(node)
-
-        self._nodes.add(node)
-        self._a_in[node] = set()
-        self._a_out[node] = set()
+        self._writable()
+        self._add_rows(self._index.add(node))
 
     def add_nodes(self, *nodes: Node) -> None:
         """
@@ -180,12 +406,32 @@ class Graph:
         :raises ValueError: if any name is a previously defined node
         """
         # TODO: Replace with some _verify method
-        prev = set(nodes).intersection(self.nodes())
+        prev = self._index.defined(nodes)
         if prev:
             raise ValueError(f'nodes {prev} are already defined')
+        if len(set(nodes)) < len(nodes):
+            raise ValueError(f'nodes {nodes} contain duplicates')
 
+        # the whole batch is verified, so add the nodes directly
+        self._writable()
         for name in nodes:
-            self.add_node(name)
+            self._add_rows(self._index.add(name))
+
+    def _add_rows(self, i: int) -> None:
+        """
+        Create the empty adjacency rows of a new node.
+
+        :param i: the id of the new node
+        """
+        if i == len(self._a_out):
+            self._a_in.append(set())
+            self._a_out.append(dict())
+        else:
+            # i is a reused id
+            self._a_in[i] = set()
+            self._a_out[i] = dict()
+        if self._owned is not None:
+            self._owned.add(i)
 
     def add_edge(self, u: Node, v: Node, weight: float = None) -> None:
         """
@@ -197,30 +443,125 @@ class Graph:
         :raises ValueError: if u or v is not a defined node or (u, v) is a
             previously defined edge
         """
-        self._verify_node_defined(u)
-        self._verify_node_defined(v)
+        i = self._verify_node_defined(u)
+        j = self._verify_node_defined(v)
         self._verify_edge_undefined(u, v)
 
-        self._a_in[v].add(u)
-        self._a_out[u].add(v)
+        self._writable(i, j)
+        self._a_in[j].add(i)
+        self._a_out[i][j] = weight if weight else self._default_weight
+        self._sorted.invalidate(u, v)
+
+    def add_edges_from(self, edges: Iterable[tuple]) -> None:
+        """
+        Add a batch of edges in one call. Each edge is a tuple (u, v) or
+        (u, v, weight). The whole batch is verified at once before any edge is
+        added, so if any edge is invalid, an exception is raised without
+        adding any new edges. This is several times faster than calling
+        add_edge for each edge.
+
+        :param edges: the edges to add
+        :raises ValueError: if any endpoint is not a defined node, or any edge
+            is a previously defined edge or appears more than once in edges
+        """
+        (pairs, weights) = self._edge_batch(edges)
+        self._insert_edges(pairs, weights)
+
+    def _insert_edges(self, pairs: List[Edge], weights: Iterable[float])\
+            -> None:
+        """
+        Add a batch of edges without verifying them. Assumes every endpoint is
+        a defined node and no edge is defined or appears more than once.
+
+        :param pairs: the (u, v) pairs to add
+        :param weights: the weight of each pair, in the same order
+        """
+        ids = self._writable_pair_ids(pairs)
+        a_in, a_out = self._a_in, self._a_out
+        for ((i, j), w) in zip(ids, weights):
+            a_out[i][j] = w
+            a_in[j].add(i)
+        self._sorted.clear()
+
+    def _writable_pair_ids(self, pairs: List[Edge])\
+            -> Iterable[Tuple[int, int]]:
+        """
+        Translate (u, v) pairs of defined nodes into pairs of ids, and prepare
+        the rows of all of them to be mutated, see _writable.
 
-        if weight:
-            self._weights[(u, v)] = weight
+        :param pairs: the (u, v) pairs to translate
+        :return: the (id of u, id of v) pairs, in order
+        """
+        ids = self._pair_ids(pairs)
+        if self._owned is None:
+            # nothing is shared, so there are no rows to prepare
+            self._writable()
         else:
-            self._weights[(u, v)] = self._default_weight
+            ids = list(ids)
+            self._writable(*set(chain.from_iterable(ids)))
+        return ids
+
+    def _edge_batch(self, edges: Iterable[tuple])\
+            -> Tuple[List[Edge], List[float]]:
+        """
+        Split a batch of edges into (u, v) pairs and weights, giving edges
+        without a weight the default weight, and verify that all of them can
+        be added to this graph.
+
+        :param edges: the (u, v) or (u, v, weight) tuples to split
+        :return: a tuple of the list of (u, v) pairs and the list of weights
+        :raises ValueError: if any endpoint is not a defined node, or any edge
+            is a previously defined edge or appears more than once in edges
+        """
+        batch = edges if isinstance(edges, list) else list(edges)
+        default = self._default_weight
+        pairs = [edge[:2] for edge in batch]
+        weights = [edge[2] if len(edge) > 2 and edge[2] else default
+                   for edge in batch]
+
+        undefined = self._index.undefined(chain.from_iterable(pairs))
+        if undefined:
+            raise ValueError(f'nodes {undefined} are not defined')
+
+        self._verify_edges_undefined(pairs)
+        return pairs, weights
+
+    def _verify_edges_undefined(self, pairs: List[Edge]) -> None:
+        """
+        Ensure that no edge of pairs is a defined edge in this Graph or appears
+        more than once in pairs. Assumes every endpoint is a defined node.
+
+        :param pairs: the (u, v) pairs to check
+        :raises ValueError: if any edge is defined or appears more than once
+        """
+        if len(set(pairs)) < len(pairs):
+            raise ValueError('edges contain duplicates')
+
+        a_out = self._a_out
+        defined = [(u, v) for ((u, v), (i, j))
+                   in zip(pairs, self._pair_ids(pairs)) if j in a_out[i]]
+        if defined:
+            raise ValueError(f'edges {defined} are already defined')
 
     def remove_node(self, u: Node) -> None:
         """
-        Remove the node u from this graph.
+        Remove the node u from this graph, along with every edge to or from u.
 
         :param u: the node to remove
         :raises ValueError: if u is not a defined node
         """
-        self._verify_node_defined(u)
-
-        self._nodes.remove(u)
-        del self._a_in[u]
-        del self._a_out[u]
+        i = self._verify_node_defined(u)
+        self._writable(i, *self._a_out[i], *self._a_in[i])
+
+        # the id of u will be reused, so no row may refer to it afterwards
+        for j in self._a_out[i]:
+            self._a_in[j].discard(i)
+        for j in self._a_in[i]:
+            self._a_out[j].pop(i, None)
+        self._a_in[i] = None
+        self._a_out[i] = None
+        self._index.remove(u)
+        self._sorted.clear()
 
     def remove_edge(self, u: Node, v: Node) -> None:
         """
@@ -230,16 +571,26 @@ class Graph:
         :param v: the 'to' node of the edge to be removed
         :raises ValueError: if edge (u, v) does not exist in this graph
         """
-        self._verify_edge_defined(u, v)
+        (i, j) = self._verify_edge_defined(u, v)
 
-        self._a_out[u].remove(v)
-        self._a_in[v].remove(u)
+        self._writable(i, j)
+        del self._a_out[i][j]
+        self._a_in[j].remove(i)
+        self._sorted.invalidate(u, v)
 
     def __eq__(self, other):
-        if isinstance(other, Graph):
-            return (self._nodes == other._nodes and
-                    self._a_in == other._a_in and
-                    self._a_out == other._a_out)
+        if isinstance(other, Undirected):
+            # each edge of the directed graph must be one orientation of a
+            # distinct undirected edge
+            mine, theirs = self.edges(), other.edges()
+            return (self.nodes() == other.nodes() and
+                    len(mine) == len(theirs) and
+                    set(map(frozenset, mine)) == set(map(frozenset, theirs)))
+        elif isinstance(other, Graph):
+            # compare the stored edges, as ids differ between graphs
+            return (self.nodes() == other.nodes() and
+                    all(Graph.neighbors(self, u) == Graph.neighbors(other, u)
+                        for u in self._index))
         else:
             return False
 
@@ -255,6 +606,16 @@ class Undirected(Graph):
     contains (v, u). Due to this discrepency between directed and undirected
     graphs, it is preferrable to use the parents/neighbors methods to check if
     two nodes are connected.
+
+    The adjacency is stored symmetrically: an edge between the nodes with ids
+    i and j is stored in both _a_out[i] and _a_out[j], with the same weight,
+    and _a_in is the same list as _a_out. The parents and the neighbors of a
+    node are therefore the same row, and every read method of Graph works on
+    it directly, without merging incoming and outgoing edges.
+
+    INVARIANTS:
+    1. self._a_in is self._a_out
+    2. self._a_out[i][j] == self._a_out[j][i] for every edge
     """
 
     def __init__(self, other: Graph = None):
@@ -266,55 +627,68 @@ class Undirected(Graph):
         :param other: the Graph to make an undirected version of
         :raises ValueError: if the given Graph cannot be converted to an
             an Undirected
+        :raises TypeError: if other is not a Graph, such as a FrozenGraph
         """
+        if other is not None:
+            self._verify_copyable(other)
+        super().__init__()
         if other:
-            e = other.edges()
-            for (u, v) in e:
-                if (v, u) in e and other.weight(u, v) != other.weight(v, u):
-                    raise ValueError(f'edge weight conflict between nodes'
-                                     f'{u} and {v}')
-
-            super().__init__(other)
-        else:
-            super().__init__(Graph())
-
-    def weight(self, u: Node, v: Node) -> float:
+            if not isinstance(other, Undirected):
+                self._verify_no_weight_conflicts(other)
+
+            # copy the rows of other directly, folding the incoming edges of
+            # each node into its row, in a single pass over the nodes
+            default = self._default_weight
+            # the rows of an Undirected already hold its incoming edges
+            incoming = (repeat(()) if other._a_in is other._a_out
+                        else other._a_in)
+            self._index = NodeIndex(other._index)
+            self._a_out = [None if row is None else
+                           dict.fromkeys(chain(row, parents), default)
+                           for (row, parents) in zip(other._a_out, incoming)]
+        self._a_in = self._a_out
+
+    @staticmethod
+    def _verify_no_weight_conflicts(other: Graph) -> None:
         """
-        Get the weight of the edge (u, v)/(v, u).
+        Ensure that no two nodes of a directed graph have edges in both
+        directions with different weights. Only the nodes with edges in both
+        directions are compared, so this does not look at each edge.
 
-        :param u: the first node
-        :param v: the second node
-        :return: the weight of edge
-        :raises ValueError: if (u, v)/(v, u) is not an existing edge
+        :param other: the graph to check
+        :raises ValueError: if any edges (u, v) and (v, u) have different
+            weights
         """
-        if v not in self.neighbors(u):
-            raise ValueError(f'edge ({_quoted(u), _quoted(v)})'
-                             f'is not defined')
+        for (i, (row, parents)) in enumerate(zip(other._a_out, other._a_in)):
+            if row:
+                # the nodes j with edges both from i and to i
+                for j in row.keys() & parents:
+                    if row[j] != other._a_out[j][i]:
+                        (u, v) = other._index.nodes((i, j))
+                        raise ValueError(f'edge weight conflict between nodes '
+                                         f'{_quoted(u)} and {_quoted(v)}')
 
-        uv = self._weights[(u, v)]
-        return uv if uv else self._weights[(v, u)]
-
-    def parents(self, v: Node) -> Set[Node]:
-        """
-        Get the set of nodes which have outgoing edges to v. For an undirected
-        graph, this is the same set that neighbors(v) provides.
-
-        :param v: the node to get the parents of
-        :return: the parents of v
-        :raises ValueError: if v is not a defined node
-        """
-        return super().parents(v).union(self._a_out[v])
-
-    def neighbors(self, u: Node) -> Set[Node]:
+    def edges(self) -> Set[Edge]:
         """
-        Get the set of nodes which u has outgoing edges to. For an undirected
-        graph, this is the same set that parents(u) provides.
+        Get the set of edges in this graph, represented as 2-tuples (u, v).
+        Each edge is included once, in only one of its two orientations.
 
-        :param u: the node to get the neighbors of
-        :return: the neighbors of u
-        :raises ValueError: if u is not a defined node
+        :return: the set of defined edges
         """
-        return super().neighbors(u).union(self._a_in[u])
+        # free ids have no node, but their rows are None and are skipped
+        nodes = list(self._index.nodes(range(len(self._a_out))))
+        return {(nodes[i], nodes[j])
+                for (i, row) in enumerate(self._a_out) if row
+                for j in row if j <= i}
+
+    def _add_rows(self, i: int) -> None:
+        # _a_in is _a_out, so there is a single row to create
+        if i == len(self._a_out):
+            self._a_out.append(dict())
+        else:
+            self._a_out[i] = dict()
+        if self._owned is not None:
+            self._owned.add(i)
 
     def add_edge(self, u: Node, v: Node, weight: float = None) -> None:
         """
@@ -327,12 +701,56 @@ class Undirected(Graph):
         :raises ValueError: if u or v is not a defined node or (u, v)/(v, u) is
             a previously defined edge
         """
-        self._verify_node_defined(u)
-        self._verify_node_defined(v)
-        self._verify_edge_undefined(v, u)
-        # (u, v) verified in super call
+        i = self._verify_node_defined(u)
+        j = self._verify_node_defined(v)
+        # the adjacency is symmetric, so this also rules out (v, u)
+        self._verify_edge_undefined(u, v)
+
+        self._writable(i, j)
+        self._a_out[i][j] = self._a_out[j][i] =\
+            weight if weight else self._default_weight
+        self._sorted.invalidate(u, v)
+
+    def _insert_edges(self, pairs: List[Edge], weights: Iterable[float])\
+            -> None:
+        ids = self._writable_pair_ids(pairs)
+        a_out = self._a_out
+        for ((i, j), w) in zip(ids, weights):
+            a_out[i][j] = a_out[j][i] = w
+        self._sorted.clear()
+
+    def _verify_edges_undefined(self, pairs: List[Edge]) -> None:
+        """
+        Ensure that no edge of pairs is a defined edge in this Undirected in
+        either direction, or appears more than once in pairs in either
+        direction. Assumes every endpoint is a defined node.
+
+        :param pairs: the (u, v) pairs to check
+        :raises ValueError: if any edge is defined or appears more than once
+        """
+        if len(set(map(frozenset, pairs))) < len(pairs):
+            raise ValueError('edges contain duplicates')
+
+        super()._verify_edges_undefined(pairs)
 
-        super().add_edge(u, v, weight)
+    def remove_node(self, u: Node) -> None:
+        """
+        Remove the node u from this graph, along with every edge between u
+        and another node.
+
+        :param u: the node to remove
+        :raises ValueError: if u is not a defined node
+        """
+        i = self._verify_node_defined(u)
+        self._writable(i, *self._a_out[i])
+
+        # the id of u will be reused, so no row may refer to it afterwards
+        for j in self._a_out[i]:
+            if j != i:
+                del self._a_out[j][i]
+        self._a_out[i] = None
+        self._index.remove(u)
+        self._sorted.clear()
 
     def remove_edge(self, u: Node, v: Node) -> None:
         """
@@ -342,20 +760,18 @@ class Undirected(Graph):
         :param v: the second node of the edge to be removed
         :raises ValueError: if edge (u, v)/(v, u) does not exist in this graph
         """
-        if v in self._a_out[u]:
-            self._a_out[u].remove(v)
-            self._a_in[v].remove(u)
-        if u in self._a_out[v]:
-            self._a_out[v].remove(u)
-            self._a_in[u].remove(v)
-        else:
-            raise ValueError(f'edge ({_quoted(u)}, {_quoted(v)})'
-                             f'is not defined')
+        (i, j) = self._verify_edge_defined(u, v)
+
+        self._writable(i, j)
+        del self._a_out[i][j]
+        if i != j:
+            del self._a_out[j][i]
+        self._sorted.invalidate(u, v)
 
     def __eq__(self, other):
         if isinstance(other, Undirected):
-            if self._nodes == other._nodes:
-                for u in self._nodes:
+            if self.nodes() == other.nodes():
+                for u in self._index:
                     if self.neighbors(u) != other.neighbors(u):
                         return False
                 # all the same nodes which have all the same neighbors
@@ -377,11 +793,9 @@ class Unweighted(Graph):
 
         :param other: the Graph to make an unweighted version of
         """
-        # default_weight=1 by default
-        if other:
-            super().__init__(other)
-        else:
-            super().__init__(Graph())
+        # default_weight=1 by default, and copying other is a single pass over
+        # its rows which gives every edge the default weight
+        super().__init__(other)
 
     def add_edge(self, u: Node, v: Node, weight: float = 1) -> None:
         """
@@ -394,8 +808,559 @@ class Unweighted(Graph):
         :raises ValueError: if u or v is not a defined node or (u, v) is a
             previously defined edge
         """
+        # the default weight of an Unweighted is always 1
         super().add_edge(u, v)
-        self._weights[(u, v)] = 1
+
+    def add_edges_from(self, edges: Iterable[tuple]) -> None:
+        """
+        Add a batch of edges in one call. Each edge is a tuple (u, v) or
+        (u, v, weight), where weight is ignored.
+
+        :param edges: the edges to add
+        :raises ValueError: if any endpoint is not a defined node, or any edge
+            is a previously defined edge or appears more than once in edges
+        """
+        super().add_edges_from((edge[0], edge[1]) for edge in edges)
+
+
+class FrozenGraph:
+    """
+    An immutable graph stored in compressed sparse row (CSR) form. Each node is
+    mapped to an integer index, and the outgoing edges of the node with index i
+    are stored in _out_targets[_out_offsets[i]:_out_offsets[i + 1]], sorted by
+    target index, with the matching weights at the same positions of
+    _out_weights. Incoming edges are stored the same way, without weights.
+
+    A FrozenGraph provides the same read methods as Graph (nodes, edges,
+    weight, parents, neighbors), so it can be passed to the iterators and
+    algorithms in place of a Graph, but it cannot be mutated. Storing the
+    adjacency in contiguous arrays uses a fraction of the memory of the sets
+    and dicts that back a Graph.
+
+    Nodes which can be sorted are indexed in sorted order, so every row also
+    lists its nodes in sorted order, and sorted_neighbors reads them straight
+    from the arrays without sorting or caching them.
+
+    INVARIANTS:
+    1. self._index[self._nodes[i]] == i
+    2. the targets of each row are sorted in increasing order
+    3. if self._natural_order, self._nodes is sorted in increasing order
+    """
+
+    def __init__(self, other: Graph):
+        """
+        Initialize a new FrozenGraph with the nodes, edges and weights of an
+        existing Graph. If other is an Undirected, the incoming and outgoing
+        edges of each node are the same, and they are only stored once.
+
+        :param other: the Graph to freeze
+        """
+        self._nodes: List[Node] = list(other.nodes())
+        self._natural_order = _sort_nodes(self._nodes)
+        self._index: Dict[Node, int] =\
+            {u: i for (i, u) in enumerate(self._nodes)}
+        if isinstance(other, FrozenGraph):
+            self._directed = other.is_directed()
+        else:
+            self._directed = not isinstance(other, Undirected)
+
+        typecode = _index_typecode(len(self._nodes))
+        self._out_offsets = array('q', [0])
+        self._out_targets = array(typecode)
+        self._out_weights = array('d')
+
+        for u in self._nodes:
+            row = sorted(self._index[v] for v in other.iter_neighbors(u))
+            self._out_targets.extend(row)
+            self._out_weights.extend(
+                other.weight(u, self._nodes[j]) for j in row)
+            self._out_offsets.append(len(self._out_targets))
+
+        if self._directed:
+            self._in_offsets = array('q', [0])
+            self._in_targets = array(typecode)
+            for v in self._nodes:
+                self._in_targets.extend(
+                    sorted(self._index[u] for u in other.iter_parents(v)))
+                self._in_offsets.append(len(self._in_targets))
+        else:
+            self._in_offsets = self._out_offsets
+            self._in_targets = self._out_targets
+
+        self._sorted = _SortedAdjacency()
+        # whether some weight is negative, None until it is first checked
+        self._negative: Optional[bool] = None
+        # the memory map the arrays are views of, see close
+        self._mapping = None
+
+    @classmethod
+    def _from_arrays(cls, nodes: List[Node], directed: bool,
+                     out_offsets, out_targets, out_weights,
+                     in_offsets=None, in_targets=None,
+                     mapping=None, natural_order: bool = False)\
+            -> 'FrozenGraph':
+        """
+        Create a FrozenGraph directly from CSR arrays which already satisfy the
+        invariants, without copying them. The arrays can be any sequences
+        supporting len and indexing, such as arrays or memoryviews.
+
+        :param nodes: the nodes, in index order
+        :param directed: False if the arrays hold an undirected graph
+        :param out_offsets: the offsets of the outgoing edges of each node
+        :param out_targets: the target indices of the outgoing edges
+        :param out_weights: the weights of the outgoing edges
+        :param in_offsets: the offsets of the incoming edges of each node,
+            ignored if directed is False
+        :param in_targets: the source indices of the incoming edges, ignored
+            if directed is False
+        :param mapping: the memory map the arrays are memoryviews of, which
+            is closed by close
+        :param natural_order: whether nodes is sorted in increasing order
+        :return: the new FrozenGraph
+        """
+        graph = cls.__new__(cls)
+        graph._nodes = nodes
+        graph._natural_order = natural_order
+        graph._index = {u: i for (i, u) in enumerate(nodes)}
+        graph._directed = directed
+        graph._out_offsets = out_offsets
+        graph._out_targets = out_targets
+        graph._out_weights = out_weights
+        if directed:
+            graph._in_offsets = in_offsets
+            graph._in_targets = in_targets
+        else:
+            graph._in_offsets = out_offsets
+            graph._in_targets = out_targets
+        graph._sorted = _SortedAdjacency()
+        graph._negative = None
+        graph._mapping = mapping
+        return graph
+
+    def _verify_node_defined(self, u: Node) -> int:
+        """
+        Ensure that u is a defined node in this FrozenGraph.
+
+        :param u: the node to check
+        :return: the index of u
+        :raises ValueError: if u is not a defined node
+        """
+        try:
+            return self._index[u]
+        except (KeyError, TypeError):
+            raise ValueError(f'node {_quoted(u)} is not defined')
+
+    def _edge_position(self, u: Node, v: Node) -> int:
+        """
+        Find the position of the edge (u, v) in the outgoing edge arrays.
+
+        :param u: the 'from' node
+        :param v: the 'to' node
+        :return: the position of (u, v) in _out_targets and _out_weights
+        :raises ValueError: if (u, v) is not a defined edge
+        """
+        i = self._verify_node_defined(u)
+        j = self._verify_node_defined(v)
+
+        lo, hi = self._out_offsets[i], self._out_offsets[i + 1]
+        pos = bisect_left(self._out_targets, j, lo, hi)
+        if pos == hi or self._out_targets[pos] != j:
+            raise ValueError(f'edge ({_quoted(u)}, {_quoted(v)}) '
+                             f'is not defined')
+        return pos
+
+    @property
+    def version(self) -> int:
+        """
+        The number of mutations made to this graph, which is always 0 since a
+        FrozenGraph cannot be mutated, see Graph.version.
+
+        :return: 0
+        """
+        return 0
+
+    def snapshot(self) -> 'FrozenGraph':
+        """
+        Take a snapshot of this graph. A FrozenGraph cannot be mutated, so it
+        is its own snapshot.
+
+        :return: this graph
+        """
+        return self
+
+    def close(self) -> None:
+        """
+        Release the memory-mapped file backing this graph, if it was opened
+        with load_binary, after which the graph can no longer be used. Does
+        nothing for a graph which is not backed by a file, or which is
+        already closed. A FrozenGraph is also a context manager which closes
+        it on exit:
+
+            with load_binary(path) as g:
+                ...
+
+        :raises BufferError: if objects sharing the memory of the graph's
+            arrays, such as NumPy arrays made from them, are still alive
+        """
+        if self._mapping is None:
+            return
+
+        for view in (self._out_offsets, self._out_targets, self._out_weights,
+                     self._in_offsets, self._in_targets):
+            view.release()
+        self._mapping.close()
+        self._mapping = None
+
+    def __enter__(self) -> 'FrozenGraph':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def is_directed(self) -> bool:
+        """
+        Check whether this FrozenGraph was built from a directed graph.
+
+        :return: False if this graph was built from an Undirected, else True
+        """
+        return self._directed
+
+    def nodes(self) -> Set[Node]:
+        """
+        Get the set of nodes in this graph.
+
+        :return: the set of defined nodes
+        """
+        return set(self._nodes)
+
+    def has_node(self, u: Node) -> bool:
+        """
+        Check whether u is a defined node in this graph without copying the
+        set of nodes.
+
+        :param u: the node to check
+        :return: True if u is a defined node, else False
+        """
+        try:
+            return u in self._index
+        except TypeError:
+            return False
+
+    def edges(self) -> Set[Edge]:
+        """
+        Get the set of edges in this graph, represented as 2-tuples (from_node,
+        to_node). For a graph built from an Undirected, both (u, v) and (v, u)
+        are included.
+
+        :return: the set of defined edges
+        """
+        e = set()
+        for (i, u) in enumerate(self._nodes):
+            for pos in range(self._out_offsets[i], self._out_offsets[i + 1]):
+                e.add((u, self._nodes[self._out_targets[pos]]))
+        return e
+
+    def weight(self, u: Node, v: Node) -> float:
+        """
+        Get the weight of the edge (u, v).
+
+        :param u: the 'from' node
+        :param v: the 'to' node
+        :return: the weight of edge (u, v)
+        :raises ValueError: if (u, v) is not an existing edge
+        """
+        return self._out_weights[self._edge_position(u, v)]
+
+    def has_negative_weights(self) -> bool:
+        """
+        Check whether any edge of this graph has a negative weight, see
+        Graph.has_negative_weights. A FrozenGraph cannot be mutated, so the
+        weights are only scanned by the first call.
+
+        :return: True if some edge has a negative weight, else False
+        """
+        if self._negative is None:
+            self._negative = min(self._out_weights, default=0) < 0
+        return self._negative
+
+    def parents(self, v: Node) -> Set[Node]:
+        """
+        Get the set of nodes which have outgoing edges to v.
+
+        :param v: the node to get the parents of
+        :return: the parents of v
+        :raises ValueError: if v is not a defined node
+        """
+        j = self._verify_node_defined(v)
+        return {self._nodes[self._in_targets[pos]] for pos in
+                range(self._in_offsets[j], self._in_offsets[j + 1])}
+
+    def neighbors(self, u: Node) -> Set[Node]:
+        """
+        Get the set of nodes which u has outgoing edges to.
+
+        :param u: the node to get the neighbors of
+        :return: the neighbors of u
+        :raises ValueError: if u is not a defined node
+        """
+        i = self._verify_node_defined(u)
+        return {self._nodes[self._out_targets[pos]] for pos in
+                range(self._out_offsets[i], self._out_offsets[i + 1])}
+
+    def parents_view(self, v: Node) -> '_RowView':
+        """
+        Get a read-only view of the nodes which have outgoing edges to v.
+
+        :param v: the node to get the parents of
+        :return: a view of the parents of v
+        :raises ValueError: if v is not a defined node
+        """
+        j = self._verify_node_defined(v)
+        return _RowView(self, self._in_offsets, self._in_targets, j)
+
+    def neighbors_view(self, u: Node) -> '_RowView':
+        """
+        Get a read-only view of the nodes which u has outgoing edges to.
+
+        :param u: the node to get the neighbors of
+        :return: a view of the neighbors of u
+        :raises ValueError: if u is not a defined node
+        """
+        i = self._verify_node_defined(u)
+        return _RowView(self, self._out_offsets, self._out_targets, i)
+
+    def iter_parents(self, v: Node) -> Iterator[Node]:
+        """
+        Iterate over the nodes which have outgoing edges to v.
+
+        :param v: the node to get the parents of
+        :return: an iterator over the parents of v
+        :raises ValueError: if v is not a defined node
+        """
+        return iter(self.parents_view(v))
+
+    def iter_neighbors(self, u: Node) -> Iterator[Node]:
+        """
+        Iterate over the nodes which u has outgoing edges to.
+
+        :param u: the node to get the neighbors of
+        :return: an iterator over the neighbors of u
+        :raises ValueError: if u is not a defined node
+        """
+        return iter(self.neighbors_view(u))
+
+    def sorted_neighbors(self, u: Node, key: Callable[[Node], Any] = None)\
+            -> Tuple[Node, ...]:
+        """
+        Get the neighbors of u sorted by key. Without a key, the neighbors are
+        read in the order of their row, which is their sorted order if the
+        nodes could be sorted, and are sorted on every call otherwise, so that
+        no copy of the adjacency is kept. With a key, the result is cached per
+        key function, which must therefore be pure, see
+        Graph.sorted_neighbors.
+
+        :param u: the node to get the neighbors of
+        :param key: a function of one argument used to extract a comparison
+            key from each neighbor, None to compare the neighbors themselves
+        :return: a tuple of the neighbors of u in sorted order
+        :raises ValueError: if u is not a defined node
+        """
+        if key is not None:
+            return self._sorted.get(self, u, key)
+        if not self._natural_order:
+            return tuple(sorted(self.iter_neighbors(u)))
+
+        i = self._verify_node_defined(u)
+        return tuple(map(self._nodes.__getitem__, self._out_targets[
+            self._out_offsets[i]:self._out_offsets[i + 1]]))
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenGraph):
+            return (self._directed == other._directed and
+                    self.nodes() == other.nodes() and
+                    all(self.neighbors(u) == other.neighbors(u)
+                        for u in self._nodes))
+        else:
+            return False
+
+
+class AdjacencyView(AbstractSet):
+    """
+    A read-only, set-like view of the adjacency of a node in a Graph. The view
+    wraps the graph's own adjacency row of ids instead of copying it, and
+    translates between ids and nodes as it is used.
+    """
+
+    __slots__ = ('_index', '_row')
+
+    def __init__(self, index: NodeIndex, row: Collection[int]):
+        """
+        Initialize a new AdjacencyView.
+
+        :param index: the index of the graph the row belongs to
+        :param row: the adjacency row to view
+        """
+        self._index = index
+        self._row = row
+
+    def __contains__(self, v) -> bool:
+        try:
+            i = self._index.get(v)
+        except TypeError:
+            return False
+        return i is not None and i in self._row
+
+    def __iter__(self) -> Iterator[Node]:
+        return self._index.nodes(self._row)
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({set(self)})'
+
+
+class _RowView(AbstractSet):
+    """
+    A read-only, set-like view of one row of a FrozenGraph's CSR arrays.
+    """
+
+    __slots__ = ('_graph', '_targets', '_lo', '_hi')
+
+    def __init__(self, graph: 'FrozenGraph', offsets, targets, i: int):
+        """
+        Initialize a new _RowView.
+
+        :param graph: the FrozenGraph the row belongs to
+        :param offsets: the CSR offsets array
+        :param targets: the CSR targets array
+        :param i: the index of the row's node
+        """
+        self._graph = graph
+        self._targets = targets
+        self._lo = offsets[i]
+        self._hi = offsets[i + 1]
+
+    def __contains__(self, v) -> bool:
+        try:
+            j = self._graph._index[v]
+        except (KeyError, TypeError):
+            return False
+        pos = bisect_left(self._targets, j, self._lo, self._hi)
+        return pos < self._hi and self._targets[pos] == j
+
+    def __iter__(self) -> Iterator[Node]:
+        nodes = self._graph._nodes
+        targets = self._targets
+        for pos in range(self._lo, self._hi):
+            yield nodes[targets[pos]]
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __repr__(self):
+        return f'{type(self).__name__}({set(self)})'
+
+
+class _SortedAdjacency:
+    """
+    A cache of sorted neighbor tuples, keyed by the key function used to sort
+    them and then by node. Entries for a node must be invalidated whenever its
+    neighbors change. Key functions are held weakly, so the entries sorted by a
+    function are dropped along with the function itself.
+    """
+
+    def __init__(self):
+        """
+        Initialize a new, empty _SortedAdjacency.
+        """
+        self._natural: Dict[Node, Tuple[Node, ...]] = dict()
+        self._keyed: WeakKeyDictionary = WeakKeyDictionary()
+
+    def __reduce__(self):
+        # weak references cannot be pickled, so a pickled cache is restored
+        # empty, which is always valid
+        return _SortedAdjacency, ()
+
+    def _rows(self, key: Optional[Callable[[Node], Any]])\
+            -> Optional[Dict[Node, Tuple[Node, ...]]]:
+        """
+        Get the cached rows for key.
+
+        :param key: the key function
+        :return: the rows sorted by key, None if key cannot be cached because
+            it cannot be weakly referenced
+        """
+        if key is None:
+            return self._natural
+        try:
+            return self._keyed.setdefault(key, dict())
+        except TypeError:
+            return None
+
+    def get(self, graph, u: Node, key: Optional[Callable[[Node], Any]])\
+            -> Tuple[Node, ...]:
+        """
+        Get the neighbors of u in graph sorted by key, sorting them only if
+        they are not cached yet.
+
+        :param graph: the graph this cache belongs to
+        :param u: the node to get the neighbors of
+        :param key: the key function to sort by
+        :return: a tuple of the neighbors of u in sorted order
+        :raises ValueError: if u is not a defined node in graph
+        """
+        rows = self._rows(key)
+        try:
+            return rows[u]
+        except (KeyError, TypeError):
+            row = tuple(sorted(graph.iter_neighbors(u), key=key))
+            if rows is not None:
+                rows[u] = row
+            return row
+
+    def invalidate(self, *nodes: Node) -> None:
+        """
+        Drop the cached rows of the given nodes.
+
+        :param nodes: the nodes whose neighbors changed
+        """
+        for rows in chain([self._natural], self._keyed.values()):
+            for u in nodes:
+                rows.pop(u, None)
+
+    def clear(self) -> None:
+        """
+        Drop all cached rows.
+        """
+        self._natural.clear()
+        self._keyed.clear()
+
+
+def _sort_nodes(nodes: List[Node]) -> bool:
+    """
+    Sort nodes in place, if they can be compared with each other.
+
+    :param nodes: the nodes to sort
+    :return: True if nodes is now in strictly increasing order, else False,
+        such as for nodes of different types, or only partially ordered ones
+    """
+    try:
+        nodes.sort()
+        return all(u < v for (u, v) in zip(nodes, islice(nodes, 1, None)))
+    except TypeError:
+        return False
+
+
+def _index_typecode(n: int) -> str:
+    """
+    Choose the smallest array typecode able to hold node indices of a graph
+    with n nodes.
+
+    :param n: the number of nodes
+    :return: an array typecode for signed integers
+    """
+    return 'i' if n < 2 ** 31 else 'q'
 
 
 def _quoted(s: Any) -> str:
@@ -3,22 +3,63 @@ Various iterators over defined data structures.
 """
 
 import abc
+import asyncio
+import functools
+import heapq
+import itertools
 import math
-
-from typing import Iterable, Optional, Tuple
+import multiprocessing
+import queue
+import threading
+import time
+import weakref
+
+from typing import Any, Iterable, Iterator, Optional, Tuple, Set, Dict,\
+    Callable, NamedTuple
 from collections import deque
-from heapdict import HeapDict
+from concurrent.futures import CancelledError, Executor, Future,\
+    ProcessPoolExecutor
 
 from .types import Node
 from .graphs import Graph
 
 
+class TraversalStats(NamedTuple):
+    """
+    Counters describing the work done by a graph iterator so far.
+
+    popped: the number of entries popped off of the worklist
+    stale: the number of popped entries skipped because their node had
+        already been visited
+    pushes: the number of entries pushed onto the worklist
+    decrease_keys: the number of pushes for nodes which were already on the
+        worklist with a larger tentative distance
+    edges_scanned: the number of neighbors retrieved for visited nodes
+    relaxations: the number of edges to unvisited nodes whose weight was
+        looked up to compute a tentative distance
+    neighbor_time: the time spent retrieving neighbors, in seconds
+    """
+    popped: int
+    stale: int
+    pushes: int
+    decrease_keys: int
+    edges_scanned: int
+    relaxations: int
+    neighbor_time: float
+
+
 class GraphIterator(abc.ABC):
     """
     Abstract base class for graph iterators.
+
+    An iterator created with instrument=True counts the work it does, see
+    stats. The counters are kept by wrappers around the graph and worklist
+    which are only installed for instrumented iterators, so iterators created
+    without it do no counting at all.
     """
 
-    def __init__(self, graph: Graph, start, key=None):
+    def __init__(self, graph: Graph, start, key=None,
+                 instrument: bool = False):
         """
         Create a new DepthFirstIterator object.
 
@@ -26,15 +67,64 @@ class GraphIterator(abc.ABC):
         :param start: the first node to visit
         :param key: a function of one argument used to extract a comparison key
             to determine which node to visit first (the "smallest" element)
+        :param instrument: whether to count the work done by this iterator
         :raises ValueError: if start is not defined in graph
         """
-        if start not in graph.nodes():
+        if not graph.has_node(start):
             raise ValueError(f'node {start} is not defined')
 
         self._graph = graph
         self._key = key
-        self._worklist = deque([start])  # TODO: Default -> priority queue?
-        self._remaining = set(graph.nodes())
+        self._worklist = deque([start])
+        # only the explored region is tracked, so starting an iterator does
+        # not depend on the size of the graph
+        self._visited: Set[Node] = set()
+
+        self._probe: Optional[_ProbedGraph] = None
+        if instrument:
+            self._probe = self._graph = _ProbedGraph(graph)
+            self._worklist = _CountingDeque(self._worklist)
+
+    def stats(self) -> TraversalStats:
+        """
+        Get the counters of the work done by this iterator so far.
+
+        :return: the counters
+        :raises ValueError: if this iterator was not created with
+            instrument=True
+        """
+        if self._probe is None:
+            raise ValueError('iterator was not created with instrument=True')
+
+        pushes = self._pushes()
+        # every popped entry was either visited or skipped as stale
+        popped = pushes - len(self._worklist)
+        return TraversalStats(popped=popped,
+                              stale=popped - len(self._visited),
+                              pushes=pushes,
+                              decrease_keys=self._decrease_keys(pushes),
+                              edges_scanned=self._probe.edges_scanned,
+                              relaxations=self._probe.weight_lookups,
+                              neighbor_time=self._probe.neighbor_time)
+
+    def _pushes(self) -> int:
+        """
+        Count the entries pushed onto the worklist so far. Only called on
+        instrumented iterators.
+
+        :return: the number of pushes
+        """
+        return self._worklist.pops + len(self._worklist)
+
+    def _decrease_keys(self, pushes: int) -> int:
+        """
+        Count the pushes which decreased the key of a node already on the
+        worklist. Only called on instrumented iterators.
+
+        :param pushes: the number of pushes so far
+        :return: the number of decrease-keys
+        """
+        return 0
 
     def _next_unvisited(self) -> Optional[Node]:
         """
@@ -43,11 +133,9 @@ class GraphIterator(abc.ABC):
         :return: the next unvisited node on the worklist, None if there are no
             unvisited nodes remaining
         """
-        already_visited = True
-
-        while already_visited and self._worklist:
+        while self._worklist:
             curr = self._worklist.pop()
-            if curr in self._remaining:
+            if curr not in self._visited:
                 return curr
 
         return None
@@ -57,8 +145,8 @@ class GraphIterator(abc.ABC):
 
     def __next__(self) -> Node:
         u = self._visit_next()
-        if u:
-            self._remaining.remove(u)
+        if u is not None:
+            self._visited.add(u)
             return u
         else:
             raise StopIteration
@@ -82,17 +170,13 @@ class DepthFirstIterator(GraphIterator):
     def _visit_next(self) -> Optional[Node]:
         u = self._next_unvisited()
 
-        if u:
-            neighbors = list(self._graph.neighbors(u))
-            neighbors.sort(key=self._key)
-            # reverse because DFS uses a stack and nodes to be visited last
-            # should be put on the bottom
-            neighbors.reverse()
+        if u is not None:
+            neighbors = self._graph.sorted_neighbors(u, self._key)
 
-            for v in neighbors:
-                if v in self._remaining:
-                    # append + pop => stack
-                    self._worklist.append(v)
+            # append + pop => stack, reversed because DFS uses a stack and
+            # nodes to be visited last should be put on the bottom
+            self._worklist.extend(itertools.filterfalse(
+                self._visited.__contains__, reversed(neighbors)))
 
             return u
         else:
@@ -107,14 +191,12 @@ class BreadthFirstIterator(GraphIterator):
     def _visit_next(self) -> Optional[Node]:
         u = self._next_unvisited()
 
-        if u:
-            neighbors = list(self._graph.neighbors(u))
-            neighbors.sort(key=self._key)
+        if u is not None:
+            neighbors = self._graph.sorted_neighbors(u, self._key)
 
-            for v in neighbors:
-                if v in self._remaining:
-                    # appendleft + pop => queue
-                    self._worklist.appendleft(v)
+            # appendleft + pop => queue
+            self._worklist.extendleft(
+                itertools.filterfalse(self._visited.__contains__, neighbors))
 
             return u
         else:
@@ -131,8 +213,8 @@ class WeightedGraphIterator(GraphIterator):
 
     def __next__(self) -> Tuple[Node, float]:
         (u, weight) = self._visit_next()
-        if u:
-            self._remaining.remove(u)
+        if u is not None:
+            self._visited.add(u)
             return u, weight
         else:
             raise StopIteration
@@ -153,9 +235,21 @@ class DijkstraIterator(WeightedGraphIterator):
     """
     Iterate over the nodes of a graph based on their distance from the given
     start node using Dijkstra's shortest path algorithm.
+
+    The worklist is a binary heap with lazy deletion: a node is only pushed
+    once it is discovered, and it is pushed again whenever its tentative
+    distance decreases instead of being updated in place. Outdated entries are
+    skipped when they are popped. Starting an iterator therefore takes O(1)
+    time, and the total work depends only on the explored part of the graph.
+
+    Nodes which are not reachable from the start node are returned last, in
+    no particular order, with a distance of math.inf. They are only looked
+    up once every reachable node has been returned, so a search which stops
+    before then does no work for them.
     """
 
-    def __init__(self, graph: Graph, start, key=None):
+    def __init__(self, graph: Graph, start, key=None,
+                 instrument: bool = False):
         """
         Create a new DijkstraIterator object.
 
@@ -164,30 +258,573 @@ class DijkstraIterator(WeightedGraphIterator):
         :param key: a function of one argument used to extract a comparison key
             to determine which node to visit first in the case of a tie (the
             "smallest" element)
+        :param instrument: whether to count the work done by this iterator
         :raises ValueError: if start is not defined in graph
         """
-        super().__init__(graph, start, key=key)
+        super().__init__(graph, start, key=key, instrument=instrument)
+
+        # heap entries are (priority, order, node), where order is the number
+        # of pushes before the entry, kept in _pushed; it breaks ties in the
+        # order nodes were discovered and keeps nodes themselves from ever
+        # being compared
+        self._worklist = [(self._priority(start, 0), 0, start)]
+        self._pushed = 1
+        self._distances: Dict[Node, float] = {start: 0}
+        self._parents: Dict[Node, Optional[Node]] = {start: None}
+        # the nodes left once the worklist is empty, which are unreachable
+        self._unreachable: Optional[Iterator[Node]] = None
 
-        self._worklist = HeapDict()
-        for u in graph.nodes():
-            self._worklist[u] = math.inf
-        self._worklist[start] = 0
+    def __next__(self) -> Tuple[Node, float]:
+        if self._unreachable is None:
+            (u, d_u) = self._visit_next()
+            if u is not None:
+                self._visited.add(u)
+                return u, d_u
+            self._unreachable = itertools.filterfalse(
+                self._visited.__contains__, self._graph.nodes())
+
+        # unreachable nodes are not visited, so they stay out of the stats
+        return next(self._unreachable), math.inf
+
+    def parent(self, u: Node) -> Optional[Node]:
+        """
+        Get the predecessor of u on the shortest path from the start node found
+        so far. Once u has been returned by this iterator, its predecessor is
+        final.
 
-    def _visit_next(self) -> Optional[Node]:
+        :param u: the node to get the predecessor of
+        :return: the predecessor of u, None if u is the start node
+        :raises ValueError: if u has not been discovered yet
+        """
         try:
-            (u, d_u) = self._worklist.popitem()
+            return self._parents[u]
         except KeyError:
+            raise ValueError(f'node {u} has not been discovered')
+
+    def _priority(self, v: Node, d_v: float) -> float:
+        """
+        Compute the priority of v on the worklist, where smaller priorities
+        are visited first.
+
+        :param v: the node being pushed onto the worklist
+        :param d_v: the tentative distance of v from the start node
+        :return: the priority of v
+        """
+        return d_v
+
+    def _pushes(self) -> int:
+        return self._pushed
+
+    def _decrease_keys(self, pushes: int) -> int:
+        # each discovered node was pushed once when it was discovered, and
+        # once more for every decrease of its tentative distance
+        return pushes - len(self._distances)
+
+    def _next_unvisited(self) -> Optional[Node]:
+        while self._worklist:
+            (_, _, curr) = heapq.heappop(self._worklist)
+            if curr not in self._visited:
+                return curr
+
+        return None
+
+    def _visit_next(self) -> Tuple[Optional[Node], float]:
+        u = self._next_unvisited()
+        if u is None:
             return None, math.inf
 
-        neighbors = list(self._graph.neighbors(u))
-        neighbors.sort(key=self._key)
+        d_u = self._distances[u]
+        neighbors = self._graph.sorted_neighbors(u, self._key)
 
         for v in neighbors:
-            if v in self._worklist:
-                d_v = self._worklist[v]
-                l_uv = self._graph.weight(u, v)
+            if v not in self._visited:
+                d_v = d_u + self._graph.weight(u, v)
 
-                if d_v > d_u + l_uv:
-                    self._worklist[v] = d_u + l_uv
+                if d_v < self._distances.get(v, math.inf):
+                    self._distances[v] = d_v
+                    self._parents[v] = u
+                    heapq.heappush(self._worklist, (self._priority(v, d_v),
+                                                    self._pushed, v))
+                    self._pushed += 1
 
         return u, d_u
+
+
+class AStarIterator(DijkstraIterator):
+    """
+    Iterate over the nodes of a graph using the A* search algorithm. Nodes are
+    visited in order of their distance from the start node plus a heuristic
+    estimate of their remaining distance to some target, so nodes in the
+    direction of the target are visited first. Each node is returned with its
+    distance from the start node, as in DijkstraIterator.
+
+    The heuristic must be consistent: for every edge (u, v),
+    heuristic(u) <= weight(u, v) + heuristic(v), and heuristic(target) == 0.
+    Lower bounds derived from a metric, such as the straight-line distance
+    between nodes embedded in a plane, are consistent. With a consistent
+    heuristic, the distance returned with each node is its shortest path
+    distance. A heuristic which is always 0 makes this a DijkstraIterator.
+    """
+
+    def __init__(self, graph: Graph, start, heuristic: Callable[[Node], float],
+                 key=None, instrument: bool = False):
+        """
+        Create a new AStarIterator object.
+
+        :param graph: the graph to iterate over
+        :param start: the first node to visit
+        :param heuristic: a consistent lower bound on the distance from a
+            node to the target
+        :param key: a function of one argument used to extract a comparison key
+            to determine which node to visit first in the case of a tie (the
+            "smallest" element)
+        :param instrument: whether to count the work done by this iterator
+        :raises ValueError: if start is not defined in graph
+        """
+        self._heuristic = heuristic
+        super().__init__(graph, start, key=key, instrument=instrument)
+
+    def _priority(self, v: Node, d_v: float) -> float:
+        return d_v + self._heuristic(v)
+
+
+# the number of seconds an offloaded traversal waits for room in its queue,
+# or for a batch to relay, before checking again whether it should stop
+_POLL_INTERVAL = 0.05
+
+
+class AsyncGraphIterator:
+    """
+    An asynchronous iterator over the items of a graph iterator, so that a
+    long traversal can run inside an asyncio event loop without keeping the
+    other tasks of the loop waiting until it is done:
+
+        async for (u, d_u) in AsyncGraphIterator(DijkstraIterator(g, s)):
+            ...
+
+    By default, the traversal runs in the event loop, and gives control back
+    to the loop after every `every` items, so other tasks wait for at most
+    that many expansions. With offload, the traversal instead runs in the
+    given executor and streams its items back in batches of `every` through a
+    bounded queue, so the loop only ever waits for the next batch. With a
+    ThreadPoolExecutor, the traversal runs on the iterator itself, which must
+    not be used meanwhile, and still holds the GIL while it expands nodes.
+    With a ProcessPoolExecutor, the iterator is pickled and sent to a worker
+    process, so it must not hold a lambda as its key or heuristic, and the
+    given iterator is not advanced.
+
+    An offloaded traversal runs ahead of the consumer by at most `buffer`
+    batches, or twice that from a worker process. It stops after its current
+    batch once aclose is called, once the task consuming it is cancelled, or
+    once this iterator is garbage collected, such as after breaking out of
+    an async for loop, so it never holds on to a worker of the executor.
+    """
+
+    def __init__(self, iterator: GraphIterator, every: int = 64,
+                 offload: Executor = None, buffer: int = 4):
+        """
+        Create a new AsyncGraphIterator object.
+
+        :param iterator: the graph iterator to run
+        :param every: the number of items after which control is given back
+            to the event loop, or the number of items in each batch of an
+            offloaded traversal
+        :param offload: the executor to run the traversal in, None to run it
+            in the event loop
+        :param buffer: the number of batches an offloaded traversal can run
+            ahead of the consumer
+        :raises ValueError: if every or buffer is not positive
+        """
+        if every < 1:
+            raise ValueError(f'every must be positive, got {every}')
+        if buffer < 1:
+            raise ValueError(f'buffer must be positive, got {buffer}')
+
+        self._iterator = iterator
+        self._every = every
+        self._offload = offload
+        self._buffer = buffer
+        self._count = 0
+        self._done = False
+
+        # the state of an offloaded traversal, set up by the first __anext__
+        self._batch: deque = deque()
+        self._queue: Optional[_LoopQueue] = None
+        self._stop = None
+        self._future: Optional[Future] = None
+        self._manager = None
+
+    def __aiter__(self) -> 'AsyncGraphIterator':
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._done:
+            raise StopAsyncIteration
+        if self._offload is not None:
+            return await self._next_offloaded()
+
+        self._count += 1
+        if self._count % self._every == 0:
+            await asyncio.sleep(0)
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self._done = True
+            raise StopAsyncIteration from None
+
+    async def aclose(self) -> None:
+        """
+        Stop iterating. An offloaded traversal stops after its current batch.
+        """
+        self._close()
+
+    def _close(self) -> None:
+        """
+        Stop iterating, and tell an offloaded traversal to stop.
+        """
+        self._done = True
+        self._batch.clear()
+        if self._stop is not None:
+            _request_stop(self._stop)
+            self._release()
+
+    async def _next_offloaded(self) -> Any:
+        """
+        Get the next item of an offloaded traversal, starting the traversal
+        first if needed, and waiting for its next batch without blocking the
+        event loop.
+
+        :return: the next item
+        :raises StopAsyncIteration: if the traversal is done
+        """
+        if self._future is None:
+            await self._start()
+
+        while not self._batch:
+            try:
+                batch = await self._queue.get()
+            except asyncio.CancelledError:
+                self._close()
+                raise
+            if batch is None or isinstance(batch, BaseException):
+                self._done = True
+                self._release()
+                if batch is None:
+                    raise StopAsyncIteration
+                raise batch
+            self._batch.extend(batch)
+
+        return self._batch.popleft()
+
+    async def _start(self) -> None:
+        """
+        Submit the traversal to the executor. Starting a traversal in a worker
+        process starts a manager process, and perhaps the workers of the
+        executor, which takes long enough to stall the event loop, so it is
+        done by a thread of the loop's default executor instead.
+
+        Nothing started here refers back to this iterator, so that it can
+        still be garbage collected, which stops the traversal.
+        """
+        loop = asyncio.get_running_loop()
+        self._queue = _LoopQueue(loop, self._buffer)
+        if isinstance(self._offload, ProcessPoolExecutor):
+            starting = loop.run_in_executor(
+                None, _start_remote, self._offload, self._iterator,
+                self._every, self._buffer, self._queue)
+            try:
+                (self._manager, self._stop, self._future) =\
+                    await asyncio.shield(starting)
+            except asyncio.CancelledError:
+                starting.add_done_callback(_abandon)
+                raise
+        else:
+            self._stop = threading.Event()
+            self._future = _submit(self._offload, self._iterator,
+                                   self._every, self._queue, self._queue,
+                                   self._stop)
+        weakref.finalize(self, _request_stop, self._stop)
+
+    def _release(self) -> None:
+        """
+        Shut down the manager process of an offloaded traversal, once the
+        traversal is done with its queue.
+        """
+        if self._manager is not None:
+            manager, self._manager = self._manager, None
+            _shut_down_after(self._future, manager)
+
+
+class _LoopQueue:
+    """
+    A bounded queue from other threads into an asyncio event loop, whose
+    items are put by blocking the putting thread until there is room, and
+    gotten by awaiting them in the loop, without blocking a thread of the
+    loop's executor.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        """
+        Create a new _LoopQueue object.
+
+        :param loop: the event loop to get the items in
+        :param maxsize: the number of items which can wait to be gotten
+        """
+        self._loop = loop
+        self._items: asyncio.Queue = asyncio.Queue()
+        self._room = threading.Semaphore(maxsize)
+
+    def put(self, item: Any, timeout: float = None) -> None:
+        """
+        Put an item onto the queue, from any thread but that of the loop.
+
+        :param item: the item to put
+        :param timeout: the number of seconds to wait for room, None to wait
+            as long as it takes
+        :raises queue.Full: if there is no room within timeout
+        :raises RuntimeError: if the event loop is closed
+        """
+        if not self._room.acquire(timeout=timeout):
+            raise queue.Full
+        try:
+            self._loop.call_soon_threadsafe(self._items.put_nowait, item)
+        except RuntimeError:
+            self._room.release()
+            raise
+
+    async def get(self) -> Any:
+        """
+        Get the next item of the queue, from the thread of the loop.
+
+        :return: the item
+        """
+        item = await self._items.get()
+        self._room.release()
+        return item
+
+
+def _submit(executor: Executor, iterator: GraphIterator, every: int,
+            batches: queue.Queue, consumer: '_LoopQueue',
+            stop: threading.Event) -> Future:
+    """
+    Submit the traversal of an AsyncGraphIterator to an executor.
+
+    :param executor: the executor to run the traversal in
+    :param iterator: the graph iterator to run
+    :param every: the number of items in each batch
+    :param batches: the queue for the traversal to put its batches onto
+    :param consumer: the queue of the consumer, which batches may be relayed
+        to
+    :param stop: the event which is set when the consumer stops
+    :return: the future of the traversal
+    """
+    future = executor.submit(_stream, iterator, every, batches, stop)
+    future.add_done_callback(functools.partial(_report, consumer, stop))
+    return future
+
+
+def _start_remote(executor: ProcessPoolExecutor, iterator: GraphIterator,
+                  every: int, buffer: int, consumer: '_LoopQueue')\
+        -> Tuple[Any, threading.Event, Future]:
+    """
+    Start the traversal of an AsyncGraphIterator in a worker process. The
+    worker cannot use the queue and event of this process, so it reports to
+    those of a new manager process instead, and a thread relays its batches
+    from there. Called outside of the event loop.
+
+    :param executor: the executor to run the traversal in
+    :param iterator: the graph iterator to run
+    :param every: the number of items in each batch
+    :param buffer: the number of batches the manager process can hold
+    :param consumer: the queue of the consumer
+    :return: the manager, the stop event it serves, and the future of the
+        traversal
+    """
+    manager = multiprocessing.Manager()
+    batches = manager.Queue(buffer)
+    stop = manager.Event()
+    threading.Thread(target=_relay, args=(batches, consumer, stop),
+                     daemon=True).start()
+    return manager, stop, _submit(executor, iterator, every, batches,
+                                  consumer, stop)
+
+
+def _abandon(starting: asyncio.Future) -> None:
+    """
+    Stop a traversal in a worker process whose consumer was cancelled while
+    it was being started, once it has started.
+
+    :param starting: the future of _start_remote
+    """
+    if starting.cancelled() or starting.exception() is not None:
+        return
+    (manager, stop, future) = starting.result()
+    _request_stop(stop)
+    _shut_down_after(future, manager)
+
+
+def _shut_down_after(future: Future, manager) -> None:
+    """
+    Shut down the manager process of a traversal in a worker process once
+    the traversal is done. Shutting it down waits for the process to exit,
+    so it is done by a new thread, rather than by whichever thread, possibly
+    that of the event loop, happens to run the callback of future.
+
+    :param future: the future of the traversal
+    :param manager: the manager serving the traversal
+    """
+    future.add_done_callback(lambda _: threading.Thread(
+        target=manager.shutdown, daemon=True).start())
+
+
+def _request_stop(stop: threading.Event) -> None:
+    """
+    Tell an offloaded traversal to stop. Its stop event may be served by a
+    manager process which is already gone, so the traversal is gone as well.
+
+    :param stop: the event which the traversal checks
+    """
+    try:
+        stop.set()
+    except (EOFError, OSError):
+        pass
+
+
+def _put(batches: queue.Queue, stop: threading.Event, item: Any) -> bool:
+    """
+    Put an item onto the queue of an offloaded traversal, waiting for room
+    until the consumer stops.
+
+    :param batches: the queue to put the item onto
+    :param stop: the event which is set when the consumer stops
+    :param item: the item to put
+    :return: whether the item was put, rather than the consumer stopping or
+        its event loop being closed
+    """
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+        except RuntimeError:
+            return False
+    return False
+
+
+def _stream(iterator: GraphIterator, every: int, batches: queue.Queue,
+            stop: threading.Event) -> None:
+    """
+    Run a traversal for an AsyncGraphIterator, putting its items onto a queue
+    in batches, followed by None once it is done, or by the exception it
+    raised. Stops without finishing once stop is set.
+
+    :param iterator: the graph iterator to run
+    :param every: the number of items in each batch
+    :param batches: the queue to put the batches onto
+    :param stop: the event which is set when the consumer stops
+    """
+    try:
+        batch = []
+        for item in iterator:
+            batch.append(item)
+            if len(batch) == every:
+                if not _put(batches, stop, batch):
+                    return
+                batch = []
+        result = None
+        if batch and not _put(batches, stop, batch):
+            return
+    except Exception as e:
+        result = e
+    _put(batches, stop, result)
+
+
+def _relay(source: queue.Queue, batches: _LoopQueue,
+           stop: threading.Event) -> None:
+    """
+    Relay the batches of a traversal in a worker process from the queue of
+    its manager process to the consumer, up to the last one, or until stop
+    is set or the manager process is shut down.
+
+    :param source: the queue of the manager process
+    :param batches: the queue of the consumer
+    :param stop: the event which is set when the consumer stops
+    """
+    try:
+        while not stop.is_set():
+            try:
+                item = source.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if (not _put(batches, stop, item) or item is None
+                    or isinstance(item, BaseException)):
+                return
+    except (EOFError, OSError):
+        pass
+
+
+def _report(batches: _LoopQueue, stop: threading.Event,
+            future: Future) -> None:
+    """
+    Pass on an error which kept the traversal of an AsyncGraphIterator from
+    running at all, such as an iterator which cannot be pickled, since such a
+    traversal never reports to the queue itself.
+
+    :param batches: the queue of the consumer
+    :param stop: the event which is set when the consumer stops
+    :param future: the future of the traversal
+    """
+    error = CancelledError() if future.cancelled() else future.exception()
+    if error is not None:
+        _put(batches, stop, error)
+
+
+class _ProbedGraph:
+    """
+    A wrapper around a graph which counts the neighbors retrieved through
+    sorted_neighbors, the time spent retrieving them, and the weight lookups.
+    Every other attribute is read from the wrapped graph, except for special
+    attributes, which copy and pickle look up before the wrapped graph is set.
+    """
+
+    def __init__(self, graph: Graph):
+        """
+        Create a new _ProbedGraph object.
+
+        :param graph: the graph to wrap
+        """
+        self._graph = graph
+        self.edges_scanned = 0
+        self.weight_lookups = 0
+        self.neighbor_time = 0.0
+
+    def __getattr__(self, name: str):
+        if name == '_graph' or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self._graph, name)
+
+    def sorted_neighbors(self, u: Node, key=None) -> Tuple[Node, ...]:
+        start = time.perf_counter()
+        neighbors = self._graph.sorted_neighbors(u, key)
+        self.neighbor_time += time.perf_counter() - start
+        self.edges_scanned += len(neighbors)
+        return neighbors
+
+    def weight(self, u: Node, v: Node) -> float:
+        self.weight_lookups += 1
+        return self._graph.weight(u, v)
+
+
+class _CountingDeque(deque):
+    """
+    A deque which counts the entries popped off of its right end.
+    """
+
+    def __init__(self, iterable: Iterable = ()):
+        super().__init__(iterable)
+        self.pops = 0
+
+    def pop(self):
+        self.pops += 1
+        return super().pop()
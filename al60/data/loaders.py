@@ -0,0 +1,129 @@
+"""
+Module for reading graphs from edge list files.
+"""
+
+import gzip
+import os
+
+from itertools import filterfalse, islice
+from operator import itemgetter
+from typing import Callable, Iterator, List, TextIO, Union
+
+from .types import Node
+from .graphs import Graph
+from ._util import gc_paused
+
+# the first two bytes of every gzip file
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def iter_edge_list(source: Union[str, os.PathLike, TextIO],
+                   delimiter: str = None,
+                   node_type: Callable[[str], Node] = str,
+                   chunk_size: int = 65536,
+                   comment: str = '#') -> Iterator[List[tuple]]:
+    """
+    Read an edge list in chunks. Each line of the edge list holds one edge
+    as "u v" or "u v weight", with the fields separated by whitespace or by
+    delimiter. Blank lines and lines starting with comment are skipped. Files
+    compressed with gzip are detected and decompressed on the fly. At most
+    chunk_size lines are held in memory at a time.
+
+    :param source: the path of the file to read, or an open text file
+    :param delimiter: the string separating fields, None for any whitespace
+    :param node_type: a function of one argument converting a field to a node
+    :param chunk_size: the number of lines to read for each chunk
+    :param comment: the prefix of lines to skip
+    :return: an iterator over lists of (u, v) and (u, v, weight) tuples
+    :raises ValueError: if a line does not hold two or three fields
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with _open_text(source) as file:
+            yield from iter_edge_list(file, delimiter, node_type, chunk_size,
+                                      comment)
+        return
+
+    lines = iter(source)
+    lines_read = 0
+    while True:
+        # split whole chunks of lines at once and only fall back to checking
+        # each line when the chunk is not made of plain "u v weight" lines
+        block = list(islice(lines, chunk_size))
+        if not block:
+            return
+
+        rows = [line.split(delimiter) for line in block]
+        if delimiter is not None:
+            rows = [[field.strip() for field in row] for row in rows]
+
+        if set(map(len, rows)) == {3} and comment not in ''.join(block):
+            yield [(node_type(u), node_type(v), float(w))
+                   for (u, v, w) in rows]
+        else:
+            chunk = []
+            for (number, row) in enumerate(rows, start=lines_read + 1):
+                if not row or not row[0] or row[0].startswith(comment):
+                    continue
+                elif len(row) == 2:
+                    chunk.append((node_type(row[0]), node_type(row[1])))
+                elif len(row) == 3:
+                    chunk.append((node_type(row[0]), node_type(row[1]),
+                                  float(row[2])))
+                else:
+                    raise ValueError(f'line {number}: expected 2 or 3 '
+                                     f'fields, got {len(row)}')
+            if chunk:
+                yield chunk
+
+        lines_read += len(block)
+
+
+def read_edge_list(source: Union[str, os.PathLike, TextIO],
+                   graph: Graph = None,
+                   delimiter: str = None,
+                   node_type: Callable[[str], Node] = str,
+                   chunk_size: int = 65536,
+                   comment: str = '#') -> Graph:
+    """
+    Read an edge list into a graph, see iter_edge_list for the format. Each
+    chunk of edges is added with Graph.add_edges_from, after adding any
+    endpoints which are not defined nodes yet, so memory use is bounded by the
+    graph itself plus one chunk.
+
+    :param source: the path of the file to read, or an open text file
+    :param graph: the graph to add the edges to, a new Graph if None
+    :param delimiter: the string separating fields, None for any whitespace
+    :param node_type: a function of one argument converting a field to a node
+    :param chunk_size: the number of lines to read at a time
+    :param comment: the prefix of lines to skip
+    :return: the graph the edges were added to
+    :raises ValueError: if a line is malformed, or an edge is defined more
+        than once
+    """
+    if graph is None:
+        graph = Graph()
+
+    with gc_paused():
+        for chunk in iter_edge_list(source, delimiter, node_type, chunk_size,
+                                    comment):
+            endpoints = set(map(itemgetter(0), chunk)).union(
+                map(itemgetter(1), chunk))
+            graph.add_nodes(*filterfalse(graph.has_node, endpoints))
+            graph.add_edges_from(chunk)
+
+    return graph
+
+
+def _open_text(path: Union[str, os.PathLike]) -> TextIO:
+    """
+    Open a file for reading text, decompressing it if it is a gzip file.
+
+    :param path: the path of the file
+    :return: the opened file
+    """
+    with open(path, 'rb') as file:
+        magic = file.read(len(_GZIP_MAGIC))
+
+    if magic == _GZIP_MAGIC:
+        return gzip.open(path, 'rt')
+    return open(path, 'r')
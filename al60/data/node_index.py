@@ -0,0 +1,157 @@
+"""
+Module for interning graph nodes as dense integer ids.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from .types import Node
+
+# marks the slot of an id which is not given to any node
+_FREE = object()
+
+
+class NodeIndex:
+    """
+    A two-way mapping between nodes and dense integer ids. Each node is given
+    an id when it is added, and the id of a removed node is given to the next
+    node added, so the ids of the nodes always lie in range(capacity()) with
+    at most as many gaps as there have been removals since. Graphs store
+    adjacency and weights by id, so lookups hash small ints instead of
+    arbitrary node objects, and per-node data can be kept in lists and arrays
+    indexed by id.
+
+    INVARIANTS:
+    1. self._ids[u] == i <=> self._nodes[i] is u
+    2. i in self._free <=> self._nodes[i] is _FREE
+    """
+
+    def __init__(self, other: 'NodeIndex' = None):
+        """
+        Initialize a new NodeIndex. Either copy an existing NodeIndex, giving
+        each node the same id, or create an empty one.
+
+        :param other: a NodeIndex to copy
+        """
+        if other is not None:
+            self._ids: Dict[Node, int] = dict(other._ids)
+            self._nodes: List[Node] = list(other._nodes)
+            self._free: List[int] = list(other._free)
+        else:
+            self._ids: Dict[Node, int] = dict()
+            self._nodes: List[Node] = list()
+            self._free: List[int] = list()
+
+    def id(self, u: Node) -> int:
+        """
+        Get the id of a node.
+
+        :param u: the node
+        :return: the id of u
+        :raises KeyError: if u is not in this index
+        """
+        return self._ids[u]
+
+    def get(self, u: Node) -> Optional[int]:
+        """
+        Get the id of a node, if it is in this index.
+
+        :param u: the node
+        :return: the id of u, None if u is not in this index
+        """
+        return self._ids.get(u)
+
+    def node(self, i: int) -> Node:
+        """
+        Get the node with the given id.
+
+        :param i: the id, which must belong to a node in this index
+        :return: the node with id i
+        """
+        return self._nodes[i]
+
+    def nodes(self, ids: Iterable[int]) -> Iterator[Node]:
+        """
+        Translate ids into the nodes they belong to, lazily.
+
+        :param ids: the ids, which must all belong to nodes in this index
+        :return: an iterator over the nodes with the given ids, in order
+        """
+        return map(self._nodes.__getitem__, ids)
+
+    def ids(self, nodes: Iterable[Node]) -> Iterator[int]:
+        """
+        Translate nodes into their ids, lazily.
+
+        :param nodes: the nodes, which must all be in this index
+        :return: an iterator over the ids of the given nodes, in order
+        """
+        return map(self._ids.__getitem__, nodes)
+
+    def defined(self, nodes: Iterable[Node]) -> Set[Node]:
+        """
+        Get the given nodes which are in this index. This takes time
+        proportional to the number of given nodes, not the size of the index.
+
+        :param nodes: the nodes to look up
+        :return: the set of given nodes which are in this index
+        """
+        batch = set(nodes)
+        return batch.difference(self.undefined(batch))
+
+    def undefined(self, nodes: Iterable[Node]) -> Set[Node]:
+        """
+        Get the given nodes which are not in this index. This takes time
+        proportional to the number of given nodes, not the size of the index.
+
+        :param nodes: the nodes to look up
+        :return: the set of given nodes which are not in this index
+        """
+        return set(nodes).difference(self._ids)
+
+    def add(self, u: Node) -> int:
+        """
+        Give a node an id. The node must not be in this index yet.
+
+        :param u: the node to add
+        :return: the id given to u
+        """
+        if self._free:
+            i = self._free.pop()
+            self._nodes[i] = u
+        else:
+            i = len(self._nodes)
+            self._nodes.append(u)
+        self._ids[u] = i
+        return i
+
+    def remove(self, u: Node) -> int:
+        """
+        Remove a node, freeing its id to be given to another node.
+
+        :param u: the node to remove
+        :return: the id u had
+        :raises KeyError: if u is not in this index
+        """
+        i = self._ids.pop(u)
+        self._nodes[i] = _FREE
+        self._free.append(i)
+        return i
+
+    def capacity(self) -> int:
+        """
+        Get the number of ids in use or free to be reused. Every id is less
+        than this number, so it is the length needed for a list or array
+        indexed by id.
+
+        :return: the number of ids
+        """
+        return len(self._nodes)
+
+    def __contains__(self, u: Node) -> bool:
+        return u in self._ids
+
+    def __iter__(self) -> Iterator[Node]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
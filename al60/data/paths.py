@@ -0,0 +1,147 @@
+"""
+Module for shortest path representations.
+"""
+
+import math
+
+from typing import Dict, Iterable, List, Optional, Callable
+
+from .types import Node
+from .graphs import Graph
+from .iterators import DijkstraIterator, AStarIterator
+
+
+class ShortestPathTree:
+    """
+    The shortest paths from a single source node to the other nodes of a
+    graph, computed with one pass of a DijkstraIterator. For each settled node,
+    the distance from the source and the predecessor on the shortest path are
+    stored, so any number of paths and distances can be read off of the tree
+    without searching the graph again.
+    """
+
+    def __init__(self, graph: Graph, source: Node,
+                 targets: Iterable[Node] = None, key=None,
+                 heuristic: Callable[[Node], float] = None):
+        """
+        Initialize a new ShortestPathTree by running Dijkstra's algorithm from
+        source. If targets is given, the search stops as soon as every target
+        has been settled (or every reachable node has been settled, if some
+        targets are unreachable). If heuristic is given, A* search is run
+        instead, which settles fewer nodes on the way to the targets.
+
+        :param graph: the graph to operate on
+        :param source: the node to compute shortest paths from
+        :param targets: the nodes to stop the search after settling
+        :param key: a function of one argument used to extract a comparison
+            key to break ties between nodes, see DijkstraIterator
+        :param heuristic: a consistent lower bound on the distance from a node
+            to the targets, see AStarIterator
+        :raises ValueError: if source is not a defined node in graph
+        """
+        self._source = source
+        self._distances: Dict[Node, float] = dict()
+        self._parents: Dict[Node, Optional[Node]] = dict()
+        self._complete = True
+
+        remaining = None if targets is None else set(targets)
+        if heuristic is None:
+            dijkstra = DijkstraIterator(graph, source, key=key)
+        else:
+            dijkstra = AStarIterator(graph, source, heuristic, key=key)
+
+        for (u, d_u) in dijkstra:
+            if d_u == math.inf:
+                # every node left is unreachable
+                break
+            self._distances[u] = d_u
+            self._parents[u] = dijkstra.parent(u)
+
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    self._complete = False
+                    break
+
+    @classmethod
+    def _from_parents(cls, source: Node, distances: Dict[Node, float],
+                      parents: Dict[Node, Optional[Node]])\
+            -> 'ShortestPathTree':
+        """
+        Create a complete ShortestPathTree directly from the results of
+        another shortest path algorithm, without searching the graph.
+
+        :param source: the node all paths start from
+        :param distances: the distance of every node reachable from source
+        :param parents: the predecessor of every node reachable from source,
+            None for source itself
+        :return: the new ShortestPathTree
+        """
+        tree = cls.__new__(cls)
+        tree._source = source
+        tree._distances = distances
+        tree._parents = parents
+        tree._complete = True
+        return tree
+
+    @property
+    def source(self) -> Node:
+        """
+        The node that all paths in this tree start from.
+        """
+        return self._source
+
+    def _verify_settled(self, t: Node) -> None:
+        """
+        Ensure that the shortest path to t is known.
+
+        :param t: the node to check
+        :raises ValueError: if t was not settled by the search
+        """
+        if t not in self._distances:
+            if self._complete:
+                raise ValueError(f'node {t} is not reachable from '
+                                 f'{self._source}')
+            else:
+                raise ValueError(f'node {t} was not settled before the '
+                                 f'search stopped')
+
+    def reached(self, t: Node) -> bool:
+        """
+        Check whether the shortest path from the source to t is known.
+
+        :param t: the node to check
+        :return: True if t was settled by the search, else False
+        """
+        return t in self._distances
+
+    def distance_to(self, t: Node) -> float:
+        """
+        Get the shortest path distance from the source to t in O(1) time.
+
+        :param t: the end node
+        :return: the distance of the shortest path from the source to t
+        :raises ValueError: if t was not settled by the search
+        """
+        self._verify_settled(t)
+        return self._distances[t]
+
+    def path_to(self, t: Node) -> List[Node]:
+        """
+        Get the shortest path from the source to t by following predecessors
+        back from t, in O(length of the path) time.
+
+        :param t: the end node
+        :return: a list of nodes making up the shortest path from the source
+            to t
+        :raises ValueError: if t was not settled by the search
+        """
+        self._verify_settled(t)
+
+        path = [t]
+        u = self._parents[t]
+        while u is not None:
+            path.append(u)
+            u = self._parents[u]
+        path.reverse()
+        return path
@@ -0,0 +1,215 @@
+"""
+Opt-in memoization of algorithm results on graphs which rarely change.
+"""
+
+import functools
+import sys
+import weakref
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Set, Tuple
+
+from al60.data.graphs import Graph
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics of a ResultCache.
+
+    hits: the number of calls answered from the cache
+    misses: the number of calls which computed their result
+    entries: the number of results currently cached
+    size: the estimated size of the cached results, in bytes
+    """
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+
+class ResultCache:
+    """
+    A least recently used cache of the results of functions whose first
+    argument is a graph, such as the functions of al60.algorithms. Results are
+    keyed by the identity and version of the graph, the function and the
+    other arguments, so a result is reused until the graph is mutated. When
+    the number of results or their estimated total size exceeds its bound,
+    the least recently used results are evicted.
+
+    Cached results are returned as is, not copied, so they must not be
+    mutated. Calls with unhashable arguments are not cached, and neither are
+    exceptions.
+
+        cache = ResultCache(max_entries=256)
+        topological_sort = cache.wrap(algorithms.topological_sort)
+        topological_sort(g)  # computed
+        topological_sort(g)  # cache hit, until g is mutated
+
+    INVARIANTS:
+    1. self._size == sum(size for (_, size) in self._entries.values())
+    2. key in self._entries <=> key in self._by_graph[key[0]]
+    """
+
+    def __init__(self, max_entries: int = 128, max_size: int = None):
+        """
+        Initialize a new, empty ResultCache.
+
+        :param max_entries: the maximum number of results to keep
+        :param max_size: the maximum estimated total size of the results to
+            keep in bytes, None for no bound
+        :raises ValueError: if max_entries or max_size is negative
+        """
+        if max_entries < 0 or (max_size is not None and max_size < 0):
+            raise ValueError('cache bounds cannot be negative')
+
+        self._max_entries = max_entries
+        self._max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        # the keys of the cached results of each graph, by graph identity
+        self._by_graph: Dict[int, Set[Tuple]] = dict()
+        self._hits = 0
+        self._misses = 0
+
+    def call(self, function: Callable, graph: Graph, *args, **kwargs) -> Any:
+        """
+        Call function(graph, *args, **kwargs), or return its cached result.
+
+        :param function: the function to call
+        :param graph: the graph to call it on, which must have a version
+        :param args: the other positional arguments
+        :param kwargs: the keyword arguments
+        :return: the result of the call
+        """
+        key = (id(graph), graph.version, function, args,
+               tuple(sorted(kwargs.items())))
+        try:
+            (result, _) = self._entries[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # an argument is unhashable
+            return function(graph, *args, **kwargs)
+        else:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return result
+
+        self._misses += 1
+        result = function(graph, *args, **kwargs)
+        self._store(key, graph, result)
+        return result
+
+    def wrap(self, function: Callable) -> Callable:
+        """
+        Wrap a function so that its calls go through this cache.
+
+        :param function: the function to wrap, whose first argument is a graph
+        :return: the wrapped function
+        """
+        @functools.wraps(function)
+        def cached(graph, *args, **kwargs):
+            return self.call(function, graph, *args, **kwargs)
+
+        return cached
+
+    def info(self) -> CacheInfo:
+        """
+        Get the statistics of this cache.
+
+        :return: the statistics
+        """
+        return CacheInfo(self._hits, self._misses, len(self._entries),
+                         self._size)
+
+    def clear(self) -> None:
+        """
+        Drop every cached result.
+        """
+        self._entries.clear()
+        self._by_graph.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: Tuple, graph: Graph, result: Any) -> None:
+        """
+        Cache a result, dropping the results computed from older versions of
+        the graph, and evict results until this cache is within its bounds.
+
+        :param key: the key of the result
+        :param graph: the graph the result was computed from
+        :param result: the result
+        """
+        graph_id = key[0]
+        keys = self._by_graph.get(graph_id)
+        if keys is None:
+            # graph ids are only unique while the graph is alive
+            keys = self._by_graph[graph_id] = set()
+            weakref.finalize(graph, self._forget, graph_id)
+        for stale in [k for k in keys if k[1] != key[1]]:
+            self._drop(stale)
+
+        size = _sizeof(result)
+        self._entries[key] = (result, size)
+        self._size += size
+        keys.add(key)
+
+        while self._entries and (
+                len(self._entries) > self._max_entries or
+                (self._max_size is not None and self._size > self._max_size)):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Tuple) -> None:
+        """
+        Drop one cached result.
+
+        :param key: the key of the result
+        """
+        (_, size) = self._entries.pop(key)
+        self._size -= size
+        self._by_graph[key[0]].discard(key)
+
+    def _forget(self, graph_id: int) -> None:
+        """
+        Drop the cached results of a graph which no longer exists.
+
+        :param graph_id: the identity the graph had
+        """
+        for key in self._by_graph.pop(graph_id, ()):
+            (_, size) = self._entries.pop(key)
+            self._size -= size
+
+
+def _sizeof(value: Any, seen: Set[int] = None) -> int:
+    """
+    Estimate the memory used by a value, including the contents of nested
+    containers and the attributes of objects, such as the distances and
+    predecessors of a ShortestPathTree. Objects reachable in more than one
+    way are only counted once.
+
+    :param value: the value
+    :param seen: the identities of the objects counted so far
+    :return: the estimated size in bytes
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen)
+                    for (k, v) in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(item, seen) for item in value)
+    else:
+        if isinstance(getattr(value, '__dict__', None), dict):
+            size += _sizeof(value.__dict__, seen)
+        for cls in type(value).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                size += _sizeof(getattr(value, name, None), seen)
+    return size
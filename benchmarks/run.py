@@ -0,0 +1,241 @@
+"""
+Benchmarks for graph construction, iterators and algorithms.
+
+Run from the repository root:
+
+    python -m benchmarks [--sizes 1000,10000] [--degrees 2,8] [--repeat 5]
+                         [--output results.json]
+    python -m benchmarks compare base.json head.json
+
+Every case is timed on seeded G(n, p) random graphs (see data.generators) for
+each combination of size and average out-degree, and the results are written
+as JSON so that runs from different commits can be compared.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import Callable, Dict, List, Tuple
+
+from al60.data.graphs import Graph
+from al60.data.generators import erdos_renyi, random_dag
+from al60.data.iterators import DepthFirstIterator, BreadthFirstIterator,\
+    DijkstraIterator
+from al60.algorithms import topological_sort, components, distance,\
+    shortest_path, bellman_ford, level_bfs, multi_source_bfs
+
+# the number of (s, t) pairs timed by the point-to-point cases
+QUERIES = 20
+
+
+def build(edges: List[Tuple[int, int, float]], n: int) -> Graph:
+    """
+    Build a graph on the nodes 0..n-1 with the bulk path.
+
+    :param edges: the (u, v, weight) tuples to add
+    :param n: the number of nodes
+    :return: the new graph
+    """
+    g = Graph()
+    g.add_nodes(*range(n))
+    g.add_edges_from(edges)
+    return g
+
+
+def cases(n: int, degree: float, seed: int) -> Dict[str, Callable[[], object]]:
+    """
+    Create the benchmark cases for one graph size and density. Each case is a
+    function of no arguments which runs the measured operation once.
+
+    :param n: the number of nodes
+    :param degree: the average out-degree
+    :param seed: the random seed
+    :return: a dict of case names to case functions
+    """
+    p = min(degree / max(n - 1, 1), 1)
+    g = erdos_renyi(n, p, seed, weights=(1, 100))
+    dag = random_dag(n, p, seed)
+    undirected = erdos_renyi(n, p, seed, directed=False)
+    edges = [(u, v, g.weight(u, v)) for (u, v) in g.edges()]
+
+    rand = random.Random(seed)
+    pairs = [(rand.randrange(n), rand.randrange(n)) for _ in range(QUERIES)]
+
+    def construct():
+        h = Graph()
+        h.add_nodes(*range(n))
+        for (u, v, w) in edges:
+            h.add_edge(u, v, w)
+
+    def point_to_point(query, **kwargs):
+        def run():
+            for (s, t) in pairs:
+                try:
+                    query(g, s, t, **kwargs)
+                except ValueError:
+                    pass
+        return run
+
+    return {
+        'construct': construct,
+        'construct_bulk': lambda: build(edges, n),
+        'generate': lambda: erdos_renyi(n, p, seed, weights=(1, 100)),
+        'edges': g.edges,
+        'dfs': lambda: sum(1 for _ in DepthFirstIterator(g, 0)),
+        'bfs': lambda: sum(1 for _ in BreadthFirstIterator(g, 0)),
+        'level_bfs': lambda: level_bfs(g, 0),
+        'multi_source_bfs': lambda: multi_source_bfs(g, range(min(n, 64))),
+        'dijkstra': lambda: sum(1 for _ in DijkstraIterator(g, 0)),
+        'bellman_ford': lambda: bellman_ford(g, 0),
+        'topological_sort': lambda: topological_sort(dag),
+        'components': lambda: components(undirected),
+        'distance': point_to_point(distance),
+        'distance_bidirectional': point_to_point(distance,
+                                                 bidirectional=True),
+        'shortest_path': point_to_point(shortest_path),
+    }
+
+
+def measure(case: Callable[[], object], repeat: int) -> List[float]:
+    """
+    Time a case.
+
+    :param case: the case to run
+    :param repeat: the number of times to run it
+    :return: the running time of each run, in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def metadata() -> Dict[str, str]:
+    """
+    Describe the environment the benchmarks run in.
+
+    :return: a dict of metadata
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'],
+                                capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def run(sizes: List[int], degrees: List[float], repeat: int, seed: int,
+        only: List[str] = None) -> Dict:
+    """
+    Run every case for every combination of size and degree.
+
+    :param sizes: the numbers of nodes
+    :param degrees: the average out-degrees
+    :param repeat: the number of runs of each case
+    :param seed: the random seed
+    :param only: the names of the cases to run, None for all of them
+    :return: the results, ready to be written as JSON
+    """
+    results = []
+    for n in sizes:
+        for degree in degrees:
+            for (name, case) in cases(n, degree, seed).items():
+                if only and name not in only:
+                    continue
+                times = measure(case, repeat)
+                results.append({
+                    'case': name,
+                    'nodes': n,
+                    'degree': degree,
+                    'repeat': repeat,
+                    'min': min(times),
+                    'median': statistics.median(times),
+                    'mean': statistics.mean(times),
+                })
+                print(f'{name:>24} n={n:<8} d={degree:<5} '
+                      f'{min(times):.6f}s', file=sys.stderr)
+
+    return {'meta': metadata(), 'seed': seed, 'results': results}
+
+
+def compare(base: Dict, head: Dict) -> List[str]:
+    """
+    Compare the minimum times of two runs case by case.
+
+    :param base: the results of the earlier run
+    :param head: the results of the later run
+    :return: a line per case present in both runs, with the ratio of head to
+        base time (above 1 means head is slower)
+    """
+    def key(r):
+        return r['case'], r['nodes'], r['degree']
+
+    before = {key(r): r['min'] for r in base['results']}
+    lines = []
+    for r in head['results']:
+        if key(r) in before and before[key(r)] > 0:
+            ratio = r['min'] / before[key(r)]
+            lines.append(f'{r["case"]:>24} n={r["nodes"]:<8} '
+                         f'd={r["degree"]:<5} {ratio:6.2f}x')
+    return lines
+
+
+def main(argv: List[str] = None) -> None:
+    """
+    Run the benchmarks from the command line.
+
+    :param argv: the command line arguments, sys.argv[1:] if None
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv[:1] == ['compare']:
+        parser = argparse.ArgumentParser(prog='python -m benchmarks compare')
+        parser.add_argument('base')
+        parser.add_argument('head')
+        args = parser.parse_args(argv[1:])
+        with open(args.base) as base, open(args.head) as head:
+            print('\n'.join(compare(json.load(base), json.load(head))))
+        return
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='comma-separated numbers of nodes')
+    parser.add_argument('--degrees', default='2,8',
+                        help='comma-separated average out-degrees')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', default=None,
+                        help='comma-separated names of cases to run')
+    parser.add_argument('--output', default=None,
+                        help='file to write the JSON results to, '
+                             'standard output if not given')
+    args = parser.parse_args(argv)
+
+    results = run([int(n) for n in args.sizes.split(',')],
+                  [float(d) for d in args.degrees.split(',')],
+                  args.repeat, args.seed,
+                  args.only.split(',') if args.only else None)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
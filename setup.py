@@ -1,8 +1,12 @@
-from distutils.core import setup
+from setuptools import setup
 
-# TODO: Remove external heapdict requirement
 setup(name='al60',
       version='0.0',
       description='Various algorithm and data structure implementations',
       author='Graham Preston',
-      packages=['al60'], requires=['heapdict'])
+      packages=['al60', 'al60.data'],
+      extras_require={
+          # vectorized algorithms: bellman_ford(vectorized=True) and
+          # delta_stepping
+          'numpy': ['numpy'],
+      })
@@ -3,11 +3,22 @@ Tests for algorithm implementations in algorithms module.
 """
 
 import unittest
+import unittest.mock
 import itertools
+import math
+import random
 
-from al60.data.graphs import Undirected, Graph
+from al60.data.graphs import Undirected, Graph, FrozenGraph, Unweighted
 from al60.algorithms import post_order, topological_sort, components,\
-    shortest_path, distance
+    shortest_path, distance, shortest_path_tree, distances, shortest_paths,\
+    bellman_ford, delta_stepping, level_bfs, multi_source_bfs
+from al60.data.generators import random_dag, erdos_renyi, grid
+from al60.data.iterators import DijkstraIterator, BreadthFirstIterator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class TestGraphAlgorithms(unittest.TestCase):
@@ -72,6 +83,8 @@ class TestGraphAlgorithms(unittest.TestCase):
         actual = post_order(self.g1, 'u')
         self.assertTrue(actual in acceptable_orders)
         self.assertEqual(['y', 'x'], post_order(self.g1, 'x'))
+        self.assertTrue(post_order(FrozenGraph(self.g1), 'u')
+                        in acceptable_orders)
 
     def test_topological_sort(self):
         self.assertEqual([], topological_sort(self.g_empty))
@@ -80,16 +93,310 @@ class TestGraphAlgorithms(unittest.TestCase):
         for u, v in self.g2.edges():
             self.assertTrue(g2_order.index(u) < g2_order.index(v))
 
-        # TODO: Test key
+        self.assertEqual(g2_order, topological_sort(FrozenGraph(self.g2)))
+
+    def test_topological_sort_key(self):
+        # without a key, ties are broken by the smallest node
+        self.assertEqual(['a', 'b', 'c', 'd'], topological_sort(self.g2))
+        # reverse alphabetical order
+        self.assertEqual(['c', 'a', 'b', 'd'],
+                         topological_sort(self.g2, key=lambda x: -ord(x)))
+
+        wide = Graph()
+        wide.add_nodes(*range(100))
+        for v in range(1, 100):
+            wide.add_edge(0, v)
+        self.assertEqual(list(range(100)), topological_sort(wide))
+        self.assertEqual([0] + list(range(99, 0, -1)),
+                         topological_sort(wide, key=lambda x: -x))
+
+    def test_topological_sort_cycle(self):
+        self.assertRaises(ValueError, topological_sort, self.g1)
+        self.assertRaises(ValueError, topological_sort, self.g3)
+
+        self.g2.add_edge('d', 'a')
+        self.assertRaises(ValueError, topological_sort, self.g2)
 
     def test_count_components(self):
         self.assertTrue(tuple(components(self.g3)) in
                         itertools.permutations([{'a', 'b', 'c'},
                                                 {'x', 'y', 'z'}]))
-        # TODO: More tests
+        self.assertTrue(tuple(components(FrozenGraph(self.g3))) in
+                        itertools.permutations([{'a', 'b', 'c'},
+                                                {'x', 'y', 'z'}]))
+
+        self.g3.add_node('lonely')
+        self.g3.add_edge('z', 'c')
+        self.assertEqual([{'a', 'b', 'c', 'x', 'y', 'z'}, {'lonely'}],
+                         sorted(components(self.g3), key=len, reverse=True))
+        self.assertEqual([], components(Undirected()))
+
+    def test_level_bfs(self):
+        result = level_bfs(self.g1, 'u')
+
+        self.assertEqual({'u': 0, 'a': 1, 'c': 1, 'b': 2}, result.levels)
+        self.assertEqual('u', result.order[0])
+        self.assertEqual({'a', 'c'}, set(result.order[1:3]))
+        self.assertEqual('b', result.order[3])
+
+        self.assertEqual({'x': 0, 'y': 1}, level_bfs(self.g1, 'x').levels)
+        self.assertEqual(['y'], level_bfs(FrozenGraph(self.g1), 'y').order)
+        self.assertRaises(ValueError, level_bfs, self.g1, 'fake')
+
+    def test_level_bfs_random(self):
+        directed = erdos_renyi(400, 0.01, seed=3000)
+        directed.remove_node(17)
+        graphs = [directed, FrozenGraph(directed),
+                  erdos_renyi(400, 0.01, seed=3000, directed=False),
+                  grid(12, 15)]
+
+        for g in graphs:
+            s = min(g.nodes())
+            # levels from a plain breadth-first search
+            expected = {s: 0}
+            for u in BreadthFirstIterator(g, s):
+                for v in g.iter_neighbors(u):
+                    expected.setdefault(v, expected[u] + 1)
+
+            # always top-down, always bottom-up and switching
+            for (alpha, beta) in ((0, 0), (math.inf, math.inf), (14, 24)):
+                result = level_bfs(g, s, alpha=alpha, beta=beta)
+                self.assertEqual(expected, result.levels)
+                self.assertEqual(len(expected), len(result.order))
+                self.assertEqual(sorted(expected.values()),
+                                 [result.levels[u] for u in result.order])
+
+    def test_multi_source_bfs(self):
+        result = multi_source_bfs(self.g1, ['u', 'x', 'u', 'b'])
+        hops = {(s, v): result.hops[i][j]
+                for (i, s) in enumerate(result.sources)
+                for (j, v) in enumerate(result.nodes)}
+
+        self.assertEqual(['u', 'x', 'b'], result.sources)
+        self.assertEqual(self.g1.nodes(), set(result.nodes))
+        self.assertEqual(0, hops['u', 'u'])
+        self.assertEqual(2, hops['u', 'b'])
+        self.assertEqual(1, hops['x', 'y'])
+        self.assertEqual(math.inf, hops['x', 'u'])
+        self.assertEqual(2, hops['b', 'c'])
+        self.assertEqual(math.inf, hops['b', 'y'])
+
+        self.assertEqual([], multi_source_bfs(self.g1, []).hops)
+        self.assertRaises(ValueError, multi_source_bfs, self.g1, ['u', 'z'])
+
+    def test_multi_source_bfs_random(self):
+        g = Unweighted(erdos_renyi(300, 0.01, seed=3000))
+        g.remove_node(17)
+        # more sources than fit in a 64-bit mask
+        sources = random.Random(3000).sample(sorted(g.nodes()), 100)
+
+        for h in (g, FrozenGraph(g)):
+            result = multi_source_bfs(h, sources)
+            self.assertEqual(sources, result.sources)
+            for (s, row) in zip(sources, result.hops):
+                levels = level_bfs(h, s).levels
+                self.assertEqual([levels.get(v, math.inf)
+                                  for v in result.nodes], row)
 
     def test_shortest_path(self):
         self.assertEqual(['a', 'c', 'b', 'd'], shortest_path(self.g4, 'a', 'd'))
 
+    def test_shortest_path_unreachable(self):
+        self.g4.add_node('z')
+
+        self.assertRaises(ValueError, shortest_path, self.g4, 'a', 'z')
+        self.assertRaises(ValueError, shortest_path, self.g4, 'a', 'fake')
+        self.assertRaises(ValueError, distance, self.g4, 'a', 'z')
+        self.assertEqual({'z': math.inf}, distances(self.g4, 'a', ['z']))
+
+    def test_shortest_path_tree(self):
+        tree = shortest_path_tree(self.g4, 'a')
+
+        self.assertEqual(['a', 'c', 'e'], tree.path_to('e'))
+        self.assertEqual(9, tree.distance_to('d'))
+
     def test_distance(self):
         self.assertEqual(9, distance(self.g4, 'a', 'd'))
+        self.assertEqual(9, distance(FrozenGraph(self.g4), 'a', 'd'))
+
+    def test_distances(self):
+        self.g4.add_node('z')
+
+        self.assertEqual({'d': 9, 'e': 5, 'z': math.inf, 'fake': math.inf},
+                         distances(self.g4, 'a', ['d', 'e', 'z', 'fake']))
+        self.assertEqual({'b': 7}, distances(FrozenGraph(self.g4), 'a', ['b']))
+        self.assertEqual({}, distances(self.g4, 'a', []))
+        self.assertRaises(ValueError, distances, self.g4, 'fake', ['a'])
+
+    def test_shortest_paths(self):
+        self.g4.add_node('z')
+
+        self.assertEqual({'a': ['a'], 'd': ['a', 'c', 'b', 'd'], 'z': None},
+                         shortest_paths(self.g4, 'a', iter(['a', 'd', 'z'])))
+        self.assertRaises(ValueError, shortest_paths, self.g4, 'fake', ['a'])
+
+    def test_bidirectional(self):
+        self.assertEqual(['a', 'c', 'b', 'd'],
+                         shortest_path(self.g4, 'a', 'd', bidirectional=True))
+        self.assertEqual(9, distance(self.g4, 'a', 'd', bidirectional=True))
+        self.assertEqual(0, distance(self.g4, 'a', 'a', bidirectional=True))
+        self.assertEqual(['a'],
+                         shortest_path(self.g4, 'a', 'a', bidirectional=True))
+
+        self.g4.add_node('z')
+        self.assertRaises(ValueError, distance, self.g4, 'a', 'z',
+                          bidirectional=True)
+        self.assertRaises(ValueError, distance, self.g4, 'z', 'a',
+                          bidirectional=True)
+        self.assertRaises(ValueError, distance, self.g4, 'fake', 'a',
+                          bidirectional=True)
+        self.assertRaises(ValueError, distance, self.g4, 'a', 'fake',
+                          bidirectional=True)
+
+    def test_bidirectional_random(self):
+        rand = random.Random(3000)
+        g = Graph()
+        g.add_nodes(*range(60))
+        for _ in range(240):
+            u, v = rand.randrange(60), rand.randrange(60)
+            if u != v and v not in g.neighbors(u):
+                g.add_edge(u, v, weight=rand.randint(1, 20))
+
+        for _ in range(50):
+            s, t = rand.randrange(60), rand.randrange(60)
+            try:
+                expected = distance(g, s, t)
+            except ValueError:
+                self.assertRaises(ValueError, distance, g, s, t,
+                                  bidirectional=True)
+                continue
+
+            path = shortest_path(g, s, t, bidirectional=True)
+            self.assertEqual(expected, distance(g, s, t, bidirectional=True))
+            self.assertEqual(expected, sum(g.weight(u, v)
+                                           for u, v in zip(path, path[1:])))
+            self.assertEqual((s, t), (path[0], path[-1]))
+
+    def test_negative_weights(self):
+        self.g4.add_edge('a', 'e', weight=-1)
+
+        self.assertEqual(['a', 'e', 'd'], shortest_path(self.g4, 'a', 'd'))
+        self.assertEqual(8, distance(self.g4, 'a', 'd'))
+        self.assertEqual({'e': -1, 'd': 8},
+                         distances(self.g4, 'a', ['e', 'd']))
+        self.assertEqual(['a', 'c', 'b'],
+                         shortest_path_tree(self.g4, 'a').path_to('b'))
+
+        self.assertRaises(ValueError, distance, self.g4, 'a', 'd',
+                          bidirectional=True)
+        self.assertRaises(ValueError, distance, self.g4, 'a', 'd',
+                          heuristic=lambda v: 0)
+
+    def test_negative_cycle(self):
+        self.g4.add_edge('e', 'c', weight=-3)
+        self.g4.add_node('z')
+
+        self.assertRaises(ValueError, distance, self.g4, 'a', 'd')
+        self.assertRaises(ValueError, bellman_ford, self.g4, 'a')
+        # the cycle is not reachable from 'z'
+        self.assertEqual(0, bellman_ford(self.g4, 'z').distance_to('z'))
+
+    def test_bellman_ford(self):
+        tree = bellman_ford(self.g4, 'a')
+
+        self.assertEqual(['a', 'c', 'b', 'd'], tree.path_to('d'))
+        self.assertEqual(5, tree.distance_to('e'))
+        self.assertRaises(ValueError, bellman_ford, self.g4, 'fake')
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_bellman_ford_vectorized(self):
+        self.g4.add_node('z')
+        tree = bellman_ford(self.g4, 'a', vectorized=True)
+
+        self.assertEqual(['a', 'c', 'b', 'd'], tree.path_to('d'))
+        self.assertEqual(5, tree.distance_to('e'))
+        self.assertFalse(tree.reached('z'))
+
+        self.g4.add_edge('e', 'c', weight=-3)
+        self.assertRaises(ValueError, bellman_ford, self.g4, 'a',
+                          vectorized=True)
+        self.assertRaises(ValueError, bellman_ford, FrozenGraph(self.g4), 'a',
+                          vectorized=True)
+
+    def test_bellman_ford_random(self):
+        # a DAG has no cycles, so the distances follow the topological order
+        g = random_dag(80, 0.1, seed=3000, weights=(-10, 10))
+        expected = {0: 0}
+        for v in range(1, 80):
+            through = [expected[u] + g.weight(u, v)
+                       for u in g.iter_parents(v) if u in expected]
+            if through:
+                expected[v] = min(through)
+
+        modes = [False] if numpy is None else [False, True]
+        for vectorized in modes:
+            tree = bellman_ford(g, 0, vectorized=vectorized)
+            for v in range(80):
+                self.assertEqual(v in expected, tree.reached(v))
+                if v in expected:
+                    path = tree.path_to(v)
+                    self.assertAlmostEqual(expected[v], tree.distance_to(v))
+                    self.assertAlmostEqual(
+                        expected[v],
+                        sum(g.weight(u, w) for u, w in zip(path, path[1:])))
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_delta_stepping(self):
+        self.g4.add_node('z')
+
+        for delta in (None, 0.5, 3, 100):
+            tree = delta_stepping(self.g4, 'a', delta=delta)
+            self.assertEqual(['a', 'c', 'b', 'd'], tree.path_to('d'))
+            self.assertEqual(9, tree.distance_to('d'))
+            self.assertEqual(['a'], tree.path_to('a'))
+            self.assertFalse(tree.reached('z'))
+
+        self.assertRaises(ValueError, delta_stepping, self.g4, 'fake')
+        self.assertRaises(ValueError, delta_stepping, self.g4, 'a', delta=0)
+        self.assertRaises(ValueError, delta_stepping, self.g4, 'a',
+                          workers=0)
+        self.g4.add_edge('a', 'e', weight=-1)
+        self.assertRaises(ValueError, delta_stepping, self.g4, 'a')
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_delta_stepping_random(self):
+        g = FrozenGraph(erdos_renyi(300, 0.02, seed=3000, weights=(0, 20)))
+        expected = dict(DijkstraIterator(g, 0))
+
+        for delta in (None, 1, 50):
+            tree = delta_stepping(g, 0, delta=delta)
+            for v in g.nodes():
+                self.assertEqual(v in expected, tree.reached(v))
+                if v in expected:
+                    path = tree.path_to(v)
+                    self.assertEqual(expected[v], tree.distance_to(v))
+                    self.assertAlmostEqual(
+                        expected[v],
+                        sum(g.weight(u, w) for u, w in zip(path, path[1:])))
+
+        # split every batch between the workers, however small
+        with unittest.mock.patch('al60.algorithms._PARALLEL_EDGES', 0):
+            tree = delta_stepping(g, 0, workers=2)
+        for (v, d) in expected.items():
+            self.assertEqual(d, tree.distance_to(v))
+
+    def test_heuristic(self):
+        # a heuristic of 0 is always consistent
+        self.assertEqual(['a', 'c', 'b', 'd'],
+                         shortest_path(self.g4, 'a', 'd',
+                                       heuristic=lambda v: 0))
+        self.assertEqual(9, distance(self.g4, 'a', 'd',
+                                     heuristic=lambda v: 0))
+
+        # lower bounds on the distance to 'd'
+        bounds = {'a': 9, 'b': 2, 'c': 6, 'd': 0, 'e': 9}
+        self.assertEqual(9, distance(self.g4, 'a', 'd',
+                                     heuristic=bounds.get))
+
+        self.assertRaises(ValueError, distance, self.g4, 'a', 'd',
+                          bidirectional=True, heuristic=bounds.get)
@@ -0,0 +1,141 @@
+"""
+Tests for the binary graph file format defined in data.binary.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+from mmap import mmap as map_file
+from unittest import mock
+
+from al60.data.graphs import Graph, Undirected, FrozenGraph
+from al60.data.binary import save_binary, load_binary
+from al60.data.iterators import BreadthFirstIterator, DijkstraIterator
+from al60.algorithms import distance, shortest_path, topological_sort,\
+    components
+
+
+class TestBinary(unittest.TestCase):
+    """
+    Tests for save_binary and load_binary.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'graph.bin')
+
+        self.g1 = Graph()
+        self.g1.add_nodes('a', 'b', 'c', 'd', 'e', 'lonely')
+        self.g1.add_edge('a', 'b', weight=10)
+        self.g1.add_edge('a', 'c', weight=3)
+        self.g1.add_edge('b', 'd', weight=2)
+        self.g1.add_edge('c', 'b', weight=4.5)
+        self.g1.add_edge('c', 'd', weight=8)
+        self.g1.add_edge('c', 'e', weight=2)
+        self.g1.add_edge('d', 'e', weight=7)
+
+        self.g2 = Undirected()
+        self.g2.add_nodes((0, 0), (0, 1), (1, 0), 'x')
+        self.g2.add_edge((0, 0), (0, 1))
+        self.g2.add_edge((1, 0), (0, 0), weight=2)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip_directed(self):
+        save_binary(self.g1, self.path)
+        loaded = load_binary(self.path)
+
+        self.assertTrue(loaded.is_directed())
+        self.assertEqual(FrozenGraph(self.g1), loaded)
+        self.assertEqual(self.g1.edges(), loaded.edges())
+        for (u, v) in self.g1.edges():
+            self.assertEqual(self.g1.weight(u, v), loaded.weight(u, v))
+        for u in self.g1.nodes():
+            self.assertEqual(self.g1.parents(u), loaded.parents(u))
+
+    def test_round_trip_undirected(self):
+        save_binary(self.g2, self.path)
+        loaded = load_binary(self.path)
+
+        self.assertFalse(loaded.is_directed())
+        self.assertEqual({(0, 1), (1, 0)}, loaded.neighbors((0, 0)))
+        self.assertEqual(2, loaded.weight((0, 0), (1, 0)))
+        self.assertEqual(set(), loaded.parents('x'))
+
+    def test_save_frozen(self):
+        save_binary(FrozenGraph(self.g2), self.path)
+        self.assertEqual(FrozenGraph(self.g2), load_binary(self.path))
+
+    def test_algorithms(self):
+        save_binary(self.g1, self.path)
+        loaded = load_binary(self.path)
+
+        self.assertEqual(list(DijkstraIterator(self.g1, 'a')),
+                         list(DijkstraIterator(loaded, 'a')))
+        self.assertEqual(list(BreadthFirstIterator(self.g1, 'a')),
+                         list(BreadthFirstIterator(loaded, 'a')))
+        self.assertEqual(['a', 'c', 'b', 'd'], shortest_path(loaded, 'a', 'd'))
+        self.assertEqual(9.5, distance(loaded, 'a', 'd', bidirectional=True))
+        self.assertEqual(topological_sort(self.g1), topological_sort(loaded))
+        # the traversals read the mapped rows without keeping a sorted copy
+        self.assertEqual({}, loaded._sorted._natural)
+
+        save_binary(self.g2, self.path)
+        loaded = load_binary(self.path)
+        self.assertEqual(2, len(components(loaded)))
+        self.assertEqual(((0, 1), (1, 0)), loaded.sorted_neighbors((0, 0)))
+
+    def test_close(self):
+        save_binary(self.g1, self.path)
+        with load_binary(self.path) as loaded:
+            self.assertEqual(9.5, distance(loaded, 'a', 'd'))
+            mapping = loaded._mapping
+
+        self.assertTrue(mapping.closed)
+        self.assertRaises(ValueError, loaded.weight, 'a', 'b')
+        loaded.close()
+
+        save_binary(self.g2, self.path)
+        loaded = load_binary(self.path)
+        mapping = loaded._mapping
+        loaded.close()
+        self.assertTrue(mapping.closed)
+
+        # graphs which are not backed by a file are unaffected
+        frozen = FrozenGraph(self.g1)
+        frozen.close()
+        self.assertEqual(10, frozen.weight('a', 'b'))
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a graph file at all' * 10)
+        self.assertRaises(ValueError, load_binary, self.path)
+
+        with open(self.path, 'wb') as file:
+            file.write(b'short')
+        self.assertRaises(ValueError, load_binary, self.path)
+
+    def test_invalid_file_closed(self):
+        save_binary(self.g1, self.path)
+        with open(self.path, 'r+b') as file:
+            # the node count, which no longer matches the node table
+            file.seek(16)
+            file.write((100).to_bytes(8, sys.byteorder))
+
+        mappings = []
+
+        def open_mapping(*args, **kwargs):
+            mappings.append(map_file(*args, **kwargs))
+            return mappings[-1]
+
+        with mock.patch('mmap.mmap', open_mapping):
+            self.assertRaises(ValueError, load_binary, self.path)
+        self.assertEqual(1, len(mappings))
+        self.assertTrue(mappings[0].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for disjoint-set structures defined in data.disjoint_sets.
+"""
+
+import unittest
+import itertools
+
+from al60.data.graphs import Undirected
+from al60.data.disjoint_sets import DisjointSets, ConnectedComponents
+
+
+class TestDisjointSets(unittest.TestCase):
+    """
+    Tests for DisjointSets.
+    """
+
+    def setUp(self):
+        self.sets = DisjointSets(range(10))
+
+    def test_add(self):
+        self.assertEqual(10, len(self.sets))
+        self.assertEqual(10, self.sets.count())
+        self.assertRaises(ValueError, self.sets.add, 3)
+        self.assertRaises(ValueError, DisjointSets, [1, 2, 1])
+
+        self.sets.add('new')
+        self.assertTrue('new' in self.sets)
+        self.assertEqual(11, self.sets.count())
+
+    def test_find_undefined(self):
+        self.assertRaises(ValueError, self.sets.find, 'fake')
+        self.assertRaises(ValueError, self.sets.union, 1, 'fake')
+
+    def test_union(self):
+        self.assertTrue(self.sets.union(0, 1))
+        self.assertTrue(self.sets.union(2, 3))
+        self.assertTrue(self.sets.union(1, 3))
+        self.assertFalse(self.sets.union(0, 2))
+
+        self.assertTrue(self.sets.connected(0, 3))
+        self.assertFalse(self.sets.connected(0, 4))
+        self.assertEqual(self.sets.find(0), self.sets.find(2))
+        self.assertEqual(7, self.sets.count())
+
+    def test_sets(self):
+        for x in range(0, 10, 2):
+            self.sets.union(0, x)
+
+        actual = self.sets.sets()
+        self.assertEqual(6, len(actual))
+        self.assertTrue({0, 2, 4, 6, 8} in actual)
+        self.assertTrue({7} in actual)
+
+    def test_long_chain(self):
+        # find must not recurse on long paths
+        sets = DisjointSets(range(100000))
+        for x in range(1, 100000):
+            sets.union(x - 1, x)
+
+        self.assertTrue(sets.connected(0, 99999))
+        self.assertEqual(1, sets.count())
+
+
+class TestConnectedComponents(unittest.TestCase):
+    """
+    Tests for ConnectedComponents.
+    """
+
+    def setUp(self):
+        self.g1 = Undirected()
+        self.g1.add_nodes('a', 'b', 'c', 'x', 'y', 'z')
+        self.g1.add_edge('a', 'b')
+        self.g1.add_edge('a', 'c')
+        self.g1.add_edge('x', 'y')
+
+        self.comps = ConnectedComponents(self.g1)
+
+    def test_initial(self):
+        self.assertEqual(3, self.comps.count())
+        self.assertTrue(tuple(self.comps.components()) in
+                        itertools.permutations([{'a', 'b', 'c'},
+                                                {'x', 'y'}, {'z'}]))
+        self.assertTrue(self.comps.connected('b', 'c'))
+        self.assertFalse(self.comps.connected('a', 'x'))
+        self.assertTrue(self.comps.graph is self.g1)
+
+    def test_add_edge(self):
+        self.comps.add_edge('y', 'z', weight=3)
+
+        self.assertEqual(2, self.comps.count())
+        self.assertTrue(self.comps.connected('x', 'z'))
+        self.assertEqual(3, self.g1.weight('z', 'y'))
+
+        self.comps.add_edge('c', 'x')
+        self.assertEqual(1, self.comps.count())
+        self.assertTrue(self.comps.connected('a', 'z'))
+
+        self.assertRaises(ValueError, self.comps.add_edge, 'b', 'a')
+        self.assertRaises(ValueError, self.comps.add_edge, 'a', 'fake')
+
+    def test_add_node(self):
+        self.comps.add_node('new')
+
+        self.assertTrue('new' in self.g1.nodes())
+        self.assertEqual(4, self.comps.count())
+        self.assertFalse(self.comps.connected('new', 'a'))
+        self.assertRaises(ValueError, self.comps.add_node, 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
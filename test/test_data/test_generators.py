@@ -0,0 +1,83 @@
+"""
+Tests for the random graph generators defined in data.generators.
+"""
+
+import math
+import unittest
+
+from al60.data.graphs import Graph, Undirected
+from al60.data.generators import erdos_renyi, random_dag, grid,\
+    barabasi_albert, road_network
+from al60.algorithms import topological_sort
+
+
+class TestGenerators(unittest.TestCase):
+    """
+    Tests for the seeded random graph generators.
+    """
+
+    def test_erdos_renyi(self):
+        g = erdos_renyi(200, 0.05, seed=1)
+
+        self.assertIsInstance(g, Graph)
+        self.assertEqual(set(range(200)), g.nodes())
+        self.assertTrue(all(u != v for (u, v) in g.edges()))
+        # the expected number of edges is 200 * 199 * 0.05 = 1990
+        self.assertTrue(1800 < len(g.edges()) < 2200)
+        self.assertEqual(g, erdos_renyi(200, 0.05, seed=1))
+        self.assertNotEqual(g, erdos_renyi(200, 0.05, seed=2))
+
+    def test_erdos_renyi_extremes(self):
+        self.assertEqual(set(), erdos_renyi(10, 0, seed=1).edges())
+        self.assertEqual(90, len(erdos_renyi(10, 1, seed=1).edges()))
+        self.assertEqual(45, len(erdos_renyi(10, 1, directed=False).edges()))
+        self.assertRaises(ValueError, erdos_renyi, 10, 1.5)
+
+    def test_erdos_renyi_undirected(self):
+        g = erdos_renyi(100, 0.1, seed=3, directed=False, weights=(2, 5))
+
+        self.assertIsInstance(g, Undirected)
+        for (u, v) in g.edges():
+            self.assertIn(u, g.neighbors(v))
+            self.assertTrue(2 <= g.weight(v, u) <= 5)
+
+    def test_random_dag(self):
+        g = random_dag(100, 0.2, seed=4)
+
+        self.assertTrue(all(u < v for (u, v) in g.edges()))
+        self.assertEqual(len(g.nodes()), len(topological_sort(g)))
+
+    def test_grid(self):
+        g = grid(3, 4)
+
+        self.assertIsInstance(g, Undirected)
+        self.assertEqual(12, len(g.nodes()))
+        self.assertEqual(3 * 3 + 2 * 4, len(g.edges()))
+        self.assertEqual({(0, 1), (1, 0)}, g.neighbors((0, 0)))
+        self.assertEqual({(1, 0), (0, 1), (2, 1), (1, 2)},
+                         g.neighbors((1, 1)))
+
+        directed = grid(3, 4, directed=True)
+        self.assertEqual(2 * (3 * 3 + 2 * 4), len(directed.edges()))
+        self.assertIn((0, 0), directed.neighbors((1, 0)))
+
+    def test_barabasi_albert(self):
+        g = barabasi_albert(500, 3, seed=5)
+
+        self.assertEqual(3 * (500 - 3), len(g.edges()))
+        for u in range(3, 500):
+            # every new node was connected to 3 distinct earlier nodes
+            self.assertEqual(3, sum(1 for v in g.neighbors(u) if v < u))
+        self.assertEqual(g, barabasi_albert(500, 3, seed=5))
+        self.assertRaises(ValueError, barabasi_albert, 5, 5)
+
+    def test_road_network(self):
+        g = road_network(10, 10, seed=6)
+
+        self.assertEqual(100, len(g.nodes()))
+        for (u, v) in g.edges():
+            self.assertAlmostEqual(math.dist(u, v), g.weight(u, v))
+            self.assertTrue(abs(u[0] - v[0]) < 2 and abs(u[1] - v[1]) < 2)
+        self.assertEqual(g.edges(), road_network(10, 10, seed=6).edges())
+        self.assertEqual(9 * 10 * 2,
+                         len(road_network(10, 10, 1, 0, 0).edges()))
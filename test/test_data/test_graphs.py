@@ -2,9 +2,10 @@
 Tests for graph classes defined in data.graphs.
 """
 
+import pickle
 import unittest
 
-from al60.data.graphs import Graph, Undirected, Unweighted
+from al60.data.graphs import Graph, Undirected, Unweighted, FrozenGraph
 
 
 class TestGraph(unittest.TestCase):
@@ -92,6 +93,25 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(1, self.g2.weight('b', 'd'))
         self.assertEqual(1, self.g2.weight('c', 'd'))
 
+    def test_pickle(self):
+        key = str.upper
+        self.g1.sorted_neighbors('u', key)
+        copy = pickle.loads(pickle.dumps(self.g1))
+
+        self.assertEqual(self.g1, copy)
+        self.assertEqual(('a', 'c'), copy.sorted_neighbors('u', key))
+        self.assertEqual(10, copy.weight('a', 'u'))
+
+    def test_has_negative_weights(self):
+        self.assertFalse(self.g1.has_negative_weights())
+        self.assertTrue(self.g2.has_negative_weights())
+        self.assertTrue(self.g2.snapshot().has_negative_weights())
+
+        self.g2.remove_edge('a', 'd')
+        self.assertFalse(self.g2.has_negative_weights())
+        self.g1.add_edge('x', 'u', weight=-1)
+        self.assertTrue(self.g1.has_negative_weights())
+
     def test_parents_undefined_node(self):
         self.assertRaises(ValueError, self.g1.parents, 'z')
 
@@ -114,6 +134,56 @@ class TestGraph(unittest.TestCase):
         self.assertEqual({'y'}, self.g1.neighbors('x'))
         self.assertEqual(set(), self.g1.neighbors('y'))
 
+    def test_views(self):
+        self.assertEqual({'a', 'c'}, self.g1.neighbors_view('u'))
+        self.assertEqual({'a', 'b'}, self.g1.parents_view('u'))
+        self.assertEqual({'a', 'c'}, set(self.g1.iter_neighbors('u')))
+        self.assertEqual({'x'}, set(self.g1.iter_parents('y')))
+        self.assertEqual(2, len(self.g1.neighbors_view('c')))
+        self.assertTrue('b' in self.g1.neighbors_view('c'))
+        self.assertFalse('u' in self.g1.neighbors_view('c'))
+
+        self.assertRaises(ValueError, self.g1.neighbors_view, 'z')
+        self.assertRaises(ValueError, self.g1.parents_view, 'z')
+        self.assertRaises(ValueError, self.g1.iter_neighbors, 'z')
+        self.assertRaises(ValueError, self.g1.iter_parents, 'z')
+
+        # views are not copies, so they follow changes to the graph
+        view = self.g1.neighbors_view('y')
+        self.g1.add_edge('y', 'x')
+        self.assertEqual({'x'}, view)
+
+    def test_sorted_neighbors(self):
+        def reverse(x):
+            return -ord(x)
+
+        self.assertEqual(('a', 'c'), self.g1.sorted_neighbors('u'))
+        self.assertEqual(('c', 'a'), self.g1.sorted_neighbors('u', reverse))
+        self.assertTrue(self.g1.sorted_neighbors('u', reverse) is
+                        self.g1.sorted_neighbors('u', reverse))
+        self.assertEqual(('a', 'c'), self.g1.sorted_neighbors('u', str))
+        self.assertRaises(ValueError, self.g1.sorted_neighbors, 'z')
+
+        # mutations invalidate the cached order
+        self.g1.add_edge('u', 'b')
+        self.assertEqual(('a', 'b', 'c'), self.g1.sorted_neighbors('u'))
+        self.assertEqual(('c', 'b', 'a'),
+                         self.g1.sorted_neighbors('u', reverse))
+        self.g1.remove_edge('u', 'a')
+        self.assertEqual(('b', 'c'), self.g1.sorted_neighbors('u'))
+        self.g1.remove_node('x')
+        self.assertEqual(('b', 'c'), self.g1.sorted_neighbors('u'))
+
+    def test_has_node(self):
+        self.assertTrue(self.g1.has_node('u'))
+        self.assertFalse(self.g1.has_node('z'))
+
+        # unhashable nodes are never defined, as in a FrozenGraph
+        for g in (self.g1, FrozenGraph(self.g1)):
+            self.assertFalse(g.has_node(['u']))
+            self.assertFalse(['a'] in g.neighbors_view('u'))
+            self.assertRaises(ValueError, g.neighbors, ['u'])
+
     def tst_add_node_defined_node(self):
         self.assertRaises(ValueError, self.g1.add_node, 'u')
         self.assertRaises(ValueError, self.g1.add_node, 'x')
@@ -155,8 +225,9 @@ class TestGraph(unittest.TestCase):
         self.g_empty.add_node(2)
         self.g_empty.add_edge(1, 2)
 
-        self.assertEqual(self.g_empty._a_in, {1: set(), 2: {1}})
-        self.assertEqual(self.g_empty._a_out, {1: {2}, 2: set()})
+        # nodes 1 and 2 are interned as ids 0 and 1
+        self.assertEqual(self.g_empty._a_in, [set(), {0}])
+        self.assertEqual(self.g_empty._a_out, [{1: 1}, dict()])
 
         self.assertRaises(ValueError, self.g_empty.add_edge, 1, 2)
 
@@ -169,6 +240,56 @@ class TestGraph(unittest.TestCase):
         self.assertEqual({'u', 'a', 'b', 'c', 'y'}, self.g1.nodes())
         self.assertRaises(ValueError, self.g1.remove_node, 'z')
 
+    def test_snapshot(self):
+        snap = self.g1.snapshot()
+        self.assertEqual(self.g1, snap)
+        self.assertIs(self.g1._a_out, snap._a_out)
+
+        self.g1.add_edge('y', 'x', weight=2)
+        # rows no mutation touched are still shared
+        c = self.g1._index.id('c')
+        self.assertIs(self.g1._a_out[c], snap._a_out[c])
+        self.assertIsNot(self.g1._a_out[self.g1._index.id('y')],
+                         snap._a_out[snap._index.id('y')])
+
+        self.g1.remove_node('b')
+        snap.remove_edge('u', 'a')
+
+        self.assertEqual({'y'}, self.g1.neighbors('x'))
+        self.assertEqual({'a', 'c'}, self.g1.neighbors('u'))
+        self.assertEqual(2, self.g1.weight('y', 'x'))
+        self.assertEqual({'u', 'a', 'b', 'c', 'x', 'y'}, snap.nodes())
+        self.assertEqual({'c'}, snap.neighbors('u'))
+        self.assertEqual({'u'}, snap.neighbors('b'))
+        self.assertRaises(ValueError, snap.weight, 'y', 'x')
+
+    def test_snapshot_of_snapshot(self):
+        snap = self.g1.snapshot()
+        snap2 = snap.snapshot()
+        snap.add_node('z')
+        snap2.add_node('w')
+        snap2.add_edge('w', 'u')
+
+        self.assertNotIn('z', snap2.nodes())
+        self.assertNotIn('w', snap.nodes())
+        self.assertEqual({'a', 'b', 'w'}, snap2.parents('u'))
+        self.assertEqual({'a', 'b'}, self.g1.parents('u'))
+
+    def test_remove_node_edges(self):
+        self.g1.remove_node('a')
+
+        self.assertEqual({'c'}, self.g1.neighbors('u'))
+        self.assertEqual({'b'}, self.g1.neighbors('c'))
+        self.assertNotIn(('u', 'a'), self.g1.edges())
+
+        # the new node takes the id of 'a', but none of its edges
+        self.g1.add_node('z')
+        self.assertEqual(set(), self.g1.parents('z'))
+        self.assertEqual({'c'}, self.g1.neighbors('u'))
+        self.g1.add_edge('z', 'u', weight=3)
+        self.assertEqual(3, self.g1.weight('z', 'u'))
+        self.assertEqual({'b', 'z'}, self.g1.parents('u'))
+
     def test_remove_edge(self):
         before = self.g1.edges()
         self.g1.remove_edge('a', 'u')
@@ -223,6 +344,29 @@ class TestUndirectedGraph(unittest.TestCase):
 
         self.assertRaises(ValueError, Undirected, self.g_directed)
 
+    def test_snapshot(self):
+        snap = self.g1.snapshot()
+        self.g1.add_node('d')
+        self.g1.add_edges_from([('a', 'c', 2), ('d', 'b')])
+        snap.remove_edge('b', 'c')
+
+        self.assertIsInstance(snap, Undirected)
+        self.assertEqual({'a', 'c', 'd'}, self.g1.neighbors('b'))
+        self.assertEqual(2, self.g1.weight('c', 'a'))
+        self.assertEqual({'a'}, snap.neighbors('b'))
+        self.assertEqual(set(), snap.neighbors('c'))
+        self.assertNotIn('d', snap.nodes())
+
+    def test_from_directed_rows(self):
+        g3 = Undirected(self.g_directed)
+
+        for u in self.g_directed.nodes():
+            self.assertEqual(self.g_directed.neighbors(u).union(
+                self.g_directed.parents(u)), g3.neighbors(u))
+        self.assertEqual({frozenset((1, 2)), frozenset((1, 3)),
+                          frozenset((2, 3)), frozenset((3, 4))},
+                         set(map(frozenset, g3.edges())))
+
     def test_parents(self):
         self.assertEqual({'b'}, self.g1.parents('a'))
         self.assertEqual({'a', 'c'}, self.g1.parents('b'))
@@ -233,6 +377,26 @@ class TestUndirectedGraph(unittest.TestCase):
         self.assertEqual({'a', 'c'}, self.g1.neighbors('b'))
         self.assertEqual({'b'}, self.g1.neighbors('c'))
 
+    def test_views(self):
+        self.assertEqual({'b'}, self.g1.neighbors_view('a'))
+        self.assertEqual({'a', 'c'}, self.g1.neighbors_view('b'))
+        self.assertEqual({'a', 'c'}, self.g1.parents_view('b'))
+        self.assertEqual(2, len(self.g1.neighbors_view('b')))
+        self.assertEqual(['a', 'c'], sorted(self.g1.iter_neighbors('b')))
+        self.assertEqual(['b'], list(self.g1.iter_parents('c')))
+
+        # nodes connected in both directions are only seen once
+        self.assertEqual([1, 2, 4], sorted(self.g2.iter_neighbors(3)))
+        self.assertEqual(3, len(self.g2.neighbors_view(3)))
+
+    def test_sorted_neighbors(self):
+        self.assertEqual(('a', 'c'), self.g1.sorted_neighbors('b'))
+        self.g1.add_node('d')
+        self.g1.add_edge('d', 'b')
+        self.assertEqual(('a', 'c', 'd'), self.g1.sorted_neighbors('b'))
+        self.g1.remove_edge('c', 'b')
+        self.assertEqual(('a', 'd'), self.g1.sorted_neighbors('b'))
+
     def test_add_edge_defined_edge(self):
         self.assertRaises(ValueError, self.g1.add_edge, 'b', 'a')
 
@@ -245,6 +409,28 @@ class TestUndirectedGraph(unittest.TestCase):
         self.assertEqual(after, before.difference({(2, 3), (3, 2)}))
         self.assertRaises(ValueError, self.g2.remove_edge, 1, 5)
 
+    def test_remove_edge_one_direction(self):
+        self.g1.remove_edge('b', 'a')
+
+        self.assertEqual(set(), self.g1.neighbors('a'))
+        self.assertEqual({'c'}, self.g1.neighbors('b'))
+        self.assertRaises(ValueError, self.g1.remove_edge, 'a', 'b')
+        self.assertRaises(ValueError, self.g1.weight, 'a', 'b')
+
+    def test_symmetric(self):
+        self.g1.add_node('d')
+        self.g1.add_edge('d', 'c', weight=4)
+
+        self.assertEqual(4, self.g1.weight('c', 'd'))
+        self.assertEqual(4, self.g1.weight('d', 'c'))
+        self.assertEqual(3, len(self.g1.edges()))
+        self.assertTrue(all((v, u) not in self.g1.edges()
+                            for (u, v) in self.g1.edges()))
+
+        self.g1.remove_node('c')
+        self.assertEqual({'a'}, self.g1.neighbors('b'))
+        self.assertEqual(set(), self.g1.parents('d'))
+
     def test_eq_directed_edges(self):
         # it is implied that these directed edges exists already in self.g2
         self.g_directed.add_edge(2, 1)
@@ -305,5 +491,130 @@ class TestUnweightedGraph(unittest.TestCase):
         self.assertEqual(g2, g3)
 
 
+class TestFrozenGraph(unittest.TestCase):
+    """
+    Tests for FrozenGraph.
+    """
+
+    def setUp(self):
+        self.g1 = Graph()
+        self.g1.add_nodes('u', 'a', 'b', 'c', 'x', 'y')
+        self.g1.add_edge('u', 'a')
+        self.g1.add_edge('a', 'u', weight=10)
+        self.g1.add_edge('u', 'c')
+        self.g1.add_edge('c', 'a')
+        self.g1.add_edge('c', 'b', weight=2.5)
+        self.g1.add_edge('b', 'u')
+        self.g1.add_edge('x', 'y')
+
+        self.g2 = Undirected()
+        self.g2.add_nodes('a', 'b', 'c')
+        self.g2.add_edge('a', 'b', weight=3)
+        self.g2.add_edge('b', 'c')
+
+        self.f1 = FrozenGraph(self.g1)
+        self.f2 = FrozenGraph(self.g2)
+
+    def test_snapshot(self):
+        self.assertIs(self.f1, self.f1.snapshot())
+
+    def test_thaw(self):
+        # a FrozenGraph cannot be copied into a mutable graph
+        for cls in (Graph, Undirected, Unweighted):
+            self.assertRaises(TypeError, cls, self.f1)
+            self.assertRaises(TypeError, cls, self.f2)
+
+    def test_nodes_edges(self):
+        self.assertEqual(self.g1.nodes(), self.f1.nodes())
+        self.assertEqual(self.g1.edges(), self.f1.edges())
+        self.assertEqual({('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'b')},
+                         self.f2.edges())
+
+    def test_neighbors_parents(self):
+        for u in self.g1.nodes():
+            self.assertEqual(self.g1.neighbors(u), self.f1.neighbors(u))
+            self.assertEqual(self.g1.parents(u), self.f1.parents(u))
+        for u in self.g2.nodes():
+            self.assertEqual(self.g2.neighbors(u), self.f2.neighbors(u))
+            self.assertEqual(self.g2.parents(u), self.f2.parents(u))
+
+        self.assertRaises(ValueError, self.f1.neighbors, 'z')
+        self.assertRaises(ValueError, self.f1.parents, 'z')
+
+    def test_views(self):
+        for u in self.g1.nodes():
+            self.assertEqual(self.g1.neighbors(u), self.f1.neighbors_view(u))
+            self.assertEqual(self.g1.parents(u), self.f1.parents_view(u))
+            self.assertEqual(self.g1.neighbors(u),
+                             set(self.f1.iter_neighbors(u)))
+            self.assertEqual(self.g1.parents(u), set(self.f1.iter_parents(u)))
+
+        self.assertTrue('b' in self.f1.neighbors_view('c'))
+        self.assertFalse('u' in self.f1.neighbors_view('c'))
+        self.assertFalse('z' in self.f1.neighbors_view('c'))
+        self.assertEqual(2, len(self.f2.neighbors_view('b')))
+        self.assertTrue(self.f1.has_node('u'))
+        self.assertFalse(self.f1.has_node('z'))
+        self.assertRaises(ValueError, self.f1.neighbors_view, 'z')
+
+    def test_sorted_neighbors(self):
+        self.assertEqual(('a', 'c'), self.f1.sorted_neighbors('u'))
+        self.assertEqual(('a', 'c'), self.f2.sorted_neighbors('b'))
+        self.assertEqual(('c', 'a'),
+                         self.f2.sorted_neighbors('b', lambda x: -ord(x)))
+
+        # rows are already in sorted order, so nothing is sorted or cached
+        for u in self.g1.nodes():
+            self.assertEqual(tuple(sorted(self.g1.neighbors(u))),
+                             self.f1.sorted_neighbors(u))
+        self.assertEqual({}, self.f1._sorted._natural)
+        self.assertRaises(ValueError, self.f1.sorted_neighbors, 'z')
+
+        # nodes of different types cannot be indexed in sorted order
+        g = Graph()
+        g.add_nodes(0, 2, 1, 'x')
+        g.add_edge(0, 2)
+        g.add_edge(0, 1)
+        g.add_edge('x', 0)
+        frozen = FrozenGraph(g)
+        self.assertEqual((1, 2), frozen.sorted_neighbors(0))
+        self.assertEqual({}, frozen._sorted._natural)
+
+    def test_weight(self):
+        self.assertEqual(1, self.f1.weight('u', 'a'))
+        self.assertEqual(10, self.f1.weight('a', 'u'))
+        self.assertEqual(2.5, self.f1.weight('c', 'b'))
+        self.assertEqual(3, self.f2.weight('a', 'b'))
+        self.assertEqual(3, self.f2.weight('b', 'a'))
+
+        self.assertRaises(ValueError, self.f1.weight, 'b', 'c')
+        self.assertRaises(ValueError, self.f1.weight, 'x', 'z')
+
+    def test_has_negative_weights(self):
+        self.assertFalse(self.f1.has_negative_weights())
+        self.g2.add_edge('a', 'c', weight=-3)
+        f2 = FrozenGraph(self.g2)
+        self.assertTrue(f2.has_negative_weights())
+        # the answer is kept, so the weights are not scanned again
+        f2._out_weights = None
+        self.assertTrue(f2.has_negative_weights())
+
+    def test_immutable(self):
+        self.assertFalse(hasattr(self.f1, 'add_node'))
+        self.assertFalse(hasattr(self.f1, 'add_edge'))
+        self.assertFalse(hasattr(self.f1, 'remove_edge'))
+
+        # the frozen graph does not follow changes made to its source
+        self.g1.add_node('new')
+        self.g1.add_edge('y', 'new')
+        self.assertTrue('new' not in self.f1.nodes())
+        self.assertEqual(set(), self.f1.neighbors('y'))
+
+    def test_eq(self):
+        self.assertEqual(self.f1, FrozenGraph(Graph(self.g1)))
+        self.assertNotEqual(self.f1, self.f2)
+        self.assertNotEqual(self.f1, self.g1)
+
+
 if __name__ == '__main__':
     unittest.main()
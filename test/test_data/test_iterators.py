@@ -2,10 +2,21 @@
 Tests for iterators defined in data.iterators.
 """
 
+import asyncio
+import copy
+import math
+import multiprocessing
+import pickle
+import threading
+import time
 import unittest
 
-from al60.data.graphs import Graph, Undirected
-from al60.data.iterators import DepthFirstIterator, BreadthFirstIterator, DijkstraIterator
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from unittest import mock
+
+from al60.data.graphs import Graph, Undirected, FrozenGraph
+from al60.data.iterators import DepthFirstIterator, BreadthFirstIterator, DijkstraIterator,\
+    AStarIterator, AsyncGraphIterator
 
 
 class TestDepthFirstIterator(unittest.TestCase):
@@ -49,6 +60,13 @@ class TestDepthFirstIterator(unittest.TestCase):
 
         self.assertEqual(['a', 'b', 's', 'c', 'd', 'e', 'h', 'g', 'f'], g2_a)
 
+    def test_frozen(self):
+        f1_u = list(DepthFirstIterator(FrozenGraph(self.g1), 'u'))
+        f2_a = list(DepthFirstIterator(FrozenGraph(self.g2), 'a'))
+
+        self.assertEqual(['u', 'a', 'c', 'b'], f1_u)
+        self.assertEqual(['a', 'b', 's', 'c', 'd', 'e', 'h', 'g', 'f'], f2_a)
+
     def test_key(self):
         # reverse alphabetical order
         g1_u = list(DepthFirstIterator(self.g1, 'u', key=lambda x: -1 * ord(x)))
@@ -99,6 +117,13 @@ class TestBreadthFirstIterator(unittest.TestCase):
 
         self.assertEqual(['a', 'b', 's', 'c', 'g', 'd', 'e', 'f', 'h'], g2_a)
 
+    def test_frozen(self):
+        f1_u = list(BreadthFirstIterator(FrozenGraph(self.g1), 'u'))
+        f2_a = list(BreadthFirstIterator(FrozenGraph(self.g2), 'a'))
+
+        self.assertEqual(['u', 'a', 'c', 'b'], f1_u)
+        self.assertEqual(['a', 'b', 's', 'c', 'g', 'd', 'e', 'f', 'h'], f2_a)
+
     def test_key(self):
         # reverse alphabetical order
         g1_u = list(BreadthFirstIterator(self.g1, 'u',
@@ -109,6 +134,22 @@ class TestBreadthFirstIterator(unittest.TestCase):
         self.assertEqual(['u', 'c', 'a', 'b'], g1_u)
         self.assertEqual(['a', 's', 'b', 'g', 'c', 'h', 'f', 'e', 'd'], g2_a)
 
+    def test_stats(self):
+        bfs = BreadthFirstIterator(self.g1, 'u', instrument=True)
+
+        self.assertEqual(['u', 'a', 'c', 'b'], list(bfs))
+        stats = bfs.stats()
+        self.assertEqual((4, 0, 4, 0, 6, 0), stats[:6])
+        self.assertTrue(stats.neighbor_time >= 0)
+
+        self.assertRaises(ValueError, BreadthFirstIterator(self.g1, 'u').stats)
+
+    def test_copy(self):
+        bfs = BreadthFirstIterator(self.g1, 'u', instrument=True)
+        for copied in (copy.deepcopy(bfs), pickle.loads(pickle.dumps(bfs))):
+            self.assertEqual(['u', 'a', 'c', 'b'], list(copied))
+            self.assertEqual(4, copied.stats().popped)
+
 
 class TestDijkstraIterator(unittest.TestCase):
 
@@ -131,3 +172,292 @@ class TestDijkstraIterator(unittest.TestCase):
         self.assertEqual([('a', 0), ('c', 3), ('e', 5), ('b', 7), ('d', 9)],
                          g1_a)
 
+    def test_frozen(self):
+        f1_a = list(DijkstraIterator(FrozenGraph(self.g1), 'a'))
+
+        self.assertEqual([('a', 0), ('c', 3), ('e', 5), ('b', 7), ('d', 9)],
+                         f1_a)
+
+    def test_parent(self):
+        dijkstra = DijkstraIterator(self.g1, 'a')
+        self.assertRaises(ValueError, dijkstra.parent, 'b')
+
+        list(dijkstra)
+        self.assertEqual(None, dijkstra.parent('a'))
+        self.assertEqual('c', dijkstra.parent('b'))
+        self.assertEqual('b', dijkstra.parent('d'))
+
+    def test_decrease_key(self):
+        # 'c' is first discovered at distance 10, then improved through 'b'
+        g = Graph()
+        g.add_nodes(0, 'b', 'c', 'd')
+        g.add_edge(0, 'c', weight=10)
+        g.add_edge(0, 'b', weight=1)
+        g.add_edge('b', 'c', weight=2)
+        g.add_edge('c', 'd', weight=1)
+
+        self.assertEqual([(0, 0), ('b', 1), ('c', 3), ('d', 4)],
+                         list(DijkstraIterator(g, 0, key=str)))
+
+    def test_unreachable(self):
+        self.g1.add_nodes('y', 'z')
+        dijkstra = DijkstraIterator(self.g1, 'a', instrument=True)
+        g1_a = list(dijkstra)
+
+        # unreachable nodes come last, with a distance of math.inf
+        self.assertEqual([('a', 0), ('c', 3), ('e', 5), ('b', 7), ('d', 9)],
+                         g1_a[:5])
+        self.assertEqual({('y', math.inf), ('z', math.inf)}, set(g1_a[5:]))
+        # and are not counted as popped or stale, see test_stats
+        self.assertEqual((7, 2), dijkstra.stats()[:2])
+        self.assertRaises(ValueError, dijkstra.parent, 'z')
+        self.assertEqual([('z', 0)], list(DijkstraIterator(self.g1, 'z'))[:1])
+        self.assertRaises(ValueError, DijkstraIterator, self.g1, 'fake')
+
+    def test_stats(self):
+        dijkstra = DijkstraIterator(self.g1, 'a', instrument=True)
+        list(dijkstra)
+        stats = dijkstra.stats()
+
+        # 'b' and 'd' are each pushed again with a smaller distance, leaving
+        # two stale entries
+        self.assertEqual(7, stats.pushes)
+        self.assertEqual(7, stats.popped)
+        self.assertEqual(2, stats.stale)
+        self.assertEqual(2, stats.decrease_keys)
+        self.assertEqual(9, stats.edges_scanned)
+        self.assertEqual(7, stats.relaxations)
+
+    def test_stats_repeated(self):
+        dijkstra = DijkstraIterator(self.g1, 'a', instrument=True)
+        next(dijkstra)
+        self.assertEqual(dijkstra.stats(), dijkstra.stats())
+        list(dijkstra)
+        self.assertEqual(dijkstra.stats(), dijkstra.stats())
+        self.assertEqual(7, dijkstra.stats().pushes)
+
+
+class TestAStarIterator(unittest.TestCase):
+    """
+    Tests for AStarIterator.
+    """
+
+    def setUp(self):
+        # a 10x10 grid with nodes named by their coordinates
+        self.grid = Undirected()
+        self.grid.add_nodes(*[(x, y) for x in range(10) for y in range(10)])
+        for x in range(10):
+            for y in range(10):
+                if x < 9:
+                    self.grid.add_edge((x, y), (x + 1, y))
+                if y < 9:
+                    self.grid.add_edge((x, y), (x, y + 1))
+
+    def test_zero_heuristic(self):
+        a_star = list(AStarIterator(self.grid, (0, 0), lambda v: 0))
+        dijkstra = list(DijkstraIterator(self.grid, (0, 0)))
+
+        self.assertEqual(dijkstra, a_star)
+
+    def test_goal_directed(self):
+        target = (5, 0)
+
+        def manhattan(v):
+            return abs(v[0] - target[0]) + abs(v[1] - target[1])
+
+        a_star = []
+        for (u, d_u) in AStarIterator(self.grid, (0, 0), manhattan):
+            a_star.append(u)
+            if u == target:
+                self.assertEqual(5, d_u)
+                break
+
+        dijkstra = []
+        for (u, d_u) in DijkstraIterator(self.grid, (0, 0)):
+            dijkstra.append(u)
+            if u == target:
+                break
+
+        self.assertEqual(target, a_star[-1])
+        self.assertTrue(len(a_star) < len(dijkstra))
+
+    def test_distances(self):
+        def heuristic(v):
+            return abs(v[0] - 9) + abs(v[1] - 9)
+
+        for (u, d_u) in AStarIterator(self.grid, (0, 0), heuristic):
+            self.assertEqual(u[0] + u[1], d_u)
+
+
+class TestAsyncGraphIterator(unittest.TestCase):
+    """
+    Tests for AsyncGraphIterator.
+    """
+
+    def setUp(self):
+        self.g1 = Graph()
+        self.g1.add_nodes(*range(50))
+        for u in range(49):
+            self.g1.add_edge(u, u + 1, weight=2)
+            self.g1.add_edge(u, (u * 7) % 50, weight=5)
+
+        self.expected = list(DijkstraIterator(self.g1, 0))
+
+    @staticmethod
+    async def collect_async(iterator):
+        return [item async for item in iterator]
+
+    @classmethod
+    def collect(cls, iterator):
+        return asyncio.run(cls.collect_async(iterator))
+
+    def test_iterator(self):
+        self.assertEqual(
+            self.expected,
+            self.collect(AsyncGraphIterator(DijkstraIterator(self.g1, 0))))
+        self.assertEqual(
+            list(DepthFirstIterator(self.g1, 3)),
+            self.collect(AsyncGraphIterator(DepthFirstIterator(self.g1, 3),
+                                            every=1)))
+
+    def test_yields_control(self):
+        async def run():
+            order = []
+
+            async def other():
+                order.append('other')
+
+            task = asyncio.create_task(other())
+            async for (u, _) in AsyncGraphIterator(
+                    DijkstraIterator(self.g1, 0), every=10):
+                order.append(u)
+            await task
+            return order
+
+        order = asyncio.run(run())
+        # the other task ran after the first 9 items, not after all of them
+        self.assertEqual(9, order.index('other'))
+
+    def test_thread(self):
+        with ThreadPoolExecutor(1) as executor:
+            self.assertEqual(self.expected, self.collect(AsyncGraphIterator(
+                DijkstraIterator(self.g1, 0), every=7, offload=executor)))
+
+    def test_process(self):
+        with ProcessPoolExecutor(1) as executor:
+            self.assertEqual(self.expected, self.collect(AsyncGraphIterator(
+                DijkstraIterator(self.g1, 0), every=7, offload=executor)))
+
+    def test_process_off_loop(self):
+        # the threads starting and shutting down the manager process
+        threads = []
+        start_manager = multiprocessing.Manager
+
+        def manager():
+            threads.append(threading.current_thread())
+            started = start_manager()
+            shut_down = started.shutdown
+
+            def shutdown():
+                threads.append(threading.current_thread())
+                shut_down()
+
+            started.shutdown = shutdown
+            return started
+
+        with ProcessPoolExecutor(1) as executor,\
+                mock.patch('multiprocessing.Manager', manager):
+            self.assertEqual(self.expected, self.collect(AsyncGraphIterator(
+                DijkstraIterator(self.g1, 0), every=7, offload=executor)))
+
+        # the manager is shut down by a thread of its own, which may still be
+        # starting
+        deadline = time.monotonic() + 10
+        while len(threads) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # the loop of asyncio.run runs in the main thread
+        self.assertEqual(2, len(threads))
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_process_instrumented(self):
+        with ProcessPoolExecutor(1) as executor:
+            self.assertEqual(self.expected, self.collect(AsyncGraphIterator(
+                DijkstraIterator(self.g1, 0, instrument=True), every=7,
+                offload=executor)))
+            # the worker survived the traversal
+            self.assertEqual(1, executor.submit(int, 1).result(10))
+
+    def test_error(self):
+        def key(v):
+            raise KeyError(v)
+
+        with ThreadPoolExecutor(1) as executor:
+            iterator = AsyncGraphIterator(
+                BreadthFirstIterator(self.g1, 0, key=key), offload=executor)
+            self.assertRaises(KeyError, self.collect, iterator)
+
+        self.assertRaises(ValueError, AsyncGraphIterator,
+                          DijkstraIterator(self.g1, 0), every=0)
+
+    def test_aclose(self):
+        async def run(iterator):
+            first = [await iterator.__anext__() for _ in range(3)]
+            await iterator.aclose()
+            return first + [item async for item in iterator]
+
+        with ThreadPoolExecutor(1) as executor:
+            iterator = AsyncGraphIterator(DijkstraIterator(self.g1, 0),
+                                          every=1, offload=executor, buffer=1)
+            self.assertEqual(self.expected[:3], asyncio.run(run(iterator)))
+        # the traversal stopped, so the executor shut down
+        self.assertTrue(iterator._future.done())
+
+    def test_concurrent(self):
+        async def run():
+            # a single thread for the loop, which a blocking get would hold
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(1))
+            streams = [
+                AsyncGraphIterator(DijkstraIterator(self.g1, 0), every=1,
+                                   offload=executor, buffer=1)
+                for _ in range(2)]
+
+            return await asyncio.wait_for(
+                asyncio.gather(*map(self.collect_async, streams)), 10)
+
+        with ThreadPoolExecutor(1) as executor:
+            self.assertEqual([self.expected] * 2, asyncio.run(run()))
+
+    def test_break(self):
+        async def run(offload):
+            async for _ in AsyncGraphIterator(DijkstraIterator(self.g1, 0),
+                                              every=1, offload=offload,
+                                              buffer=1):
+                break
+
+        for executor in (ThreadPoolExecutor(1), ProcessPoolExecutor(1)):
+            with executor:
+                asyncio.run(run(executor))
+                # the traversal stopped, so the worker is free again
+                self.assertEqual(1, executor.submit(int, 1).result(10))
+
+    def test_cancel(self):
+        def key(v):
+            time.sleep(0.01)
+            return v
+
+        async def run(iterator):
+            task = asyncio.create_task(
+                asyncio.wait_for(self.collect_async(iterator), 10))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with ThreadPoolExecutor(1) as executor:
+            iterator = AsyncGraphIterator(
+                BreadthFirstIterator(self.g1, 0, key=key), every=1,
+                offload=executor, buffer=1)
+            asyncio.run(run(iterator))
+            self.assertEqual(1, executor.submit(int, 1).result(10))
+        self.assertTrue(iterator._future.done())
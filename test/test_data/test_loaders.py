@@ -0,0 +1,148 @@
+"""
+Tests for edge list readers defined in data.loaders.
+"""
+
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from al60.data.graphs import Graph, Undirected, Unweighted
+from al60.data.loaders import iter_edge_list, read_edge_list
+
+
+class TestAddEdgesFrom(unittest.TestCase):
+    """
+    Tests for the bulk Graph.add_edges_from path used by the loaders.
+    """
+
+    def setUp(self):
+        self.g1 = Graph()
+        self.g1.add_nodes('a', 'b', 'c')
+        self.g1.add_edge('a', 'b')
+
+    def test_add_edges_from(self):
+        self.g1.add_edges_from([('b', 'c'), ('c', 'a', 4), ('b', 'a', 2.5)])
+
+        self.assertEqual({('a', 'b'), ('b', 'c'), ('c', 'a'), ('b', 'a')},
+                         self.g1.edges())
+        self.assertEqual(1, self.g1.weight('b', 'c'))
+        self.assertEqual(4, self.g1.weight('c', 'a'))
+        self.assertEqual({'c', 'a'}, self.g1.neighbors('b'))
+        self.assertEqual({'b'}, self.g1.parents('c'))
+
+    def test_add_edges_from_invalid(self):
+        before = self.g1.edges()
+
+        self.assertRaises(ValueError, self.g1.add_edges_from,
+                          [('b', 'c'), ('c', 'fake')])
+        self.assertRaises(ValueError, self.g1.add_edges_from,
+                          [('b', 'c'), ('a', 'b')])
+        self.assertRaises(ValueError, self.g1.add_edges_from,
+                          [('b', 'c'), ('b', 'c', 3)])
+
+        # no edges should be added if add_edges_from raises an exception
+        self.assertEqual(before, self.g1.edges())
+
+    def test_undirected(self):
+        g2 = Undirected()
+        g2.add_nodes('a', 'b', 'c')
+        g2.add_edges_from([('a', 'b', 3), ('c', 'b')])
+
+        self.assertEqual({'a', 'c'}, g2.neighbors('b'))
+        self.assertEqual(3, g2.weight('b', 'a'))
+        self.assertRaises(ValueError, g2.add_edges_from, [('b', 'a')])
+        self.assertRaises(ValueError, g2.add_edges_from,
+                          [('a', 'c'), ('c', 'a')])
+
+    def test_unweighted(self):
+        g3 = Unweighted()
+        g3.add_nodes('a', 'b')
+        g3.add_edges_from([('a', 'b', 7)])
+
+        self.assertEqual(1, g3.weight('a', 'b'))
+
+
+class TestEdgeListLoaders(unittest.TestCase):
+    """
+    Tests for iter_edge_list and read_edge_list.
+    """
+
+    def setUp(self):
+        self.text = ('# a comment\n'
+                     'a b\n'
+                     'b c 2.5\n'
+                     '\n'
+                     'c a 4\n'
+                     'c d\n')
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _expected(self):
+        g = Graph()
+        g.add_nodes('a', 'b', 'c', 'd')
+        g.add_edge('a', 'b')
+        g.add_edge('b', 'c', weight=2.5)
+        g.add_edge('c', 'a', weight=4)
+        g.add_edge('c', 'd')
+        return g
+
+    def test_iter_edge_list(self):
+        chunks = list(iter_edge_list(io.StringIO(self.text), chunk_size=3))
+
+        # chunks are made of up to 3 lines, including skipped ones
+        self.assertEqual([[('a', 'b'), ('b', 'c', 2.5)],
+                          [('c', 'a', 4.0), ('c', 'd')]], chunks)
+
+    def test_node_type(self):
+        chunks = list(iter_edge_list(io.StringIO('1 2\n2 3 0.5\n'),
+                                     node_type=int))
+
+        self.assertEqual([[(1, 2), (2, 3, 0.5)]], chunks)
+
+    def test_malformed(self):
+        self.assertRaises(ValueError, list,
+                          iter_edge_list(io.StringIO('a b\na b c d\n')))
+        self.assertRaises(ValueError, list,
+                          iter_edge_list(io.StringIO('a b 1\nc d x\n')))
+
+    def test_read_edge_list(self):
+        g = read_edge_list(io.StringIO(self.text), chunk_size=2)
+        expected = self._expected()
+
+        self.assertEqual(expected, g)
+        self.assertEqual(2.5, g.weight('b', 'c'))
+        self.assertEqual(4, g.weight('c', 'a'))
+
+    def test_read_csv(self):
+        path = os.path.join(self.dir.name, 'edges.csv')
+        with open(path, 'w') as file:
+            file.write(self.text.replace(' ', ', '))
+
+        g = read_edge_list(path, delimiter=',')
+        self.assertEqual(self._expected(), g)
+
+    def test_read_gzip(self):
+        path = os.path.join(self.dir.name, 'edges.txt.gz')
+        with gzip.open(path, 'wt') as file:
+            file.write(self.text)
+
+        g = read_edge_list(path)
+        self.assertEqual(self._expected(), g)
+        self.assertEqual(2.5, g.weight('b', 'c'))
+
+    def test_read_into_graph(self):
+        g = Undirected()
+        g.add_node('a')
+        read_edge_list(io.StringIO('a b\nc b\n'), graph=g)
+
+        self.assertEqual({'a', 'c'}, g.neighbors('b'))
+        self.assertRaises(ValueError, read_edge_list,
+                          io.StringIO('b a\n'), graph=g)
+
+
+if __name__ == '__main__':
+    unittest.main()
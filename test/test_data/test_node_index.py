@@ -0,0 +1,56 @@
+"""
+Tests for the node interning defined in data.node_index.
+"""
+
+import unittest
+
+from al60.data.node_index import NodeIndex
+
+
+class TestNodeIndex(unittest.TestCase):
+    """
+    Tests for NodeIndex.
+    """
+
+    def setUp(self):
+        self.index = NodeIndex()
+        for u in ('a', 'b', 'c'):
+            self.index.add(u)
+
+    def test_add(self):
+        self.assertEqual([0, 1, 2], [self.index.id(u) for u in 'abc'])
+        self.assertEqual('b', self.index.node(1))
+        self.assertEqual(3, len(self.index))
+        self.assertEqual(3, self.index.capacity())
+        self.assertEqual({'a', 'b', 'c'}, set(self.index))
+
+    def test_lookup(self):
+        self.assertIn('a', self.index)
+        self.assertNotIn('z', self.index)
+        self.assertEqual(None, self.index.get('z'))
+        self.assertRaises(KeyError, self.index.id, 'z')
+
+    def test_translate(self):
+        self.assertEqual([2, 0], list(self.index.ids(['c', 'a'])))
+        self.assertEqual(['c', 'a'], list(self.index.nodes([2, 0])))
+        self.assertEqual({'a'}, self.index.defined(['a', 'z']))
+        self.assertEqual({'z'}, self.index.undefined(['a', 'z']))
+
+    def test_remove(self):
+        self.assertEqual(1, self.index.remove('b'))
+        self.assertNotIn('b', self.index)
+        self.assertRaises(KeyError, self.index.remove, 'b')
+
+        # the freed id is reused before the index grows
+        self.assertEqual(1, self.index.add('d'))
+        self.assertEqual(3, self.index.capacity())
+        self.assertEqual(3, self.index.add('e'))
+
+    def test_copy(self):
+        self.index.remove('a')
+        copy = NodeIndex(self.index)
+        copy.add('z')
+
+        self.assertEqual(0, copy.id('z'))
+        self.assertNotIn('z', self.index)
+        self.assertEqual(self.index.id('c'), copy.id('c'))
@@ -0,0 +1,79 @@
+"""
+Tests for shortest path representations defined in data.paths.
+"""
+
+import unittest
+
+from al60.data.graphs import Graph
+from al60.data.paths import ShortestPathTree
+
+
+class TestShortestPathTree(unittest.TestCase):
+    """
+    Tests for ShortestPathTree.
+    """
+
+    def setUp(self):
+        self.g1 = Graph()
+        self.g1.add_nodes('a', 'b', 'c', 'd', 'e', 'z')
+        self.g1.add_edge('a', 'b', weight=10)
+        self.g1.add_edge('a', 'c', weight=3)
+        self.g1.add_edge('b', 'c', weight=1)
+        self.g1.add_edge('b', 'd', weight=2)
+        self.g1.add_edge('c', 'b', weight=4)
+        self.g1.add_edge('c', 'd', weight=8)
+        self.g1.add_edge('c', 'e', weight=2)
+        self.g1.add_edge('d', 'e', weight=7)
+        self.g1.add_edge('e', 'd', weight=9)
+
+    def test_undefined_source(self):
+        self.assertRaises(ValueError, ShortestPathTree, self.g1, 'fake')
+
+    def test_paths(self):
+        tree = ShortestPathTree(self.g1, 'a')
+
+        self.assertEqual('a', tree.source)
+        self.assertEqual(['a'], tree.path_to('a'))
+        self.assertEqual(['a', 'c'], tree.path_to('c'))
+        self.assertEqual(['a', 'c', 'b'], tree.path_to('b'))
+        self.assertEqual(['a', 'c', 'b', 'd'], tree.path_to('d'))
+        self.assertEqual(['a', 'c', 'e'], tree.path_to('e'))
+
+    def test_distances(self):
+        tree = ShortestPathTree(self.g1, 'a')
+
+        self.assertEqual(0, tree.distance_to('a'))
+        self.assertEqual(7, tree.distance_to('b'))
+        self.assertEqual(3, tree.distance_to('c'))
+        self.assertEqual(9, tree.distance_to('d'))
+        self.assertEqual(5, tree.distance_to('e'))
+
+    def test_unreachable(self):
+        tree = ShortestPathTree(self.g1, 'a')
+
+        self.assertFalse(tree.reached('z'))
+        self.assertRaises(ValueError, tree.path_to, 'z')
+        self.assertRaises(ValueError, tree.distance_to, 'z')
+        self.assertRaises(ValueError, tree.distance_to, 'fake')
+
+    def test_targets(self):
+        # 'c' and 'e' are settled before 'b' and 'd'
+        tree = ShortestPathTree(self.g1, 'a', targets=['e', 'c'])
+
+        self.assertEqual(['a', 'c', 'e'], tree.path_to('e'))
+        self.assertEqual(3, tree.distance_to('c'))
+        self.assertFalse(tree.reached('b'))
+        self.assertFalse(tree.reached('d'))
+        self.assertRaises(ValueError, tree.path_to, 'd')
+
+        # an unreachable target does not stop the search early
+        tree = ShortestPathTree(self.g1, 'a', targets=['z', 'c'])
+
+        self.assertTrue(tree.reached('d'))
+        self.assertFalse(tree.reached('z'))
+        # the search ran out of reachable nodes rather than stopping early
+        self.assertRaisesRegex(ValueError, 'not reachable', tree.path_to, 'z')
+
+
+if __name__ == '__main__':
+    unittest.main()
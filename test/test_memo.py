@@ -0,0 +1,129 @@
+"""
+Tests for the memoization of algorithm results in the memo module.
+"""
+
+import gc
+import unittest
+
+from al60.data.graphs import Graph, Undirected
+from al60.algorithms import topological_sort, components, distance,\
+    shortest_path_tree
+from al60.memo import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Tests for ResultCache.
+    """
+
+    def setUp(self):
+        self.g1 = Graph()
+        self.g1.add_nodes('a', 'b', 'c', 'd')
+        self.g1.add_edge('a', 'b', weight=2)
+        self.g1.add_edge('b', 'c', weight=2)
+        self.g1.add_edge('a', 'c', weight=5)
+
+        self.cache = ResultCache()
+
+    def test_version(self):
+        g = Graph()
+        self.assertEqual(0, g.version)
+
+        g.add_node('a')
+        g.add_nodes('b', 'c')
+        g.add_edge('a', 'b')
+        g.add_edges_from([('b', 'c')])
+        g.remove_edge('a', 'b')
+        g.remove_node('c')
+        self.assertEqual(6, g.version)
+
+        # failed mutations do not change the graph or its version
+        self.assertRaises(ValueError, g.add_node, 'a')
+        self.assertEqual(6, g.version)
+
+    def test_hit(self):
+        sort = self.cache.wrap(topological_sort)
+
+        self.assertEqual(['a', 'b', 'c', 'd'], sort(self.g1))
+        self.assertIs(sort(self.g1), sort(self.g1))
+        self.assertEqual((2, 1, 1), self.cache.info()[:3])
+        self.assertEqual('topological_sort', sort.__name__)
+
+    def test_arguments(self):
+        self.assertEqual(4, self.cache.call(distance, self.g1, 'a', 'c'))
+        self.assertEqual(2, self.cache.call(distance, self.g1, 'a', 'b'))
+        self.assertEqual(4, self.cache.call(distance, self.g1, 'a', 'c'))
+        self.assertEqual((1, 2, 2), self.cache.info()[:3])
+
+    def test_mutation(self):
+        self.assertEqual(4, self.cache.call(distance, self.g1, 'a', 'c'))
+        self.g1.add_node('e')
+        self.g1.add_edge('a', 'e', weight=1)
+        self.g1.add_edge('e', 'c', weight=1)
+
+        self.assertEqual(2, self.cache.call(distance, self.g1, 'a', 'c'))
+        # the result for the old version was dropped
+        self.assertEqual(1, len(self.cache))
+
+    def test_snapshot(self):
+        snap = self.g1.snapshot()
+        self.cache.call(topological_sort, self.g1)
+        self.cache.call(topological_sort, snap)
+
+        self.assertEqual(2, self.cache.info().misses)
+
+    def test_max_entries(self):
+        cache = ResultCache(max_entries=2)
+        for t in ('a', 'b', 'c'):
+            cache.call(distance, self.g1, 'a', t)
+
+        self.assertEqual(2, len(cache))
+        # the least recently used result was evicted
+        cache.call(distance, self.g1, 'a', 'a')
+        self.assertEqual(4, cache.info().misses)
+
+    def test_max_size(self):
+        g = Undirected()
+        g.add_nodes(*range(100))
+        cache = ResultCache(max_size=1)
+        cache.call(components, g)
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.info().size)
+
+    def test_max_size_trees(self):
+        g = Graph()
+        g.add_nodes(*range(200))
+        for u in range(199):
+            g.add_edge(u, u + 1)
+        cache = ResultCache(max_size=100_000)
+        for s in range(20):
+            cache.call(shortest_path_tree, g, s)
+
+        # each tree holds about 200 distances and predecessors, so only a few
+        # of them fit
+        (_, misses, entries, size) = cache.info()
+        self.assertEqual(20, misses)
+        self.assertTrue(0 < entries < 5)
+        self.assertTrue(50_000 < size <= 100_000)
+
+    def test_exceptions_and_unhashable(self):
+        self.g1.add_edge('c', 'a')
+        self.assertRaises(ValueError, self.cache.call, topological_sort,
+                          self.g1)
+        self.assertEqual(0, len(self.cache))
+
+        self.cache.call(distance, self.g1, 'a', 'c', heuristic=None)
+        self.cache.call(lambda g, targets: len(targets), self.g1, ['a'])
+        self.assertEqual(1, len(self.cache))
+
+    def test_collected_graph(self):
+        g = Graph()
+        g.add_node('a')
+        self.cache.call(topological_sort, g)
+        self.assertEqual(1, len(self.cache))
+
+        del g
+        gc.collect()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.info().size)